@@ -0,0 +1,284 @@
+"""
+Admission control for the AI-bound views.
+
+A DeepSeek call holds a worker thread for tens of seconds. When the model
+slows down, uploads and analyses pile up until no thread is left for the
+cheap reads. Handlers decorated with @admit(ai_admission) have to get a slot
+first:
+
+    - At most AI_MAX_IN_FLIGHT handlers per process run at once. The
+      default (ASYNC_IO_WORKERS - AI_RESERVED_WORKERS) leaves part of the
+      async I/O pool for everything else.
+    - Up to AI_MAX_QUEUE more wait for a slot, for at most AI_QUEUE_TIMEOUT
+      seconds and never past the request's deadline (see deadline.py).
+    - One user may hold or wait for at most AI_MAX_PER_USER slots.
+
+Anything over those limits is turned away at once. A user over their share
+gets a 429, and an overloaded server gets a 503. Both carry Retry-After,
+estimated from how long recent handlers held their slot.
+
+The AI views are async and hand their blocking work to the I/O pool, so an
+admitted request holds one pool thread and a queued one holds none: it waits
+on the event loop while reads keep the rest of the pool. A sync handler
+would wait in its own thread, which under ASGI is the one Django runs all
+sync code on, so keep admitted handlers async there.
+
+The limits are per worker process. The in-flight, queued and rejected
+counts are exported as metrics.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from typing import Hashable, NamedTuple, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+
+from .deadline import remaining
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_AI_MAX_IN_FLIGHT = 8
+DEFAULT_AI_MAX_QUEUE = 16
+DEFAULT_AI_MAX_PER_USER = 2
+DEFAULT_AI_QUEUE_TIMEOUT = 10
+
+# Until handlers have finished, Retry-After assumes they hold a slot this long
+INITIAL_HOLD_SECONDS = 30.0
+HOLD_SMOOTHING = 0.2
+MAX_RETRY_AFTER = 120
+
+# Rejection reasons
+REASON_USER_LIMIT = "user_limit"
+REASON_QUEUE_FULL = "queue_full"
+REASON_QUEUE_TIMEOUT = "queue_timeout"
+
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "admission_in_flight", "Handlers holding an admission slot, by pool.", ("pool",),
+)
+ADMISSION_QUEUED = registry.gauge(
+    "admission_queued", "Requests waiting for an admission slot, by pool.", ("pool",),
+)
+ADMISSION_REJECTED = registry.counter(
+    "admission_rejected_total", "Requests turned away by admission control, by pool and reason.",
+    ("pool", "reason"),
+)
+ADMISSION_WAIT = registry.histogram(
+    "admission_wait_seconds", "Time admitted requests waited for a slot, by pool.", ("pool",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+class Rejection(NamedTuple):
+    status_code: int
+    reason: str
+    retry_after: int
+
+    def response(self) -> Response:
+        message = ("Too many AI requests in progress for this user" if self.reason == REASON_USER_LIMIT
+                   else "AI service is at capacity")
+        return Response(
+            {"error": f"{message}, retry later.", "retry_after": self.retry_after},
+            status=self.status_code,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded wait queue and a per-user share.
+
+    Args:
+        name: Pool name for metrics and logs
+        max_in_flight: Handlers allowed to run at once
+        max_queue: Requests allowed to wait for a slot
+        max_per_user: Slots one user may hold or wait for
+        queue_timeout: Longest wait for a slot, in seconds
+    """
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int, max_per_user: int, queue_timeout: float):
+        self.name = name
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max(max_queue, 0)
+        self.max_per_user = max(max_per_user, 1)
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self._per_user = Counter()
+        self._hold_seconds = INITIAL_HOLD_SECONDS
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    def retry_after(self, reason: str) -> int:
+        """Seconds a rejected client should wait: about when a slot should free up for it"""
+        if reason == REASON_USER_LIMIT:
+            estimate = self._hold_seconds
+        else:
+            estimate = self._hold_seconds * (self.queued + 1) / self.max_in_flight
+        return min(max(math.ceil(estimate), 1), MAX_RETRY_AFTER)
+
+    def _reject(self, reason: str) -> Rejection:
+        code = status.HTTP_429_TOO_MANY_REQUESTS if reason == REASON_USER_LIMIT else status.HTTP_503_SERVICE_UNAVAILABLE
+        ADMISSION_REJECTED.inc(pool=self.name, reason=reason)
+        logger.warning(f"Admission {self.name}: rejected ({reason}), {self.in_flight} in flight, {self.queued} queued")
+        return Rejection(code, reason, self.retry_after(reason))
+
+    def _arrive(self, user: Hashable) -> Tuple[Optional[Rejection], bool]:
+        """
+        Admit at once, queue or reject a new request; the caller holds the lock.
+
+        Returns:
+            (rejection, waiting): waiting is True when the request joined the queue
+        """
+        if self._per_user[user] >= self.max_per_user:
+            return self._reject(REASON_USER_LIMIT), False
+        # Newcomers don't jump ahead of requests already waiting
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self._per_user[user] += 1
+            self._take()
+            return None, False
+        if self.queued >= self.max_queue:
+            return self._reject(REASON_QUEUE_FULL), False
+        self._per_user[user] += 1
+        self.queued += 1
+        self._update_gauges()
+        return None, True
+
+    def _take(self) -> None:
+        self.in_flight += 1
+        self._update_gauges()
+
+    def _leave_queue(self, user: Hashable, admitted: bool) -> None:
+        self.queued -= 1
+        if admitted:
+            self._take()
+        else:
+            self._forget(user)
+            self._update_gauges()
+
+    def _forget(self, user: Hashable) -> None:
+        self._per_user[user] -= 1
+        if self._per_user[user] <= 0:
+            del self._per_user[user]
+
+    def _wait_budget(self) -> float:
+        left = remaining()
+        return self.queue_timeout if left is None else min(self.queue_timeout, max(left, 0.0))
+
+    def _update_gauges(self) -> None:
+        ADMISSION_IN_FLIGHT.set(self.in_flight, pool=self.name)
+        ADMISSION_QUEUED.set(self.queued, pool=self.name)
+
+    def acquire(self, user: Hashable) -> Optional[Rejection]:
+        """
+        Take a slot, waiting in the queue if needed.
+
+        Returns:
+            None once admitted (call release() afterwards), or the Rejection
+        """
+        started = time.monotonic()
+        with self._lock:
+            rejection, waiting = self._arrive(user)
+            if not waiting:
+                return rejection
+            expires_at = started + self._wait_budget()
+            while self.in_flight >= self.max_in_flight:
+                left = expires_at - time.monotonic()
+                if left <= 0:
+                    self._leave_queue(user, admitted=False)
+                    return self._reject(REASON_QUEUE_TIMEOUT)
+                self._released.wait(left)
+            self._leave_queue(user, admitted=True)
+        ADMISSION_WAIT.observe(time.monotonic() - started, pool=self.name)
+        return None
+
+    async def acquire_async(self, user: Hashable) -> Optional[Rejection]:
+        """acquire() for coroutines: waits with asyncio.sleep instead of blocking the loop"""
+        started = time.monotonic()
+        with self._lock:
+            rejection, waiting = self._arrive(user)
+            if not waiting:
+                return rejection
+        expires_at = started + self._wait_budget()
+        delay = 0.01
+        while True:
+            await asyncio.sleep(min(delay, max(expires_at - time.monotonic(), 0)))
+            delay = min(delay * 2, 0.25)
+            with self._lock:
+                if self.in_flight < self.max_in_flight:
+                    self._leave_queue(user, admitted=True)
+                    break
+                if time.monotonic() >= expires_at:
+                    self._leave_queue(user, admitted=False)
+                    return self._reject(REASON_QUEUE_TIMEOUT)
+        ADMISSION_WAIT.observe(time.monotonic() - started, pool=self.name)
+        return None
+
+    def release(self, user: Hashable, held: float) -> None:
+        """Give back a slot taken by acquire(), after holding it for `held` seconds"""
+        with self._lock:
+            self.in_flight -= 1
+            self._forget(user)
+            self._hold_seconds += HOLD_SMOOTHING * (held - self._hold_seconds)
+            self._update_gauges()
+            self._released.notify()
+
+
+def request_user(request) -> Hashable:
+    """Who a request counts against: the user, or the client address when anonymous"""
+    user = getattr(request, "user", None)
+    if user is not None and getattr(user, "is_authenticated", False):
+        return ("user", user.pk)
+    return ("addr", request.META.get("REMOTE_ADDR"))
+
+
+def admit(controller: AdmissionController):
+    """
+    Decorator for view handlers (sync or async) that must get a slot from
+    `controller` before running. Rejected requests get the 429/503 response.
+    """
+    def decorator(handler):
+        if iscoroutinefunction(handler):
+            @wraps(handler)
+            async def async_wrapper(view, request, *args, **kwargs):
+                user = request_user(request)
+                rejection = await controller.acquire_async(user)
+                if rejection is not None:
+                    return rejection.response()
+                started = time.monotonic()
+                try:
+                    return await handler(view, request, *args, **kwargs)
+                finally:
+                    controller.release(user, time.monotonic() - started)
+            return async_wrapper
+
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            user = request_user(request)
+            rejection = controller.acquire(user)
+            if rejection is not None:
+                return rejection.response()
+            started = time.monotonic()
+            try:
+                return handler(view, request, *args, **kwargs)
+            finally:
+                controller.release(user, time.monotonic() - started)
+        return wrapper
+    return decorator
+
+
+ai_admission = AdmissionController(
+    "ai",
+    max_in_flight=getattr(settings, 'AI_MAX_IN_FLIGHT', DEFAULT_AI_MAX_IN_FLIGHT),
+    max_queue=getattr(settings, 'AI_MAX_QUEUE', DEFAULT_AI_MAX_QUEUE),
+    max_per_user=getattr(settings, 'AI_MAX_PER_USER', DEFAULT_AI_MAX_PER_USER),
+    queue_timeout=getattr(settings, 'AI_QUEUE_TIMEOUT', DEFAULT_AI_QUEUE_TIMEOUT),
+)
@@ -2,28 +2,219 @@ import requests
 import os
 import time
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import concurrent.futures
 import re
 import json
+from config.constants import CHUNK_SIZE, CHUNK_THRESHOLD, CHUNK_WORKERS
+from .telemetry import (
+    record_call,
+    map_in_context,
+    OUTCOME_OK,
+    OUTCOME_TIMEOUT,
+    OUTCOME_CONNECTION_ERROR,
+    OUTCOME_HTTP_ERROR,
+    OUTCOME_ERROR,
+    OUTCOME_DEADLINE_EXCEEDED,
+    OUTCOME_CIRCUIT_OPEN,
+    OUTCOME_HEDGE_LOST,
+)
+from .breaker import CircuitOpen, deepseek_breaker
+from .deadline import DeadlineExceeded, allows, timeout_for
+from .hedging import ai_hedging
+from .routing import model_router
+from .timing import span
 
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
-DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+# Overridable so benchmarks can point the client at a local stand-in server
+DEEPSEEK_API_URL = os.getenv("DEEPSEEK_API_URL", "https://api.deepseek.com/v1/chat/completions")
 DEEPSEEK_MODEL = "deepseek-reasoner"
+MODEL_LABELS = {"deepseek-reasoner": "DeepSeek Reasoning Model", "deepseek-chat": "DeepSeek Chat Model"}
 
-# Configure retry strategy
-retry_strategy = Retry(
-    total=3,
-    backoff_factor=1,
-    status_forcelist=[429, 500, 502, 503, 504],
-)
+# Retries happen in _post_completion rather than in the urllib3 adapter, so
+# they can stop at the request's deadline. Only failures where the model did
+# no work are retried: refused connections, rate limiting and overload.
+MAX_ATTEMPTS = 4
+RETRY_STATUSES = (429, 502, 503, 504)
+BACKOFF_FACTOR = 1
 
-adapter = HTTPAdapter(max_retries=retry_strategy)
+adapter = HTTPAdapter(max_retries=0)
 session = requests.Session()
 session.mount("https://", adapter)
 session.mount("http://", adapter)
 
+
+class AIDeadlineExceeded(requests.exceptions.Timeout, DeadlineExceeded):
+    """No time left for a DeepSeek call; callers handle it like any other timeout"""
+
+
+class AICircuitOpen(requests.exceptions.ConnectionError, CircuitOpen):
+    """DeepSeek's circuit is open; callers fall back as for a connection error, but at once"""
+
+
+def retry_delay(retry: int, response=None) -> float:
+    """Seconds to wait before retry number `retry` (1-based), honouring Retry-After"""
+    if response is not None:
+        try:
+            return max(float(response.headers.get("Retry-After")), 0.0)
+        except (TypeError, ValueError):
+            pass
+    # Same schedule urllib3 used: retry at once, then back off exponentially
+    return 0.0 if retry <= 1 else BACKOFF_FACTOR * 2 ** (retry - 1)
+
+
 class AIService:
+    @staticmethod
+    def _post_completion(payload: dict, headers: dict, timeout: int, operation: str,
+                         chunked: bool = False, queued_at: float = None):
+        """
+        Send a chat completion request and record its telemetry.
+
+        Each attempt's timeout is cut to what is left of the request's
+        deadline, and retries stop when the backoff would outlast it.
+        Operations enabled in hedging.py send a duplicate attempt when the
+        first one is slower than their p95. The router is then given the
+        winning attempt's own latency, and the loser's when it finishes.
+        Exceptions from the session are re-raised unchanged so callers keep
+        their own fallback handling; running out of time raises
+        AIDeadlineExceeded, which is a requests Timeout, and an open circuit
+        raises AICircuitOpen, a requests ConnectionError, without retrying.
+
+        Args:
+            payload: Request body; its "model" labels the telemetry
+            headers: Request headers
+            timeout: Per-attempt timeout in seconds
+            operation: AIService operation name for metrics and usage records
+            chunked: Whether this is one chunk of a larger contract
+            queued_at: perf_counter() value when the chunk was submitted to the executor
+
+        Returns:
+            The requests Response
+        """
+        started = time.perf_counter()
+        queue_wait = started - queued_at if queued_at is not None else None
+        outcome, status_code, usage, retries = OUTCOME_ERROR, None, None, 0
+        # Seconds the caller waited for a hedged attempt before it was sent
+        head_start = 0.0
+        try:
+            for attempt in range(1, MAX_ATTEMPTS + 1):
+                response = None
+                try:
+                    if ai_hedging.applies(operation, payload.get("model"), chunked):
+                        hedged_at = time.perf_counter()
+
+                        def won(seconds):
+                            nonlocal head_start
+                            head_start = time.perf_counter() - hedged_at - seconds
+
+                        response = ai_hedging.run(
+                            operation, lambda: AIService._send(payload, headers, timeout),
+                            discard=lambda lost, seconds: AIService._discard_hedge(lost, seconds, payload, operation),
+                            won=won,
+                        )
+                    else:
+                        response = AIService._send(payload, headers, timeout)
+                except AICircuitOpen:
+                    raise
+                except requests.exceptions.ConnectionError:
+                    if attempt == MAX_ATTEMPTS:
+                        raise
+                if response is not None:
+                    status_code = response.status_code if isinstance(response.status_code, int) else None
+                    if status_code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS:
+                        break
+                delay = retry_delay(attempt, response)
+                # A retry that can't finish before the deadline only adds spend
+                if not allows(delay):
+                    if response is not None:
+                        break
+                    raise AIDeadlineExceeded(f"No time left to retry {operation}")
+                retries += 1
+                time.sleep(delay)
+
+            if status_code is not None and status_code >= 400:
+                outcome = OUTCOME_HTTP_ERROR
+            else:
+                outcome = OUTCOME_OK
+                try:
+                    body = response.json()
+                    usage = body.get("usage") if isinstance(body, dict) else None
+                except ValueError:
+                    pass
+            return response
+        except AIDeadlineExceeded:
+            outcome = OUTCOME_DEADLINE_EXCEEDED
+            raise
+        except AICircuitOpen:
+            outcome = OUTCOME_CIRCUIT_OPEN
+            raise
+        except requests.exceptions.Timeout:
+            outcome = OUTCOME_TIMEOUT
+            raise
+        except requests.exceptions.ConnectionError:
+            outcome = OUTCOME_CONNECTION_ERROR
+            raise
+        finally:
+            wall_time = time.perf_counter() - started
+            model = payload.get("model", DEEPSEEK_MODEL)
+            record_call(
+                model, operation, outcome, wall_time,
+                usage=usage if isinstance(usage, dict) else None, queue_wait=queue_wait,
+                retries=retries, chunked=chunked, status_code=status_code,
+            )
+            model_router.observe(model, operation, outcome, wall_time - head_start)
+
+    @staticmethod
+    def _send(payload: dict, headers: dict, timeout: int):
+        """One attempt at a completion request, guarded by the circuit breaker"""
+        try:
+            attempt_timeout = timeout_for(timeout)
+        except DeadlineExceeded as e:
+            raise AIDeadlineExceeded(str(e)) from e
+        try:
+            probe = deepseek_breaker.allow()
+        except CircuitOpen as e:
+            raise AICircuitOpen(str(e)) from e
+        ok = None
+        try:
+            with span("ai"):
+                response = session.post(DEEPSEEK_API_URL, json=payload, headers=headers, timeout=attempt_timeout)
+            status_code = response.status_code if isinstance(response.status_code, int) else 200
+            ok = status_code < 500 and status_code != 429
+            return response
+        except requests.exceptions.ConnectionError:
+            ok = False
+            raise
+        except requests.exceptions.Timeout as e:
+            if attempt_timeout >= timeout:
+                ok = False
+                raise
+            # Cut short by the request deadline, which says nothing about the service or the model
+            raise AIDeadlineExceeded(f"Request deadline reached after {attempt_timeout:.1f}s: {e}") from e
+        finally:
+            deepseek_breaker.record(probe, ok)
+
+    @staticmethod
+    def _discard_hedge(response, seconds: float, payload: dict, operation: str) -> None:
+        """Record a hedged attempt that lost the race, and close its response if it got one"""
+        usage, status_code = None, None
+        if response is not None:
+            try:
+                body = response.json()
+                usage = body.get("usage") if isinstance(body, dict) else None
+            except ValueError:
+                pass
+            finally:
+                response.close()
+            status_code = response.status_code if isinstance(response.status_code, int) else None
+        model = payload.get("model", DEEPSEEK_MODEL)
+        record_call(
+            model, operation, OUTCOME_HEDGE_LOST, seconds,
+            usage=usage if isinstance(usage, dict) else None, status_code=status_code,
+        )
+        # Only a completed answer says how long the model takes
+        if response is not None and (status_code is None or status_code < 400):
+            model_router.observe(model, operation, OUTCOME_HEDGE_LOST, seconds)
+
     @staticmethod
     def test_api_connection() -> bool:
         """Test if the DeepSeek API is accessible."""
@@ -33,7 +224,7 @@ class AIService:
                 "Content-Type": "application/json"
             }
             payload = {
-                "model": DEEPSEEK_MODEL,
+                "model": model_router.choose("connection_test"),
                 "messages": [
                     {
                         "role": "user",
@@ -43,7 +234,7 @@ class AIService:
                 "max_tokens": 10
             }
             
-            response = session.post(DEEPSEEK_API_URL, json=payload, headers=headers, timeout=10)
+            response = AIService._post_completion(payload, headers, 10, "connection_test")
             
             if response.status_code == 200:
                 return True
@@ -56,23 +247,24 @@ class AIService:
     @staticmethod
     def analyze_contract(contract_text: str) -> dict:
         """Analyze contract text and extract clauses, risks, and obligations."""
-        def chunk_text(text, chunk_size=20000):
+        def chunk_text(text, chunk_size=CHUNK_SIZE):
             return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
 
         headers = {
             "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
             "Content-Type": "application/json"
         }
+        model = model_router.choose("analyze", len(contract_text))
 
-        if len(contract_text) > 50000:
-            chunks = chunk_text(contract_text, 20000)
+        if len(contract_text) > CHUNK_THRESHOLD:
+            chunks = chunk_text(contract_text)
             all_analyses = []
             errors = []
 
-            def process_chunk(idx_chunk):
+            def process_chunk(idx_chunk, queued_at):
                 idx, chunk = idx_chunk
                 payload = {
-                    "model": DEEPSEEK_MODEL,
+                    "model": model,
                     "messages": [
                         {
                             "role": "system",
@@ -92,7 +284,7 @@ class AIService:
                 }
 
                 try:
-                    response = session.post(DEEPSEEK_API_URL, json=payload, headers=headers, timeout=60)
+                    response = AIService._post_completion(payload, headers, 60, "analyze", chunked=True, queued_at=queued_at)
                     response.raise_for_status()
                     result = response.json()
                     return (result["choices"][0]["message"]["content"], None)
@@ -103,8 +295,8 @@ class AIService:
                 except Exception as e:
                     return (None, f"Chunk {idx+1}: {str(e)}")
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-                results = list(executor.map(process_chunk, enumerate(chunks)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=CHUNK_WORKERS) as executor:
+                results = map_in_context(executor, process_chunk, enumerate(chunks))
 
             for analysis, error in results:
                 if analysis:
@@ -126,11 +318,11 @@ class AIService:
 
             return {
                 "analysis": combined_analysis,
-                "model_used": "DeepSeek Reasoning Model (Live) - Chunked Analysis"
+                "model_used": f"{MODEL_LABELS.get(model, model)} (Live) - Chunked Analysis"
             }
         else:
             payload = {
-                "model": DEEPSEEK_MODEL,
+                "model": model,
                 "messages": [
                     {
                         "role": "system",
@@ -149,13 +341,13 @@ class AIService:
             }
 
             try:
-                response = session.post(DEEPSEEK_API_URL, json=payload, headers=headers, timeout=60)
+                response = AIService._post_completion(payload, headers, 60, "analyze")
                 response.raise_for_status()
                 result = response.json()
                 model_reply = result["choices"][0]["message"]["content"]
                 return {
                     "analysis": model_reply,
-                    "model_used": "DeepSeek Reasoning Model (Live)"
+                    "model_used": f"{MODEL_LABELS.get(model, model)} (Live)"
                 }
             except requests.exceptions.Timeout:
                 return {
@@ -175,25 +367,25 @@ class AIService:
 
     @staticmethod
     def extract_clauses(contract_text: str) -> dict:
-        """Extract and classify contract clauses with metadata. Use deepseek-chat (V3-0324) for speed."""
+        """Extract and classify contract clauses with metadata. Routed to deepseek-chat (V3-0324) for speed."""
         print(f"[DEBUG] extract_clauses: contract_text length = {len(contract_text) if contract_text else 0}")
-        def chunk_text(text, chunk_size=20000):
+        def chunk_text(text, chunk_size=CHUNK_SIZE):
             return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
 
         headers = {
             "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
             "Content-Type": "application/json"
         }
-        CHAT_MODEL = "deepseek-chat"  # Fastest model per DeepSeek docs
+        model = model_router.choose("extract_clauses", len(contract_text))
 
-        if len(contract_text) > 50000:
-            chunks = chunk_text(contract_text, 20000)
+        if len(contract_text) > CHUNK_THRESHOLD:
+            chunks = chunk_text(contract_text)
             all_clauses = []
             errors = []
-            def process_chunk(idx_chunk):
+            def process_chunk(idx_chunk, queued_at):
                 idx, chunk = idx_chunk
                 payload = {
-                    "model": CHAT_MODEL,
+                    "model": model,
                     "messages": [
                         {
                             "role": "system",
@@ -223,7 +415,7 @@ class AIService:
                 }
                 try:
                     print(f"[DEBUG] [Chunk {idx+1}/{len(chunks)}] Sending request to DeepSeek...")
-                    response = session.post(DEEPSEEK_API_URL, json=payload, headers=headers, timeout=120)
+                    response = AIService._post_completion(payload, headers, 120, "extract_clauses", chunked=True, queued_at=queued_at)
                     print(f"[DEBUG] [Chunk {idx+1}] DeepSeek HTTP status: {response.status_code}")
                     response.raise_for_status()
                     result = response.json()
@@ -248,8 +440,8 @@ class AIService:
                 except Exception as e:
                     print(f"[DEBUG] [Chunk {idx+1}] Exception: {str(e)}")
                     return ([], f"Chunk {idx+1}: {str(e)}")
-            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-                results = list(executor.map(process_chunk, enumerate(chunks)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=CHUNK_WORKERS) as executor:
+                results = map_in_context(executor, process_chunk, enumerate(chunks))
             for clauses, error in results:
                 all_clauses.extend(clauses)
                 if error:
@@ -258,12 +450,12 @@ class AIService:
             return {
                 "clauses": all_clauses,
                 "clause_count": len(all_clauses),
-                "model_used": CHAT_MODEL,
+                "model_used": model,
                 "error": "; ".join(errors) if errors else None
             }
         else:
             payload = {
-                "model": CHAT_MODEL,
+                "model": model,
                 "messages": [
                     {
                         "role": "system",
@@ -293,7 +485,7 @@ class AIService:
             }
             try:
                 print("[DEBUG] Sending request to DeepSeek for clause extraction...")
-                response = session.post(DEEPSEEK_API_URL, json=payload, headers=headers, timeout=120)
+                response = AIService._post_completion(payload, headers, 120, "extract_clauses")
                 print(f"[DEBUG] DeepSeek HTTP status: {response.status_code}")
                 response.raise_for_status()
                 result = response.json()
@@ -306,7 +498,7 @@ class AIService:
                 return {
                     "clauses": clauses,
                     "clause_count": len(clauses),
-                    "model_used": CHAT_MODEL
+                    "model_used": model
                 }
             except json.JSONDecodeError as e:
                 print(f"[DEBUG] JSONDecodeError: {str(e)}")
@@ -327,14 +519,14 @@ class AIService:
                         "clause_count": len(partial_clauses),
                         "error": f"Partial extraction: {str(e)}",
                         "raw_response": model_reply,
-                        "model_used": CHAT_MODEL
+                        "model_used": model
                     }
                 return {
                     "clauses": [],
                     "clause_count": 0,
                     "error": f"Failed to parse AI response as JSON: {str(e)}",
                     "raw_response": model_reply,
-                    "model_used": CHAT_MODEL
+                    "model_used": model
                 }
             except requests.exceptions.Timeout as e:
                 return {
@@ -357,23 +549,24 @@ class AIService:
     @staticmethod
     def evaluate_contract(contract_text: str) -> dict:
         """Evaluate contract health and return approval status with reasoning."""
-        def chunk_text(text, chunk_size=20000):
+        def chunk_text(text, chunk_size=CHUNK_SIZE):
             return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
 
         headers = {
             "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
             "Content-Type": "application/json"
         }
+        model = model_router.choose("evaluate", len(contract_text))
 
-        if len(contract_text) > 50000:
-            chunks = chunk_text(contract_text, 20000)
+        if len(contract_text) > CHUNK_THRESHOLD:
+            chunks = chunk_text(contract_text)
             all_evaluations = []
             errors = []
 
-            def process_chunk(idx_chunk):
+            def process_chunk(idx_chunk, queued_at):
                 idx, chunk = idx_chunk
                 payload = {
-                    "model": DEEPSEEK_MODEL,
+                    "model": model,
                     "messages": [
                         {
                             "role": "system",
@@ -393,7 +586,7 @@ class AIService:
                 }
 
                 try:
-                    response = session.post(DEEPSEEK_API_URL, json=payload, headers=headers, timeout=60)
+                    response = AIService._post_completion(payload, headers, 60, "evaluate", chunked=True, queued_at=queued_at)
                     response.raise_for_status()
                     result = response.json()
                     reply = result["choices"][0]["message"]["content"]
@@ -409,8 +602,8 @@ class AIService:
                 except Exception as e:
                     return (None, f"Chunk {idx+1}: {str(e)}")
 
-            with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-                results = list(executor.map(process_chunk, enumerate(chunks)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=CHUNK_WORKERS) as executor:
+                results = map_in_context(executor, process_chunk, enumerate(chunks))
 
             for evaluation, error in results:
                 if evaluation:
@@ -442,7 +635,7 @@ class AIService:
             }
         else:
             payload = {
-                "model": DEEPSEEK_MODEL,
+                "model": model,
                 "messages": [
                     {
                         "role": "system",
@@ -461,7 +654,7 @@ class AIService:
             }
 
             try:
-                response = session.post(DEEPSEEK_API_URL, json=payload, headers=headers, timeout=60)
+                response = AIService._post_completion(payload, headers, 60, "evaluate")
                 response.raise_for_status()
                 result = response.json()
                 reply = result["choices"][0]["message"]["content"]
@@ -0,0 +1,180 @@
+"""
+Async building blocks for views served under ASGI.
+
+pymongo 4.5 has no asyncio API. Like Motor, which wraps pymongo the same way,
+blocking driver calls run on a dedicated thread pool while the event loop
+awaits them, so one worker keeps many requests in flight while they wait on
+Mongo, Redis or DeepSeek. Each call runs in a copy of the caller's context,
+so request timers and usage collectors still see it.
+
+Only Mongo, Redis and HTTP calls belong on the pool. Django ORM work stays on
+the thread-sensitive sync_to_async thread, where Django manages its
+connections.
+
+    contracts = AsyncCollection(contracts_collection)
+    contract = await contracts.find_one({"_id": obj_id})
+    analysis = await run_sync(ai_service.analyze_contract, text)
+
+AsyncAPIView lets DRF views define `async def get(...)` and friends.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.views import APIView
+
+from .profiling import profiled_thread
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ASYNC_IO_WORKERS = 32
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Create the blocking-call pool once per process (again after a fork)"""
+    global _executor, _executor_pid
+    if _executor_pid == os.getpid():
+        return _executor
+    with _executor_lock:
+        if _executor_pid != os.getpid():
+            workers = getattr(settings, 'ASYNC_IO_WORKERS', DEFAULT_ASYNC_IO_WORKERS)
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="async-io")
+            _executor_pid = os.getpid()
+    return _executor
+
+
+async def run_sync(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking function on the I/O pool and await its result.
+
+    Args:
+        func: Blocking callable (pymongo, django-redis, requests, ...)
+        *args, **kwargs: Passed to func
+
+    Returns:
+        Whatever func returns; exceptions are re-raised in the caller
+    """
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(context.run, _call, func, *args, **kwargs))
+
+
+def _call(func: Callable, *args, **kwargs) -> Any:
+    with profiled_thread():
+        return func(*args, **kwargs)
+
+
+_EXHAUSTED = object()
+
+
+async def iterate_sync(iterable):
+    """
+    Async iterator over a blocking iterable (a cursor, a generator that reads
+    from Mongo), advanced one item at a time on the I/O pool.
+    """
+    iterator = iter(iterable)
+    while True:
+        item = await run_sync(next, iterator, _EXHAUSTED)
+        if item is _EXHAUSTED:
+            return
+        yield item
+
+
+class AsyncCollection:
+    """Awaitable versions of the pymongo Collection methods the async views use"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    @property
+    def name(self) -> str:
+        return self.collection.name
+
+    async def find_one(self, *args, **kwargs) -> Optional[Dict]:
+        return await run_sync(self.collection.find_one, *args, **kwargs)
+
+    async def find_list(self, filter: Optional[Dict] = None, projection: Optional[Dict] = None,
+                        sort: Optional[List] = None, skip: int = 0, limit: int = 0) -> List[Dict]:
+        """Run a find and read the whole cursor in one pool call"""
+        def fetch():
+            cursor = self.collection.find(filter or {}, projection)
+            if sort:
+                cursor = cursor.sort(sort)
+            if skip:
+                cursor = cursor.skip(skip)
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
+        return await run_sync(fetch)
+
+    async def count_documents(self, filter: Dict, **kwargs) -> int:
+        return await run_sync(self.collection.count_documents, filter, **kwargs)
+
+    async def aggregate_list(self, pipeline: List[Dict], **kwargs) -> List[Dict]:
+        return await run_sync(lambda: list(self.collection.aggregate(pipeline, **kwargs)))
+
+    async def insert_one(self, document: Dict, **kwargs):
+        return await run_sync(self.collection.insert_one, document, **kwargs)
+
+    async def update_one(self, filter: Dict, update: Dict, **kwargs):
+        return await run_sync(self.collection.update_one, filter, update, **kwargs)
+
+    async def find_one_and_update(self, filter: Dict, update: Dict, **kwargs) -> Optional[Dict]:
+        return await run_sync(self.collection.find_one_and_update, filter, update, **kwargs)
+
+    async def delete_one(self, filter: Dict, **kwargs):
+        return await run_sync(self.collection.delete_one, filter, **kwargs)
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines.
+
+    DRF 3.14 only dispatches synchronously, so this follows APIView.dispatch
+    with the handler awaited. Authentication, permissions and throttling can
+    query the ORM, so they run through Django's thread-sensitive
+    sync_to_async, on the thread that owns the request's database connection
+    and closes it when the request finishes. Never on the I/O pool, whose
+    threads would each keep a connection open. The handler's blocking work
+    goes to the pool, so the shared thread only does the short auth lookups.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        # The loop thread is working for this request until the response is built
+        with profiled_thread():
+            return await self._dispatch(request, *args, **kwargs)
+
+    async def _dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            # OPTIONS and 405s come from DRF's sync handlers
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
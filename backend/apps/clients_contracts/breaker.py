@@ -0,0 +1,190 @@
+"""
+Circuit breaker shared by every worker process through the cache (Redis).
+
+When DeepSeek is down, each call used to wait out its full timeout before
+the fallback answer. The breaker counts consecutive failures instead:
+
+    closed     calls go through; AI_BREAKER_FAILURE_THRESHOLD failures in a
+               row (within AI_BREAKER_WINDOW seconds) open the circuit
+    open       calls fail at once with CircuitOpen, for AI_BREAKER_COOLDOWN
+               seconds
+    half-open  after the cooldown, exactly one call (across all processes)
+               is let through as a probe. Success closes the circuit,
+               failure opens it for another cooldown.
+
+State lives in three cache keys, updated with atomic add/incr so processes
+don't need to coordinate:
+
+    breaker:<name>:opened_at   when the circuit opened; absent while closed
+    breaker:<name>:failures    consecutive failures, expiring after the window
+    breaker:<name>:probe       held by the process running the half-open probe
+
+If the cache itself fails, the breaker lets calls through rather than
+blocking the API on a Redis outage.
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+BREAKER_PREFIX = "breaker:"
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+STATES = (STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN)
+
+# Keep an open circuit's marker well past any cooldown, but not forever
+OPENED_AT_TTL = 24 * 3600
+
+BREAKER_STATE = registry.gauge(
+    "circuit_breaker_state", "Worker processes that last saw each breaker in each state.", ("breaker", "state"),
+)
+BREAKER_TRANSITIONS = registry.counter(
+    "circuit_breaker_transitions_total", "Breaker state changes, by breaker and new state.", ("breaker", "state"),
+)
+BREAKER_REJECTED = registry.counter(
+    "circuit_breaker_rejected_total", "Calls failed fast because the circuit was open.", ("breaker",),
+)
+
+
+class CircuitOpen(Exception):
+    """The circuit is open; the call was not attempted"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit {name} is open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Args:
+        name: Breaker name, used in cache keys and metrics
+        failure_threshold: Consecutive failures that open the circuit
+        window: Seconds after which a failure streak is forgotten
+        cooldown: Seconds the circuit stays open before a probe
+        probe_timeout: Seconds before a probe that never reported is abandoned;
+            at least as long as the slowest call
+    """
+
+    def __init__(self, name: str, failure_threshold: int, window: float, cooldown: float, probe_timeout: float):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.window = window
+        self.cooldown = cooldown
+        self.probe_timeout = probe_timeout
+        self.opened_at_key = f"{BREAKER_PREFIX}{name}:opened_at"
+        self.failures_key = f"{BREAKER_PREFIX}{name}:failures"
+        self.probe_key = f"{BREAKER_PREFIX}{name}:probe"
+        self._last_state = None
+
+    def _observe(self, state: str) -> None:
+        if state != self._last_state:
+            for candidate in STATES:
+                BREAKER_STATE.set(1 if candidate == state else 0, breaker=self.name, state=candidate)
+            self._last_state = state
+
+    def _transition(self, state: str) -> None:
+        BREAKER_TRANSITIONS.inc(breaker=self.name, state=state)
+        self._observe(state)
+        log = logger.info if state == STATE_CLOSED else logger.warning
+        log(f"Circuit {self.name} is now {state}")
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go ahead.
+
+        Returns:
+            True if this call is the half-open probe, False for a normal call
+
+        Raises:
+            CircuitOpen: While the circuit is open or another process is probing
+        """
+        try:
+            opened_at = cache.get(self.opened_at_key)
+            if opened_at is None:
+                self._observe(STATE_CLOSED)
+                return False
+            wait = opened_at + self.cooldown - time.time()
+            if wait <= 0 and cache.add(self.probe_key, 1, self.probe_timeout):
+                self._transition(STATE_HALF_OPEN)
+                return True
+        except Exception as e:
+            logger.error(f"Circuit {self.name}: state unavailable, letting the call through: {e}")
+            return False
+        self._observe(STATE_OPEN if wait > 0 else STATE_HALF_OPEN)
+        BREAKER_REJECTED.inc(breaker=self.name)
+        # While a probe runs, look again once it should have finished
+        raise CircuitOpen(self.name, wait if wait > 0 else self.cooldown)
+
+    def record(self, probe: bool, ok: Optional[bool]) -> None:
+        """
+        Report how a call allowed by allow() went.
+
+        Args:
+            probe: What allow() returned
+            ok: True for success, False for a failure of the service, None when
+                the call says nothing about the service (e.g. our own deadline)
+        """
+        try:
+            if ok is None:
+                if probe:
+                    cache.delete(self.probe_key)
+            elif ok:
+                if probe:
+                    cache.delete_many([self.opened_at_key, self.failures_key, self.probe_key])
+                    self._transition(STATE_CLOSED)
+                else:
+                    cache.delete(self.failures_key)
+            elif probe:
+                cache.set(self.opened_at_key, time.time(), OPENED_AT_TTL)
+                cache.delete(self.probe_key)
+                self._transition(STATE_OPEN)
+            else:
+                self._record_failure()
+        except Exception as e:
+            logger.error(f"Circuit {self.name}: failed to record call outcome: {e}")
+
+    def _record_failure(self) -> None:
+        cache.add(self.failures_key, 0, self.window)
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            # The streak expired between add and incr
+            cache.add(self.failures_key, 1, self.window)
+            failures = 1
+        if failures >= self.failure_threshold and cache.add(self.opened_at_key, time.time(), OPENED_AT_TTL):
+            cache.delete(self.failures_key)
+            self._transition(STATE_OPEN)
+
+    def snapshot(self) -> Dict:
+        """Current state for /readyz/"""
+        try:
+            opened_at, failures = (cache.get_many([self.opened_at_key, self.failures_key]).get(key)
+                                   for key in (self.opened_at_key, self.failures_key))
+        except Exception as e:
+            return {"state": "unknown", "error": str(e)}
+        if opened_at is None:
+            return {"state": STATE_CLOSED, "failures": failures or 0}
+        retry_in = max(opened_at + self.cooldown - time.time(), 0.0)
+        return {
+            "state": STATE_OPEN if retry_in > 0 else STATE_HALF_OPEN,
+            "opened_at": opened_at,
+            "retry_in": round(retry_in, 1),
+        }
+
+
+deepseek_breaker = CircuitBreaker(
+    "deepseek",
+    failure_threshold=getattr(settings, 'AI_BREAKER_FAILURE_THRESHOLD', 5),
+    window=getattr(settings, 'AI_BREAKER_WINDOW', 60),
+    cooldown=getattr(settings, 'AI_BREAKER_COOLDOWN', 30),
+    probe_timeout=getattr(settings, 'AI_BREAKER_PROBE_TIMEOUT', 150),
+)
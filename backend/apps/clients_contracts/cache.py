@@ -0,0 +1,1006 @@
+"""
+Caching utilities for GenAI Contract Platform using Redis.
+Provides caching for contracts, AI analysis results, and user sessions.
+"""
+
+import os
+import json
+import math
+import time
+import random
+import hashlib
+import functools
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Callable, Dict, List, Iterable, Tuple
+from django.core.cache import cache
+from django.conf import settings
+from datetime import datetime, timedelta
+import logging
+
+from .cache_codecs import default_codec
+from .deadline import remaining
+
+logger = logging.getLogger(__name__)
+
+# Cache key prefixes
+CONTRACT_PREFIX = "contract:"
+ANALYSIS_PREFIX = "analysis:"
+CLAUSES_PREFIX = "clauses:"
+USER_PREFIX = "user:"
+METRICS_PREFIX = "metrics:"
+CLIENT_PREFIX = "client:"
+NAMESPACE_PREFIX = "ns:"
+LOCK_PREFIX = "lock:"
+
+# Namespaces whose keys embed a generation counter
+CONTRACT_LISTS_NAMESPACE = "contract-lists"
+
+# Keys fetched per SCAN step and deleted per UNLINK call in delete_pattern
+SCAN_BATCH_SIZE = 500
+
+# Default cache timeouts (in seconds)
+DEFAULT_TIMEOUT = getattr(settings, 'CACHE_TTL', 60 * 15)  # 15 minutes
+ANALYSIS_TIMEOUT = 60 * 60 * 2  # 2 hours for AI analysis results
+CLAUSES_TIMEOUT = 60 * 60 * 1  # 1 hour for clause extraction
+METRICS_TIMEOUT = 60 * 5  # 5 minutes for metrics
+USER_TIMEOUT = 60 * 30  # 30 minutes for user data
+
+# In-process tier in front of Redis
+LOCAL_CACHE_ENABLED = getattr(settings, 'LOCAL_CACHE_ENABLED', True)
+LOCAL_CACHE_MAX_ENTRIES = getattr(settings, 'LOCAL_CACHE_MAX_ENTRIES', 2048)
+LOCAL_CACHE_MAX_BYTES = getattr(settings, 'LOCAL_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+LOCAL_CACHE_TTL = getattr(settings, 'LOCAL_CACHE_TTL', 30)
+
+# Pub/sub channel used to evict local entries in every worker
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Stampede protection for get_or_compute / cache_result
+STALE_TTL = getattr(settings, 'CACHE_STALE_TTL', 60 * 5)  # serve expired values this long while refreshing
+XFETCH_BETA = getattr(settings, 'CACHE_XFETCH_BETA', 1.0)  # >1 refreshes earlier, 0 disables early refresh
+LOCK_TIMEOUT = getattr(settings, 'CACHE_LOCK_TIMEOUT', 120)  # must outlast the slowest AI call
+LOCK_WAIT = getattr(settings, 'CACHE_LOCK_WAIT', 30)  # how long a cold miss waits for another worker
+REFRESH_WORKERS = 4
+
+# Marks values stored with their expiry and recompute time
+ENVELOPE_MARKER = "__swr__"
+
+
+class LocalCache:
+    """
+    Bounded LRU/TTL cache held in process memory.
+    
+    Values are stored decoded and shared between callers, so they must be
+    treated as read-only. Both the entry count and the approximate size of
+    the serialized values are capped.
+    """
+    
+    def __init__(self, max_entries: int, max_bytes: int, ttl: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value) and mark the entry as recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+    
+    def set(self, key: str, value: Any, size: int, timeout: Optional[int] = None) -> None:
+        """Store a value, evicting least recently used entries to stay within the caps"""
+        if size > self.max_bytes:
+            return
+        ttl = self.ttl if timeout is None else min(self.ttl, timeout)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+    
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+    
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+
+local_cache = LocalCache(LOCAL_CACHE_MAX_ENTRIES, LOCAL_CACHE_MAX_BYTES, LOCAL_CACHE_TTL)
+
+# Redis tier lookups made by this process, for per-tier hit metrics
+redis_tier_stats = {"hits": 0, "misses": 0}
+_tier_stats_lock = threading.Lock()
+
+
+def _count_redis_lookups(hits: int, misses: int) -> None:
+    with _tier_stats_lock:
+        redis_tier_stats["hits"] += hits
+        redis_tier_stats["misses"] += misses
+
+# Background recomputation of stale entries
+_refresh_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+
+_listener_lock = threading.Lock()
+_listener_pid = None
+# Identifies messages published by this process, which has already applied them
+_origin = uuid.uuid4().hex
+
+
+def _publish_invalidation(keys: Iterable[str] = (), clear: bool = False) -> None:
+    """Tell every worker to drop keys from its local tier"""
+    if not LOCAL_CACHE_ENABLED:
+        return
+    try:
+        from django_redis import get_redis_connection
+        redis_conn = get_redis_connection("default")
+        redis_conn.publish(INVALIDATION_CHANNEL, json.dumps({
+            "origin": _origin, "keys": list(keys), "clear": clear
+        }))
+    except Exception as e:
+        logger.error(f"Failed to publish cache invalidation: {e}")
+
+
+def _ensure_invalidation_listener() -> None:
+    """Start the pub/sub listener thread once per process (again after a fork)"""
+    global _listener_pid, _origin
+    if not LOCAL_CACHE_ENABLED or _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        _listener_pid = os.getpid()
+        _origin = uuid.uuid4().hex
+        thread = threading.Thread(target=_listen_for_invalidations, name="cache-invalidation", daemon=True)
+        thread.start()
+
+
+def _listen_for_invalidations() -> None:
+    """Evict local entries named in invalidation messages, reconnecting on failure"""
+    backoff = 1
+    while True:
+        try:
+            from django_redis import get_redis_connection
+            pubsub = get_redis_connection("default").pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            # Messages sent while we were disconnected are lost; start from a clean tier
+            local_cache.clear()
+            backoff = 1
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if not message or message.get("type") != "message":
+                    continue
+                payload = json.loads(message["data"])
+                if payload.get("origin") == _origin:
+                    continue
+                if payload.get("clear"):
+                    local_cache.clear()
+                for key in payload.get("keys", []):
+                    local_cache.delete(key)
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener disconnected: {e}")
+            local_cache.clear()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+def _is_envelope(entry: Any) -> bool:
+    return isinstance(entry, dict) and entry.get(ENVELOPE_MARKER) == 1
+
+
+def _unwrap(entry: Any) -> Any:
+    """Return the cached value whether or not it was stored with an envelope"""
+    return entry["value"] if _is_envelope(entry) else entry
+
+
+class CacheManager:
+    """Manager class for all caching operations"""
+    
+    @staticmethod
+    def generate_cache_key(prefix: str, identifier: str, *args) -> str:
+        """
+        Generate a consistent cache key with prefix and identifier.
+        
+        Args:
+            prefix: Cache key prefix (e.g., "contract:", "analysis:")
+            identifier: Main identifier (contract_id, user_id, etc.)
+            *args: Additional arguments to include in key
+            
+        Returns:
+            Formatted cache key string
+        """
+        key_parts = [str(identifier)]
+        if args:
+            key_parts.extend([str(arg) for arg in args])
+        key = prefix + ":".join(key_parts)
+        
+        # Hash long keys to avoid Redis key length limits
+        if len(key) > 250:
+            key = f"{prefix}hash_{hashlib.md5(key.encode()).hexdigest()}"
+        
+        return key
+    
+    @staticmethod
+    def set_cache(key: str, value: Any, timeout: int = DEFAULT_TIMEOUT) -> bool:
+        """
+        Set cache value with error handling.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            timeout: Cache timeout in seconds
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            payload = default_codec.encode(value)
+            cache.set(key, payload, timeout)
+            if LOCAL_CACHE_ENABLED:
+                _ensure_invalidation_listener()
+                _publish_invalidation([key])
+                local_cache.set(key, value, len(payload), timeout)
+            logger.info(f"Cached value for key: {key}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to cache value for key {key}: {e}")
+            return False
+    
+    @staticmethod
+    def get_cache(key: str, default: Any = None) -> Any:
+        """
+        Get cache value with error handling.
+        
+        Args:
+            key: Cache key
+            default: Default value if key not found
+            
+        Returns:
+            Cached value or default
+        """
+        try:
+            if LOCAL_CACHE_ENABLED:
+                _ensure_invalidation_listener()
+                found, value = local_cache.get(key)
+                if found:
+                    logger.debug(f"Local cache hit for key: {key}")
+                    return value
+            
+            payload = cache.get(key, default)
+            value = default_codec.decode(payload) if payload is not default else default
+            
+            if value is not default:
+                _count_redis_lookups(1, 0)
+                if LOCAL_CACHE_ENABLED:
+                    size = len(payload) if isinstance(payload, (str, bytes)) else 0
+                    local_cache.set(key, value, size)
+                logger.info(f"Cache hit for key: {key}")
+            else:
+                _count_redis_lookups(0, 1)
+                logger.info(f"Cache miss for key: {key}")
+            
+            return value
+        except Exception as e:
+            logger.error(f"Failed to get cache value for key {key}: {e}")
+            return default
+    
+    @staticmethod
+    def delete_cache(key: str) -> bool:
+        """
+        Delete cache entry.
+        
+        Args:
+            key: Cache key to delete
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            local_cache.delete(key)
+            cache.delete(key)
+            _publish_invalidation([key])
+            logger.info(f"Deleted cache key: {key}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete cache key {key}: {e}")
+            return False
+    
+    @staticmethod
+    def get_many(keys: List[str]) -> Dict[str, Any]:
+        """
+        Get several cache values in one round trip (MGET).
+        
+        Args:
+            keys: Cache keys to fetch
+            
+        Returns:
+            Dict of key -> value for the keys that were found
+        """
+        found = {}
+        remaining = []
+        if LOCAL_CACHE_ENABLED:
+            _ensure_invalidation_listener()
+            for key in keys:
+                hit, value = local_cache.get(key)
+                if hit:
+                    found[key] = value
+                else:
+                    remaining.append(key)
+        else:
+            remaining = list(keys)
+        
+        if not remaining:
+            return found
+        try:
+            payloads = cache.get_many(remaining)
+        except Exception as e:
+            logger.error(f"Failed to get {len(remaining)} cache keys: {e}")
+            return found
+        
+        hits = 0
+        for key, payload in payloads.items():
+            try:
+                value = default_codec.decode(payload)
+            except Exception as e:
+                # Unreadable here (e.g. written by a worker with another codec): a miss, like get_cache
+                logger.error(f"Failed to decode cache value for key {key}: {e}")
+                continue
+            found[key] = value
+            hits += 1
+            if LOCAL_CACHE_ENABLED:
+                size = len(payload) if isinstance(payload, (str, bytes)) else 0
+                local_cache.set(key, value, size)
+        _count_redis_lookups(hits, len(remaining) - hits)
+        logger.info(f"Cache get_many: {len(found)}/{len(keys)} hits")
+        return found
+    
+    @staticmethod
+    def set_many(values: Dict[str, Any], timeout: int = DEFAULT_TIMEOUT) -> bool:
+        """
+        Set several cache values in one pipelined round trip.
+        
+        Args:
+            values: Dict of key -> value
+            timeout: Cache timeout in seconds
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not values:
+            return True
+        try:
+            payloads = {key: default_codec.encode(value) for key, value in values.items()}
+            cache.set_many(payloads, timeout)
+            if LOCAL_CACHE_ENABLED:
+                _ensure_invalidation_listener()
+                _publish_invalidation(list(payloads))
+                for key, payload in payloads.items():
+                    local_cache.set(key, values[key], len(payload), timeout)
+            logger.info(f"Cached {len(payloads)} values with set_many")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to cache {len(values)} values: {e}")
+            return False
+    
+    @staticmethod
+    def delete_many(keys: List[str]) -> bool:
+        """
+        Delete several cache entries with a single DEL.
+        
+        Args:
+            keys: Cache keys to delete
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not keys:
+            return True
+        try:
+            for key in keys:
+                local_cache.delete(key)
+            cache.delete_many(keys)
+            _publish_invalidation(keys)
+            logger.info(f"Deleted {len(keys)} cache keys")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete {len(keys)} cache keys: {e}")
+            return False
+    
+    @staticmethod
+    def delete_pattern(pattern: str) -> int:
+        """
+        Delete cache entries matching a pattern.
+        
+        Args:
+            pattern: Pattern to match (e.g., "contract:user:123:*")
+            
+        Returns:
+            Number of keys deleted
+            
+        Walks the keyspace with SCAN and unlinks matches in batches, so Redis
+        is never blocked the way KEYS blocks it. This is still O(keyspace);
+        hot invalidation paths should bump a namespace instead.
+        """
+        try:
+            from django_redis import get_redis_connection
+            redis_conn = get_redis_connection("default")
+            deleted = 0
+            batch = []
+            for key in redis_conn.scan_iter(match=cache.make_key(pattern), count=SCAN_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= SCAN_BATCH_SIZE:
+                    deleted += redis_conn.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += redis_conn.unlink(*batch)
+            # Local tiers are keyed by plain names, so drop them wholesale
+            local_cache.clear()
+            _publish_invalidation(clear=True)
+            logger.info(f"Deleted {deleted} cache keys matching pattern: {pattern}")
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to delete cache pattern {pattern}: {e}")
+            return 0
+
+    @staticmethod
+    def get_namespace_version(namespace: str) -> int:
+        """
+        Get the current generation of a key namespace.
+        
+        A missing counter is seeded from the clock rather than 1, so an
+        evicted counter can never bring back keys from an older generation.
+        """
+        key = f"{NAMESPACE_PREFIX}{namespace}"
+        try:
+            found, version = local_cache.get(key) if LOCAL_CACHE_ENABLED else (False, None)
+            if found:
+                return version
+            version = cache.get(key)
+            if version is None:
+                cache.add(key, int(time.time() * 1000), None)
+                version = cache.get(key)
+            version = int(version)
+            if LOCAL_CACHE_ENABLED:
+                _ensure_invalidation_listener()
+                local_cache.set(key, version, len(key))
+            return version
+        except Exception as e:
+            logger.error(f"Failed to get namespace version {namespace}: {e}")
+            return 0
+    
+    @staticmethod
+    def bump_namespace(namespace: str) -> bool:
+        """
+        Invalidate every key in a namespace in O(1) by bumping its generation.
+        Keys of older generations are never read again and expire on their TTL.
+        """
+        key = f"{NAMESPACE_PREFIX}{namespace}"
+        try:
+            try:
+                cache.incr(key)
+            except ValueError:
+                # No counter yet: readers will seed a fresh one from the clock
+                pass
+            local_cache.delete(key)
+            _publish_invalidation([key])
+            logger.info(f"Bumped cache namespace: {namespace}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to bump namespace {namespace}: {e}")
+            return False
+    
+    @staticmethod
+    def acquire_lock(key: str, timeout: int = LOCK_TIMEOUT) -> Optional[str]:
+        """
+        Take the recompute lock for a key.
+        
+        Args:
+            key: Cache key being recomputed
+            timeout: Seconds after which an abandoned lock expires
+            
+        Returns:
+            Lock token if acquired, None if another caller holds it
+        """
+        token = uuid.uuid4().hex
+        try:
+            if cache.add(f"{LOCK_PREFIX}{key}", token, timeout):
+                return token
+        except Exception as e:
+            logger.error(f"Failed to acquire lock for key {key}: {e}")
+            # Without Redis there is nobody to coordinate with
+            return token
+        return None
+    
+    @staticmethod
+    def release_lock(key: str, token: str) -> None:
+        """Release a recompute lock if it is still held by this token"""
+        lock_key = f"{LOCK_PREFIX}{key}"
+        try:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+        except Exception as e:
+            logger.error(f"Failed to release lock for key {key}: {e}")
+    
+    @staticmethod
+    def get_or_compute(key: str, compute: Callable[[], Any], timeout: int = DEFAULT_TIMEOUT,
+                       stale_ttl: int = STALE_TTL, beta: float = XFETCH_BETA,
+                       should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Read-through cache lookup that recomputes each value at most once at a time.
+        
+        Values are stored with their logical expiry and the time the last
+        recompute took. Callers refresh a value early with a probability that
+        grows as expiry approaches (XFetch), and past expiry the stale value is
+        served for up to stale_ttl seconds while a single background task holding
+        the recompute lock refreshes it. On a cold miss one caller computes and
+        the others wait for its result.
+        
+        Args:
+            key: Cache key
+            compute: Zero-argument callable producing the value
+            timeout: Seconds the value counts as fresh
+            stale_ttl: Seconds past expiry the value may still be served
+            beta: XFetch aggressiveness; 0 disables early refresh
+            should_cache: Predicate deciding whether a computed value is stored
+            
+        Returns:
+            Cached, stale or freshly computed value
+        """
+        entry = CacheManager.get_cache(key)
+        if _is_envelope(entry):
+            jitter = entry["delta"] * beta * math.log(1.0 - random.random())
+            if time.time() - jitter < entry["expiry"]:
+                return entry["value"]
+            CacheManager._refresh_in_background(key, compute, timeout, stale_ttl, should_cache)
+            return entry["value"]
+        
+        token = CacheManager.acquire_lock(key)
+        if token is None:
+            entry = CacheManager._wait_for_entry(key)
+            if entry is not None:
+                return entry["value"]
+            logger.warning(f"Gave up waiting for recompute of key {key}")
+            return CacheManager._compute_and_store(key, compute, timeout, stale_ttl, should_cache)
+        try:
+            return CacheManager._compute_and_store(key, compute, timeout, stale_ttl, should_cache)
+        finally:
+            CacheManager.release_lock(key, token)
+    
+    @staticmethod
+    def _compute_and_store(key: str, compute: Callable[[], Any], timeout: int, stale_ttl: int,
+                           should_cache: Optional[Callable[[Any], bool]]) -> Any:
+        started = time.time()
+        value = compute()
+        delta = time.time() - started
+        if value is not None and (should_cache is None or should_cache(value)):
+            envelope = {ENVELOPE_MARKER: 1, "value": value, "delta": delta, "expiry": time.time() + timeout}
+            CacheManager.set_cache(key, envelope, timeout + stale_ttl)
+        return value
+    
+    @staticmethod
+    def _refresh_in_background(key: str, compute: Callable[[], Any], timeout: int, stale_ttl: int,
+                               should_cache: Optional[Callable[[Any], bool]]) -> None:
+        token = CacheManager.acquire_lock(key)
+        if token is None:
+            return
+        
+        def refresh():
+            try:
+                CacheManager._compute_and_store(key, compute, timeout, stale_ttl, should_cache)
+            except Exception as e:
+                logger.error(f"Background refresh failed for key {key}: {e}")
+            finally:
+                CacheManager.release_lock(key, token)
+        
+        logger.info(f"Refreshing cache key in background: {key}")
+        _refresh_executor.submit(refresh)
+    
+    @staticmethod
+    def _wait_for_entry(key: str, max_wait: float = LOCK_WAIT) -> Optional[Dict]:
+        """Wait for the lock holder to store a value, returning None if it never does"""
+        left = remaining()
+        if left is not None:
+            # Never wait past the request's own deadline
+            max_wait = min(max_wait, max(left, 0.0))
+        deadline = time.monotonic() + max_wait
+        delay = 0.05
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
+            entry = CacheManager.get_cache(key)
+            if _is_envelope(entry):
+                return entry
+            try:
+                if cache.get(f"{LOCK_PREFIX}{key}") is None:
+                    # The holder finished without storing anything
+                    return None
+            except Exception:
+                return None
+        return None
+    
+    @staticmethod
+    def generate_versioned_key(namespace: str, prefix: str, identifier: str, *args) -> str:
+        """Generate a cache key that embeds the current generation of a namespace"""
+        version = CacheManager.get_namespace_version(namespace)
+        return CacheManager.generate_cache_key(prefix, identifier, *args, f"v{version}")
+
+
+class ContractCache:
+    """Caching utilities specific to contracts"""
+    
+    @staticmethod
+    def cache_contract(contract_id: str, contract_data: Dict) -> bool:
+        """Cache contract data"""
+        key = CacheManager.generate_cache_key(CONTRACT_PREFIX, contract_id)
+        return CacheManager.set_cache(key, contract_data, DEFAULT_TIMEOUT)
+    
+    @staticmethod
+    def get_contract(contract_id: str) -> Optional[Dict]:
+        """Get cached contract data"""
+        key = CacheManager.generate_cache_key(CONTRACT_PREFIX, contract_id)
+        return CacheManager.get_cache(key)
+    
+    @staticmethod
+    def cache_user_contracts(user_id: str, contracts: List[Dict]) -> bool:
+        """Cache user's contracts list"""
+        key = CacheManager.generate_versioned_key(CONTRACT_LISTS_NAMESPACE, CONTRACT_PREFIX, "user", user_id)
+        return CacheManager.set_cache(key, contracts, DEFAULT_TIMEOUT)
+    
+    @staticmethod
+    def get_user_contracts(user_id: str) -> Optional[List[Dict]]:
+        """Get cached user contracts list"""
+        key = CacheManager.generate_versioned_key(CONTRACT_LISTS_NAMESPACE, CONTRACT_PREFIX, "user", user_id)
+        return CacheManager.get_cache(key)
+    
+    @staticmethod
+    def cache_contract_summaries(summaries: Dict[str, Dict]) -> bool:
+        """Cache hot-document summaries (no bodies) keyed by contract id"""
+        return CacheManager.set_many({
+            CacheManager.generate_cache_key(CONTRACT_PREFIX, "summary", contract_id): summary
+            for contract_id, summary in summaries.items()
+        }, DEFAULT_TIMEOUT)
+    
+    @staticmethod
+    def get_contract_summaries(contract_ids: List[str]) -> Dict[str, Dict]:
+        """Get cached summaries for several contracts, keyed by contract id"""
+        keys = {
+            CacheManager.generate_cache_key(CONTRACT_PREFIX, "summary", contract_id): contract_id
+            for contract_id in contract_ids
+        }
+        found = CacheManager.get_many(list(keys))
+        return {keys[key]: summary for key, summary in found.items()}
+    
+    @staticmethod
+    def invalidate_contract(contract_id: str) -> bool:
+        """Invalidate all cache entries for a contract"""
+        return ContractCache.invalidate_contracts([contract_id])
+    
+    @staticmethod
+    def invalidate_contracts(contract_ids: List[str]) -> bool:
+        """Invalidate all cache entries for several contracts in one round trip"""
+        keys = []
+        for contract_id in contract_ids:
+            # Contract data, its list summary and clauses. Analyses are keyed by
+            # contract version, so a write retires them without a delete.
+            keys.append(CacheManager.generate_cache_key(CONTRACT_PREFIX, contract_id))
+            keys.append(CacheManager.generate_cache_key(CONTRACT_PREFIX, "summary", contract_id))
+            keys.append(CacheManager.generate_cache_key(CLAUSES_PREFIX, contract_id))
+        CacheManager.delete_many(keys)
+        
+        # Retire every user contracts list that might include these contracts
+        CacheManager.bump_namespace(CONTRACT_LISTS_NAMESPACE)
+        
+        logger.info(f"Invalidated cache for {len(contract_ids)} contract(s)")
+        return True
+
+
+class AnalysisCache:
+    """Caching utilities for AI analysis results"""
+    
+    @staticmethod
+    def cache_analysis(contract_id: str, version: int, analysis_data: Dict) -> bool:
+        """Cache AI analysis result as read at one contract version"""
+        key = CacheManager.generate_cache_key(ANALYSIS_PREFIX, contract_id, f"v{version}")
+        return CacheManager.set_cache(key, analysis_data, ANALYSIS_TIMEOUT)
+    
+    @staticmethod
+    def get_analysis(contract_id: str, version: int) -> Optional[Dict]:
+        """
+        Get cached AI analysis result for one contract version. Every write
+        bumps the version, so a reader never gets an analysis cached before
+        a reanalysis it has already seen in the contract.
+        """
+        key = CacheManager.generate_cache_key(ANALYSIS_PREFIX, contract_id, f"v{version}")
+        return _unwrap(CacheManager.get_cache(key))
+    
+    @staticmethod
+    def get_or_compute_analysis(contract_id: str, version: int, compute: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """Get a contract's analysis at a version, computing it once across concurrent callers"""
+        key = CacheManager.generate_cache_key(ANALYSIS_PREFIX, contract_id, f"v{version}")
+        return CacheManager.get_or_compute(key, compute, ANALYSIS_TIMEOUT)
+    
+    @staticmethod
+    def cache_clauses(contract_id: str, clauses_data: Dict) -> bool:
+        """Cache clause extraction result"""
+        key = CacheManager.generate_cache_key(CLAUSES_PREFIX, contract_id)
+        return CacheManager.set_cache(key, clauses_data, CLAUSES_TIMEOUT)
+    
+    @staticmethod
+    def get_clauses(contract_id: str) -> Optional[Dict]:
+        """Get cached clause extraction result"""
+        key = CacheManager.generate_cache_key(CLAUSES_PREFIX, contract_id)
+        return CacheManager.get_cache(key)
+    
+    @staticmethod
+    def cache_contract_hash(contract_text: str, analysis_result: Dict) -> bool:
+        """Cache analysis result by contract text hash (for duplicate detection)"""
+        text_hash = hashlib.sha256(contract_text.encode()).hexdigest()
+        key = CacheManager.generate_cache_key(ANALYSIS_PREFIX, "hash", text_hash)
+        return CacheManager.set_cache(key, analysis_result, ANALYSIS_TIMEOUT)
+    
+    @staticmethod
+    def get_analysis_by_hash(contract_text: str) -> Optional[Dict]:
+        """Get cached analysis by contract text hash"""
+        text_hash = hashlib.sha256(contract_text.encode()).hexdigest()
+        key = CacheManager.generate_cache_key(ANALYSIS_PREFIX, "hash", text_hash)
+        return _unwrap(CacheManager.get_cache(key))
+    
+    @staticmethod
+    def get_or_compute_by_hash(contract_text: str, compute: Callable[[], Optional[Dict]],
+                               should_cache: Optional[Callable[[Dict], bool]] = None) -> Optional[Dict]:
+        """Get the analysis of a contract text, calling the AI once across concurrent callers"""
+        text_hash = hashlib.sha256(contract_text.encode()).hexdigest()
+        key = CacheManager.generate_cache_key(ANALYSIS_PREFIX, "hash", text_hash)
+        return CacheManager.get_or_compute(key, compute, ANALYSIS_TIMEOUT, should_cache=should_cache)
+    
+    @staticmethod
+    def get_or_compute_evaluation(contract_text: str, compute: Callable[[], Optional[Dict]],
+                                  should_cache: Optional[Callable[[Dict], bool]] = None) -> Optional[Dict]:
+        """Get the approval evaluation of a contract text, calling the AI once across concurrent callers"""
+        text_hash = hashlib.sha256(contract_text.encode()).hexdigest()
+        key = CacheManager.generate_cache_key(ANALYSIS_PREFIX, "evaluation", text_hash)
+        return CacheManager.get_or_compute(key, compute, ANALYSIS_TIMEOUT, should_cache=should_cache)
+
+
+class UserCache:
+    """Caching utilities for user data"""
+    
+    @staticmethod
+    def cache_user_session(user_id: str, session_data: Dict) -> bool:
+        """Cache user session data"""
+        key = CacheManager.generate_cache_key(USER_PREFIX, "session", user_id)
+        return CacheManager.set_cache(key, session_data, USER_TIMEOUT)
+    
+    @staticmethod
+    def get_user_session(user_id: str) -> Optional[Dict]:
+        """Get cached user session data"""
+        key = CacheManager.generate_cache_key(USER_PREFIX, "session", user_id)
+        return CacheManager.get_cache(key)
+    
+    @staticmethod
+    def cache_user_preferences(user_id: str, preferences: Dict) -> bool:
+        """Cache user preferences"""
+        key = CacheManager.generate_cache_key(USER_PREFIX, "prefs", user_id)
+        return CacheManager.set_cache(key, preferences, USER_TIMEOUT * 4)  # Longer timeout
+    
+    @staticmethod
+    def get_user_preferences(user_id: str) -> Optional[Dict]:
+        """Get cached user preferences"""
+        key = CacheManager.generate_cache_key(USER_PREFIX, "prefs", user_id)
+        return CacheManager.get_cache(key)
+
+
+class MetricsCache:
+    """Caching utilities for system metrics"""
+    
+    @staticmethod
+    def cache_metrics(metrics_data: Dict) -> bool:
+        """Cache system metrics"""
+        key = CacheManager.generate_cache_key(METRICS_PREFIX, "system")
+        return CacheManager.set_cache(key, metrics_data, METRICS_TIMEOUT)
+    
+    @staticmethod
+    def get_metrics() -> Optional[Dict]:
+        """Get cached system metrics"""
+        key = CacheManager.generate_cache_key(METRICS_PREFIX, "system")
+        return CacheManager.get_cache(key)
+    
+    @staticmethod
+    def increment_counter(counter_name: str, increment: int = 1) -> int:
+        """Increment a counter in cache"""
+        try:
+            from django_redis import get_redis_connection
+            redis_conn = get_redis_connection("default")
+            key = CacheManager.generate_cache_key(METRICS_PREFIX, "counter", counter_name)
+            return redis_conn.incr(key, increment)
+        except Exception as e:
+            logger.error(f"Failed to increment counter {counter_name}: {e}")
+            return 0
+    
+    @staticmethod
+    def get_counter(counter_name: str) -> int:
+        """Get counter value"""
+        try:
+            from django_redis import get_redis_connection
+            redis_conn = get_redis_connection("default")
+            key = CacheManager.generate_cache_key(METRICS_PREFIX, "counter", counter_name)
+            value = redis_conn.get(key)
+            return int(value) if value else 0
+        except Exception as e:
+            logger.error(f"Failed to get counter {counter_name}: {e}")
+            return 0
+
+
+class ClientCache:
+    """Caching utilities for client data"""
+    
+    @staticmethod
+    def cache_client(client_id: str, client_data: Dict) -> bool:
+        """Cache client data"""
+        key = CacheManager.generate_cache_key(CLIENT_PREFIX, client_id)
+        return CacheManager.set_cache(key, client_data, DEFAULT_TIMEOUT)
+    
+    @staticmethod
+    def get_client(client_id: str) -> Optional[Dict]:
+        """Get cached client data"""
+        key = CacheManager.generate_cache_key(CLIENT_PREFIX, client_id)
+        return CacheManager.get_cache(key)
+    
+    @staticmethod
+    def cache_all_clients(clients: List[Dict]) -> bool:
+        """Cache all clients list"""
+        key = CacheManager.generate_cache_key(CLIENT_PREFIX, "all")
+        return CacheManager.set_cache(key, clients, DEFAULT_TIMEOUT)
+    
+    @staticmethod
+    def get_all_clients() -> Optional[List[Dict]]:
+        """Get cached all clients list"""
+        key = CacheManager.generate_cache_key(CLIENT_PREFIX, "all")
+        return CacheManager.get_cache(key)
+    
+    @staticmethod
+    def invalidate_client(client_id: str) -> bool:
+        """Invalidate cache for a client"""
+        client_key = CacheManager.generate_cache_key(CLIENT_PREFIX, client_id)
+        all_clients_key = CacheManager.generate_cache_key(CLIENT_PREFIX, "all")
+        
+        CacheManager.delete_cache(client_key)
+        CacheManager.delete_cache(all_clients_key)
+        
+        logger.info(f"Invalidated cache for client: {client_id}")
+        return True
+
+
+# Decorator for caching function results
+def make_function_key(key_prefix: str, func: Callable, args: tuple, kwargs: dict) -> str:
+    """
+    Build a stable cache key for a function call.
+    
+    Arguments are hashed from their canonical JSON form, so keys do not depend
+    on kwarg order or contain separators taken from argument values.
+    """
+    arguments = json.dumps([list(args), kwargs], default=str, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(arguments.encode()).hexdigest()
+    return CacheManager.generate_cache_key(f"{key_prefix}:", f"{func.__module__}.{func.__qualname__}", digest)
+
+
+def cache_result(timeout: int = DEFAULT_TIMEOUT, key_prefix: str = "func", stale_ttl: int = STALE_TTL):
+    """
+    Decorator to cache function results.
+    
+    Results go through CacheManager.get_or_compute, so an expiring key is
+    recomputed by one caller while the others keep getting the previous value.
+    None results are not cached.
+    
+    Args:
+        timeout: Cache timeout in seconds
+        key_prefix: Prefix for cache keys
+        stale_ttl: Seconds an expired result may be served while it is refreshed
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = make_function_key(key_prefix, func, args, kwargs)
+            return CacheManager.get_or_compute(cache_key, lambda: func(*args, **kwargs), timeout, stale_ttl)
+        return wrapper
+    return decorator
+
+
+# Utility functions for cache health monitoring
+def get_cache_stats() -> Dict[str, Any]:
+    """Get cache statistics and health information"""
+    try:
+        from django_redis import get_redis_connection
+        redis_conn = get_redis_connection("default")
+        
+        info = redis_conn.info()
+        stats = {
+            "redis_version": info.get("redis_version"),
+            "used_memory": info.get("used_memory_human"),
+            "connected_clients": info.get("connected_clients"),
+            "total_commands_processed": info.get("total_commands_processed"),
+            "keyspace_hits": info.get("keyspace_hits", 0),
+            "keyspace_misses": info.get("keyspace_misses", 0),
+            "used_memory_peak": info.get("used_memory_peak_human"),
+        }
+        
+        # Calculate hit rate
+        hits = stats["keyspace_hits"]
+        misses = stats["keyspace_misses"]
+        total = hits + misses
+        if total > 0:
+            stats["hit_rate"] = round((hits / total) * 100, 2)
+        else:
+            stats["hit_rate"] = 0
+        
+        return stats
+    except Exception as e:
+        logger.error(f"Failed to get cache stats: {e}")
+        return {"error": str(e)}
+
+
+def get_tier_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit statistics of the local and Redis tiers in this process"""
+    with _tier_stats_lock:
+        hits, misses = redis_tier_stats["hits"], redis_tier_stats["misses"]
+    total = hits + misses
+    return {
+        "local": local_cache.stats(),
+        "redis": {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+        },
+    }
+
+
+def clear_all_cache() -> bool:
+    """Clear all cache entries (use with caution)"""
+    try:
+        local_cache.clear()
+        cache.clear()
+        _publish_invalidation(clear=True)
+        logger.warning("All cache entries cleared")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to clear cache: {e}")
+        return False 
\ No newline at end of file
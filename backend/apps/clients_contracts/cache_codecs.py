@@ -0,0 +1,216 @@
+"""
+Codecs for values stored in the Redis cache.
+
+Every value is written as a framed payload:
+
+    magic (2 bytes) | version (1) | format (1) | compression (1) | body
+
+The format byte says how the body was serialized (utf-8 string, raw bytes,
+JSON or msgpack) and the compression byte which compressor was applied, so
+readers never have to guess whether a string is JSON and settings can change
+without invalidating what is already cached. Values written before the codec
+existed carry no header and are still decoded the old way.
+
+orjson, msgpack, zstandard and lz4 are optional; when one is missing the
+codec falls back to the stdlib json module and zlib.
+"""
+
+import json
+import logging
+import zlib
+from typing import Any, Callable, Dict, Tuple
+
+from django.conf import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"\xc7\x01"
+VERSION = 1
+HEADER_SIZE = len(MAGIC) + 3
+
+# Format bytes
+FORMAT_STR = 0
+FORMAT_BYTES = 1
+FORMAT_JSON = 2
+FORMAT_MSGPACK = 3
+
+# Compression bytes
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_LZ4 = 3
+
+CACHE_SERIALIZER = getattr(settings, 'CACHE_SERIALIZER', 'json')
+CACHE_COMPRESSOR = getattr(settings, 'CACHE_COMPRESSOR', 'zstd')
+CACHE_COMPRESS_MIN_BYTES = getattr(settings, 'CACHE_COMPRESS_MIN_BYTES', 1024)
+
+
+def _json_dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=str, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+# name -> (format byte, dumps, loads)
+SERIALIZERS: Dict[str, Tuple[int, Callable, Callable]] = {
+    "json": (FORMAT_JSON, _json_dumps, _json_loads),
+}
+if msgpack is not None:
+    SERIALIZERS["msgpack"] = (FORMAT_MSGPACK, _msgpack_dumps, _msgpack_loads)
+
+# name -> (compression byte, compress, decompress)
+COMPRESSORS: Dict[str, Tuple[int, Callable, Callable]] = {
+    "none": (COMPRESSION_NONE, bytes, bytes),
+    "zlib": (COMPRESSION_ZLIB, lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = (COMPRESSION_ZSTD, _zstd_compress, _zstd_decompress)
+if lz4_frame is not None:
+    COMPRESSORS["lz4"] = (COMPRESSION_LZ4, lz4_frame.compress, lz4_frame.decompress)
+
+
+class CacheCodec:
+    """
+    Encode and decode framed cache payloads.
+
+    Args:
+        serializer: Name of a registered serializer ("json" or "msgpack")
+        compressor: Name of a registered compressor ("zstd", "lz4", "zlib" or "none")
+        compress_min_bytes: Bodies smaller than this are stored uncompressed
+    """
+
+    def __init__(self, serializer: str = "json", compressor: str = "zlib", compress_min_bytes: int = 1024):
+        if serializer not in SERIALIZERS:
+            logger.warning(f"Cache serializer {serializer!r} unavailable, using json")
+            serializer = "json"
+        if compressor not in COMPRESSORS:
+            logger.warning(f"Cache compressor {compressor!r} unavailable, using zlib")
+            compressor = "zlib"
+        self.serializer = serializer
+        self.compressor = compressor
+        self.compress_min_bytes = compress_min_bytes
+        self._format, self._dumps, _ = SERIALIZERS[serializer]
+        self._compression, self._compress, _ = COMPRESSORS[compressor]
+        self._loaders = {fmt: loads for fmt, _, loads in SERIALIZERS.values()}
+        self._decompressors = {comp: decompress for comp, _, decompress in COMPRESSORS.values()}
+
+    def encode(self, value: Any) -> bytes:
+        """
+        Serialize a value into a framed payload.
+
+        Args:
+            value: String, bytes or JSON-compatible value
+
+        Returns:
+            Header followed by the (possibly compressed) body
+        """
+        if isinstance(value, str):
+            fmt, body = FORMAT_STR, value.encode("utf-8")
+        elif isinstance(value, (bytes, bytearray)):
+            fmt, body = FORMAT_BYTES, bytes(value)
+        else:
+            fmt, body = self._format, self._dumps(value)
+
+        compression = COMPRESSION_NONE
+        if self._compression != COMPRESSION_NONE and len(body) >= self.compress_min_bytes:
+            compressed = self._compress(body)
+            # Incompressible bodies are kept as they are
+            if len(compressed) < len(body):
+                compression, body = self._compression, compressed
+
+        return MAGIC + bytes((VERSION, fmt, compression)) + body
+
+    def decode(self, payload: Any) -> Any:
+        """
+        Deserialize a payload written by encode() or by the pre-codec cache.
+
+        Args:
+            payload: Raw value returned by the cache backend
+
+        Returns:
+            Decoded value
+        """
+        if not is_framed(payload):
+            return decode_legacy(payload)
+
+        fmt, compression = payload[3], payload[4]
+        body = payload[HEADER_SIZE:]
+        if compression != COMPRESSION_NONE:
+            decompress = self._decompressors.get(compression)
+            if decompress is None:
+                raise ValueError(f"Unsupported cache compression: {compression}")
+            body = decompress(body)
+
+        if fmt == FORMAT_STR:
+            return body.decode("utf-8")
+        if fmt == FORMAT_BYTES:
+            return body
+        loads = self._loaders.get(fmt)
+        if loads is None:
+            raise ValueError(f"Unsupported cache format: {fmt}")
+        return loads(body)
+
+
+def is_framed(payload: Any) -> bool:
+    """Check whether a raw cache value carries the codec header"""
+    return (
+        isinstance(payload, (bytes, bytearray))
+        and len(payload) >= HEADER_SIZE
+        and payload[:len(MAGIC)] == MAGIC
+        and payload[2] == VERSION
+    )
+
+
+def decode_legacy(payload: Any) -> Any:
+    """Decode values cached as JSON text before the codec layer was added"""
+    if payload and isinstance(payload, str):
+        try:
+            return json.loads(payload)
+        except (json.JSONDecodeError, TypeError):
+            return payload
+    return payload
+
+
+default_codec = CacheCodec(CACHE_SERIALIZER, CACHE_COMPRESSOR, CACHE_COMPRESS_MIN_BYTES)
@@ -0,0 +1,295 @@
+"""
+Content-negotiated response compression (zstd, brotli, gzip).
+
+Contract details and analyses are hundreds of KB of prose, and clients that
+reach the backend directly (the Next.js server, scripts) get them without
+nginx in between. CompressionMiddleware picks the best encoding the client
+accepts, in the server's order of preference:
+
+    zstd   needs zstandard       fast, good ratio
+    br     needs brotli          best ratio, slow at high quality
+    gzip   stdlib                understood everywhere
+
+and compresses text-like responses of at least COMPRESSION_MIN_SIZE bytes.
+Streaming responses are compressed chunk by chunk and flushed after each
+chunk, so the client still receives each batch when it is produced.
+
+Compressed responses get Vary: Accept-Encoding. As with Django's
+GZipMiddleware, a strong ETag becomes weak, since the bytes now differ.
+If-None-Match uses weak comparison, so revalidation still matches.
+
+Bodies that can't change for a given key, such as an analysis at one
+version, can be marked with precompress(response, key). The first request
+gets the fast level, while a background thread compresses the body at the
+highest level and caches it per encoding; later requests skip the
+compressor. The key must change whenever the body does; the view's ETag is
+the natural choice.
+"""
+
+import gzip
+import logging
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .aio import run_sync
+from .cache import CacheManager, ANALYSIS_TIMEOUT
+from .timing import span
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SIZE = 1024
+
+# Prefixes of content types worth compressing
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript", "application/xml",
+    "application/vnd.oai.openapi", "image/svg+xml", "text/",
+)
+
+COMPRESSED_PREFIX = "compressed:"
+PRECOMPRESS_ATTRIBUTE = "precompressed_key"
+PRECOMPRESSED_TIMEOUT = ANALYSIS_TIMEOUT
+
+# Bodies compressed in the request path use fast levels; precompressed ones
+# are compressed once and served many times, so they get the best ratio. At
+# these levels a large analysis takes hundreds of ms, so that happens in the
+# background, one body at a time, and never on the run_sync pool.
+FAST_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+BEST_LEVELS = {"zstd": 19, "br": 11, "gzip": 9}
+MAX_PENDING_PRECOMPRESS = 32
+
+_precompress_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precompress")
+_pending_precompress = set()
+_pending_lock = threading.Lock()
+
+
+def _gzip_stream(level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def _zstd_stream(level):
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return (compressor.compress, lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+            compressor.flush)
+
+
+def _brotli_stream(level):
+    compressor = brotli.Compressor(quality=level)
+    return compressor.process, compressor.flush, compressor.finish
+
+
+# name -> (one-shot compress(data, level), streaming factory(level) -> (compress, flush, finish))
+ENCODERS: Dict[str, Tuple[Callable, Callable]] = {
+    "gzip": (lambda data, level: gzip.compress(data, level, mtime=0), _gzip_stream),
+}
+if zstandard is not None:
+    ENCODERS["zstd"] = (lambda data, level: zstandard.ZstdCompressor(level=level).compress(data), _zstd_stream)
+if brotli is not None:
+    ENCODERS["br"] = (lambda data, level: brotli.compress(data, quality=level), _brotli_stream)
+
+
+def available_encodings():
+    """Supported encodings in the server's order of preference"""
+    preferred = getattr(settings, 'COMPRESSION_ENCODINGS', ("zstd", "br", "gzip"))
+    return [name for name in preferred if name in ENCODERS]
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}"""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header: str, encodings=None) -> Optional[str]:
+    """
+    The encoding to use for a request.
+
+    Args:
+        header: Accept-Encoding value
+        encodings: Candidates in preference order, available_encodings() by default
+
+    Returns:
+        Encoding name, or None to send the body as it is
+    """
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for name in encodings if encodings is not None else available_encodings():
+        q = accepted.get(name, accepted.get("*", 0.0))
+        # Ties go to the server's preference
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    compress_once, _ = ENCODERS[encoding]
+    return compress_once(data, (BEST_LEVELS if best else FAST_LEVELS)[encoding])
+
+
+def compress_stream(chunks: Iterator[bytes], encoding: str) -> Iterator[bytes]:
+    """Compress a sync chunk iterator, flushing after every chunk"""
+    process, flush, finish = ENCODERS[encoding][1](FAST_LEVELS[encoding])
+    for chunk in chunks:
+        data = process(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+async def compress_stream_async(chunks: AsyncIterator[bytes], encoding: str) -> AsyncIterator[bytes]:
+    """Same as compress_stream, for the async iterators served under ASGI"""
+    process, flush, finish = ENCODERS[encoding][1](FAST_LEVELS[encoding])
+    async for chunk in chunks:
+        data = process(chunk) + flush()
+        if data:
+            yield data
+    yield finish()
+
+
+def precompress(response, key: str):
+    """Mark a response whose body never changes for `key` (e.g. its ETag); returns it"""
+    setattr(response, PRECOMPRESS_ATTRIBUTE, key)
+    return response
+
+
+def _store_best(cache_key: str, content: bytes, encoding: str) -> None:
+    try:
+        CacheManager.set_cache(cache_key, compress(content, encoding, best=True), PRECOMPRESSED_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Failed to precompress {cache_key}: {e}")
+    finally:
+        with _pending_lock:
+            _pending_precompress.discard(cache_key)
+
+
+def precompressed_body(key: str, content: bytes, encoding: str) -> bytes:
+    """
+    Compressed body for an immutable response: the cached best-level copy,
+    or until that is ready, a fast-level one while the best-level copy is
+    built in the background.
+    """
+    cache_key = CacheManager.generate_cache_key(COMPRESSED_PREFIX, key, encoding)
+    body = CacheManager.get_cache(cache_key)
+    if body is not None:
+        return body
+    body = compress(content, encoding)
+    with _pending_lock:
+        schedule = cache_key not in _pending_precompress and len(_pending_precompress) < MAX_PENDING_PRECOMPRESS
+        if schedule:
+            _pending_precompress.add(cache_key)
+    if schedule:
+        _precompress_executor.submit(_store_best, cache_key, content, encoding)
+    return body
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses for clients that accept it. Place it near the top
+    of MIDDLEWARE, above anything that reads or writes the body. Works under
+    WSGI and ASGI; under ASGI, large bodies are compressed on the I/O pool
+    so the event loop keeps serving other requests.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', DEFAULT_MIN_SIZE)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        encoding = self.negotiate(request, response)
+        if encoding is None:
+            return response
+        if response.streaming:
+            return self.compress_streaming(response, encoding)
+        return self.compress_content(response, encoding)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        encoding = self.negotiate(request, response)
+        if encoding is None:
+            return response
+        if response.streaming:
+            return self.compress_streaming(response, encoding)
+        return await run_sync(self.compress_content, response, encoding)
+
+    def negotiate(self, request, response) -> Optional[str]:
+        """The encoding for this response, or None to leave it alone"""
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return None
+        if response.has_header("Content-Encoding") or "no-transform" in response.get("Cache-Control", ""):
+            return None
+        if not response.get("Content-Type", "").startswith(COMPRESSIBLE_TYPES):
+            return None
+        if not response.streaming and len(response.content) < self.min_size:
+            return None
+        # The representation depends on Accept-Encoding from here on
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+
+    def compress_content(self, response, encoding: str):
+        content = response.content
+        with span("compress"):
+            key = getattr(response, PRECOMPRESS_ATTRIBUTE, None)
+            if key:
+                body = precompressed_body(key, content, encoding)
+            else:
+                body = compress(content, encoding)
+        if len(body) >= len(content):
+            return response
+        response.content = body
+        response.headers["Content-Length"] = str(len(body))
+        self.mark_encoded(response, encoding)
+        return response
+
+    def compress_streaming(self, response, encoding: str):
+        if response.is_async:
+            response.streaming_content = compress_stream_async(response.streaming_content, encoding)
+        else:
+            response.streaming_content = compress_stream(response.streaming_content, encoding)
+        del response.headers["Content-Length"]
+        self.mark_encoded(response, encoding)
+        return response
+
+    @staticmethod
+    def mark_encoded(response, encoding: str) -> None:
+        response.headers["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
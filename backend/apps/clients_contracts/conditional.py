@@ -0,0 +1,137 @@
+"""
+Conditional GET for contracts, clients and analyses.
+
+Every write to a contract or client sets `updated_at` and bumps a `version`
+counter ($inc). The validators come from those two fields:
+
+    ETag           strong; a hash of the document id, version and updated_at,
+                   plus whatever shapes the body (the view, ?include= fields)
+    Last-Modified  updated_at (created_at for documents never updated)
+
+A request that carries If-None-Match or If-Modified-Since first reads just
+those fields. Detail views look the document up by _id with a projection, and
+lists read the projection of every match. If the client's copy is current,
+the response is a 304 with no body, and bodies, caches and AI calls are never
+touched. Documents written before `version` existed count as version 0, and
+updated_at tells their revisions apart.
+
+Lists only get an ETag. Deleting a document doesn't move any updated_at, so a
+Last-Modified for a list can't tell when the list changed.
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+logger = logging.getLogger(__name__)
+
+VERSION_FIELD = "version"
+
+# What a validator lookup reads instead of the document
+VALIDATOR_PROJECTION = {"_id": 1, VERSION_FIELD: 1, "updated_at": 1, "created_at": 1}
+
+# Clients may keep the body but must revalidate before reusing it
+CACHE_CONTROL = "private, no-cache"
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: Optional[int] = None
+
+
+def version_bump() -> Dict:
+    """Update operator that counts a write, for use next to $set"""
+    return {"$inc": {VERSION_FIELD: 1}}
+
+
+def _revision(document: Dict) -> str:
+    changed = document.get("updated_at") or document.get("created_at") or ""
+    return f"{document['_id']}:{document.get(VERSION_FIELD, 0)}:{changed}"
+
+
+def _timestamp(document: Dict) -> Optional[int]:
+    value = document.get("updated_at") or document.get("created_at")
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        # Naive values were written with datetime.now(), i.e. server local time
+        return int(value.timestamp()) if value else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _changed_at(document: Dict):
+    value = document.get("updated_at") or document.get("created_at")
+    if isinstance(value, str):
+        # Cached copies hold datetimes as text, in str() or isoformat() form
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def same_revision(cached: Dict, revision: Dict) -> bool:
+    """Whether a cached copy of a document is the revision read from the database"""
+    return (cached.get(VERSION_FIELD, 0) == revision.get(VERSION_FIELD, 0)
+            and _changed_at(cached) == _changed_at(revision))
+
+
+def make_etag(documents: Iterable[Dict], *variant) -> str:
+    """
+    Strong ETag for one or more documents.
+
+    Args:
+        documents: Documents (or validator projections) with _id, version and updated_at
+        *variant: Anything else that changes the body, e.g. the view and ?include= fields
+
+    Returns:
+        Quoted ETag
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("|".join(str(part) for part in variant).encode("utf-8"))
+    for document in documents:
+        digest.update(b";" + _revision(document).encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def document_validators(document: Dict, *variant) -> Validators:
+    """ETag and Last-Modified for a single document"""
+    return Validators(make_etag([document], *variant), _timestamp(document))
+
+
+def list_validators(documents: Iterable[Dict], *variant) -> Validators:
+    """ETag for a list, which changes when any member, the order or the membership does"""
+    return Validators(make_etag(documents, *variant))
+
+
+def is_conditional(request) -> bool:
+    return "HTTP_IF_NONE_MATCH" in request.META or "HTTP_IF_MODIFIED_SINCE" in request.META
+
+
+def not_modified(request, validators: Validators) -> Optional[HttpResponse]:
+    """
+    The response for a conditional request whose copy is current.
+
+    Returns:
+        304 (or 412 for a failed If-Match) carrying the validators, or None to
+        build the full response
+    """
+    response = get_conditional_response(request, etag=validators.etag, last_modified=validators.last_modified)
+    if response is not None:
+        set_validators(response, validators)
+    return response
+
+
+def set_validators(response, validators: Validators):
+    """Add ETag / Last-Modified / Cache-Control to a response and return it"""
+    response["ETag"] = validators.etag
+    if validators.last_modified is not None:
+        response["Last-Modified"] = http_date(validators.last_modified)
+    response["Cache-Control"] = CACHE_CONTROL
+    return response
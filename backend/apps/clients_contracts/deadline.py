@@ -0,0 +1,176 @@
+"""
+Request-scoped deadlines.
+
+Every request gets a time budget. It comes from the client's
+X-Request-Timeout header (in seconds), or failing that from the view's
+`request_timeout` attribute (seconds, or a dict of seconds by HTTP method),
+or failing that from REQUEST_TIMEOUT_DEFAULT. It is always capped at
+REQUEST_TIMEOUT_MAX, which sits below nginx's proxy_read_timeout, so nothing
+keeps working on a response the proxy has already given up on.
+
+DeadlineMiddleware runs the request in deadline_scope(). That stores the
+deadline in a context variable and enters pymongo.timeout(), so every Mongo
+operation in the request is bounded by what is left of the budget. Thread
+pools started with map_in_context and the async I/O pool copy the context,
+so chunk workers and async views see the same deadline. Code that sets its
+own per-call limits (the DeepSeek calls) asks for timeout_for(limit), which
+shrinks the limit to what is left and raises DeadlineExceeded once nothing
+is. Streamed responses are produced after the view returns and are not
+bounded.
+
+A DeadlineExceeded or Mongo timeout that escapes the view becomes a 504.
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import NamedTuple, Optional
+
+import pymongo
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+DEFAULT_REQUEST_TIMEOUT = 30
+DEFAULT_REQUEST_TIMEOUT_MAX = 290
+MIN_BUDGET = 0.001
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out"""
+
+
+class Deadline(NamedTuple):
+    expires_at: float  # time.monotonic()
+    budget: float
+
+
+_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _deadline.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request's budget, or None outside a request"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline.expires_at - time.monotonic()
+
+
+def timeout_for(limit: float) -> float:
+    """
+    The timeout to use for one call, given its own limit.
+
+    Args:
+        limit: The call's usual timeout in seconds
+
+    Returns:
+        limit, or less if the request's deadline is closer
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    left = remaining()
+    if left is None:
+        return limit
+    if left <= 0:
+        raise DeadlineExceeded(f"Request deadline exceeded by {-left:.3f}s")
+    return min(limit, left)
+
+
+def allows(seconds: float) -> bool:
+    """Whether the deadline leaves at least `seconds` (always true outside a request)"""
+    left = remaining()
+    return left is None or left > seconds
+
+
+@contextmanager
+def deadline_scope(budget: float):
+    """
+    Run a block under a deadline `budget` seconds from now, which also bounds
+    Mongo operations. Nested scopes never outlast the enclosing one.
+    """
+    left = remaining()
+    if left is not None:
+        # pymongo reads a zero timeout as "no timeout", so an expired scope keeps a sliver
+        budget = min(budget, max(left, MIN_BUDGET))
+    token = _deadline.set(Deadline(time.monotonic() + budget, budget))
+    try:
+        with pymongo.timeout(budget):
+            yield
+    finally:
+        _deadline.reset(token)
+
+
+def parse_timeout(value: Optional[str]) -> Optional[float]:
+    """A positive number of seconds from the header, or None if absent or malformed"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    return seconds if seconds > 0 else None
+
+
+def view_timeout(path: str, method: str) -> Optional[float]:
+    """The request_timeout declared by the view serving `path`, if any"""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    timeout = getattr(getattr(match.func, "view_class", None), "request_timeout", None)
+    if isinstance(timeout, dict):
+        return timeout.get(method)
+    return timeout
+
+
+class DeadlineMiddleware:
+    """
+    Sets the request deadline and bounds Mongo operations by it. Place it
+    above anything that does I/O for the request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.default = getattr(settings, 'REQUEST_TIMEOUT_DEFAULT', DEFAULT_REQUEST_TIMEOUT)
+        self.maximum = getattr(settings, 'REQUEST_TIMEOUT_MAX', DEFAULT_REQUEST_TIMEOUT_MAX)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def budget(self, request) -> float:
+        requested = parse_timeout(request.headers.get(DEADLINE_HEADER))
+        if requested is None:
+            requested = view_timeout(request.path_info, request.method) or self.default
+        return max(min(requested, self.maximum), MIN_BUDGET)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with deadline_scope(self.budget(request)):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with deadline_scope(self.budget(request)):
+            return await self.get_response(request)
+
+    def process_exception(self, request, exception):
+        """Answer 504 when the view ran out of time (ours or Mongo's) and didn't handle it"""
+        if isinstance(exception, DeadlineExceeded) or (isinstance(exception, PyMongoError) and exception.timeout):
+            logger.warning(f"{request.method} {request.path} gave up: {exception}")
+            return JsonResponse({"error": "Request deadline exceeded"}, status=504)
+        return None
@@ -0,0 +1,205 @@
+"""
+Hedged requests for latency-sensitive DeepSeek calls.
+
+Most deepseek-chat completions for a short contract come back in a few
+seconds, but now and then one gets stuck behind a slow replica and takes
+many times longer. Hedging sends a duplicate request when the first one
+is slower than usual, and takes whichever response arrives first:
+
+    - Only operations listed in AI_HEDGE_OPERATIONS, on models listed in
+      AI_HEDGE_MODELS, are hedged, and never the chunks of a long contract.
+    - The duplicate goes out when the first request has taken longer than
+      the p95 of recent successful attempts of that operation. Until enough
+      attempts have been seen, AI_HEDGE_DEFAULT_DELAY is used. Completions
+      are not streamed, so the first byte arrives with the whole response.
+    - Each hedgeable request earns AI_HEDGE_BUDGET of a hedge, so at most
+      that fraction of requests is sent twice. This caps the extra spend.
+
+The losing request is not cancelled, because DeepSeek bills it anyway. Its
+response is closed when it arrives, and its usage is still recorded. Every
+attempt is reported with its own duration, including a loser that fails, so
+latency statistics see the slow tail a hedge hides from the caller. The
+latency samples and the budget are kept per worker process.
+"""
+
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+HEDGE_QUANTILE = 0.95
+# Recent single-attempt latencies kept per operation, and how many are needed
+# before their p95 replaces the default delay
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+# Never hedge sooner than this, however fast the operation usually is
+MIN_HEDGE_DELAY = 0.5
+# Unused budget carries over, up to this many hedges
+MAX_HEDGE_CREDIT = 3.0
+
+# Hedge results
+RESULT_PRIMARY_WON = "primary_won"
+RESULT_HEDGE_WON = "hedge_won"
+RESULT_NO_BUDGET = "no_budget"
+
+HEDGES = registry.counter(
+    "ai_hedges_total", "Model calls slow enough to hedge, by operation and result.", ("operation", "result"),
+)
+
+
+def usable(future) -> bool:
+    """Whether an attempt returned a response other than overload or a server error"""
+    if future.exception() is not None:
+        return False
+    status_code = getattr(future.result()[0], "status_code", None)
+    return not isinstance(status_code, int) or (status_code < 500 and status_code != 429)
+
+
+class HedgePolicy:
+    """
+    Decides which calls are hedged and when, and runs them.
+
+    Args:
+        operations: AIService operations that may be hedged
+        models: Models whose calls may be hedged
+        budget: Fraction of hedgeable calls that may be sent twice
+        default_delay: Seconds before hedging until the p95 is known
+    """
+
+    def __init__(self, operations: Iterable[str], models: Iterable[str], budget: float, default_delay: float):
+        self.operations = frozenset(operations)
+        self.models = frozenset(models)
+        self.budget = max(budget, 0.0)
+        self.default_delay = default_delay
+        self._latencies = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._credit = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def applies(self, operation: str, model: Optional[str], chunked: bool = False) -> bool:
+        return not chunked and operation in self.operations and model in self.models and self.budget > 0
+
+    def observe(self, operation: str, seconds: float) -> None:
+        """Record how long a successful attempt took"""
+        with self._lock:
+            self._latencies[operation].append(seconds)
+
+    def delay(self, operation: str) -> float:
+        """Seconds to wait for the first request before sending a hedge"""
+        with self._lock:
+            samples = sorted(self._latencies[operation])
+        if len(samples) < MIN_SAMPLES:
+            delay = self.default_delay
+        else:
+            delay = samples[math.ceil(HEDGE_QUANTILE * len(samples)) - 1]
+        return max(delay, MIN_HEDGE_DELAY)
+
+    def _earn(self, operation: str) -> None:
+        with self._lock:
+            self._credit[operation] = min(self._credit[operation] + self.budget, MAX_HEDGE_CREDIT)
+
+    def _spend(self, operation: str) -> bool:
+        with self._lock:
+            if self._credit[operation] < 1:
+                return False
+            self._credit[operation] -= 1
+            return True
+
+    def run(self, operation: str, attempt: Callable, discard: Callable = None, won: Callable = None):
+        """
+        Run attempt(), and run it a second time if the first is slow.
+
+        Both attempts run on their own threads in copies of the caller's
+        context, so they see the request deadline and usage collector.
+
+        Args:
+            operation: AIService operation, for the latency stats and metrics
+            attempt: Sends one request and returns its response
+            discard: Called with the losing response and its duration when
+                the loser finishes. The response is None if the loser raised.
+            won: Called with the winning attempt's own duration when a hedge
+                was sent and an attempt returned
+
+        Returns:
+            The first response to arrive. If both attempts fail, the first
+            attempt's exception is raised.
+        """
+        self._earn(operation)
+        delay = self.delay(operation)
+        context = contextvars.copy_context()
+        durations = {}
+
+        def timed(name):
+            started = time.monotonic()
+            try:
+                return context.copy().run(attempt), time.monotonic() - started
+            finally:
+                # Also kept when the attempt raises, for reporting a failed loser
+                durations[name] = time.monotonic() - started
+
+        def learn(future):
+            if usable(future):
+                self.observe(operation, future.result()[1])
+
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"hedge-{operation}")
+        try:
+            primary = executor.submit(timed, "primary")
+            primary.add_done_callback(learn)
+            if not wait([primary], timeout=delay).done:
+                if not self._spend(operation):
+                    HEDGES.inc(operation=operation, result=RESULT_NO_BUDGET)
+                else:
+                    logger.info(f"Hedging {operation}: no response after {delay:.2f}s")
+                    hedge = executor.submit(timed, "hedge")
+                    winner = self._first_success([primary, hedge])
+                    loser = hedge if winner is primary else primary
+                    HEDGES.inc(operation=operation,
+                               result=RESULT_PRIMARY_WON if winner is primary else RESULT_HEDGE_WON)
+                    if discard is not None:
+                        name = "hedge" if winner is primary else "primary"
+                        loser.add_done_callback(
+                            lambda future: self._discard(future, discard, context, durations[name]))
+                    response, seconds = winner.result()
+                    if won is not None:
+                        won(seconds)
+                    return response
+            return primary.result()[0]
+        finally:
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _first_success(futures):
+        """The first attempt to return a usable response, else the first that returned at all"""
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in futures:
+                if future in done and usable(future):
+                    return future
+        # Both failed: report the first attempt's error
+        return next((future for future in futures if future.exception() is None), futures[0])
+
+    @staticmethod
+    def _discard(future, discard: Callable, context: contextvars.Context, seconds: float) -> None:
+        response = future.result()[0] if future.exception() is None else None
+        try:
+            context.copy().run(discard, response, seconds)
+        except Exception as e:
+            logger.error(f"Failed to discard hedged response: {e}")
+
+
+ai_hedging = HedgePolicy(
+    operations=getattr(settings, 'AI_HEDGE_OPERATIONS', ()),
+    models=getattr(settings, 'AI_HEDGE_MODELS', ("deepseek-chat",)),
+    budget=getattr(settings, 'AI_HEDGE_BUDGET', 0.05),
+    default_delay=getattr(settings, 'AI_HEDGE_DEFAULT_DELAY', 10),
+)
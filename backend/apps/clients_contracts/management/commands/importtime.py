@@ -0,0 +1,100 @@
+"""
+Audit what the app imports at startup.
+
+Runs a fresh interpreter with `python -X importtime`, sets up Django and
+imports a module (config.urls by default, which pulls in every view), then
+reports the slowest imports by cumulative time and self time per top-level
+package:
+
+    python manage.py importtime
+    python manage.py importtime --module config.asgi --top 40 --min-ms 5
+"""
+
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class ImportRow(NamedTuple):
+    self_us: int
+    cumulative_us: int
+    name: str
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRow]:
+    """
+    Parse the stderr of `python -X importtime`.
+
+    Lines look like "import time:  1234 |  5678 |   package.module", where the
+    name is indented by two spaces per level of nesting.
+
+    Args:
+        output: Captured stderr
+
+    Returns:
+        One row per imported module, in the order they finished importing
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the header line
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append(ImportRow(int(parts[0]), int(parts[1]), name.strip(), depth))
+    return rows
+
+
+def summarize_imports(rows: List[ImportRow]) -> Dict:
+    """Total import time, and self time grouped by top-level package"""
+    top_level = min((row.depth for row in rows), default=0)
+    by_package = defaultdict(int)
+    for row in rows:
+        by_package[row.name.split(".")[0]] += row.self_us
+    return {
+        "total_us": sum(row.cumulative_us for row in rows if row.depth == top_level),
+        "by_package": dict(sorted(by_package.items(), key=lambda item: item[1], reverse=True)),
+    }
+
+
+class Command(BaseCommand):
+    help = "Measure import time at startup with python -X importtime"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default="config.urls", help="Module to import after django.setup()")
+        parser.add_argument("--top", type=int, default=25, help="Number of modules/packages to list")
+        parser.add_argument("--min-ms", type=float, default=1.0, help="Hide modules faster than this")
+
+    def handle(self, *args, **options):
+        code = f"import django; django.setup(); import {options['module']}"
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, env=env, cwd=os.getcwd(),
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Importing {options['module']} failed:\n{result.stderr[-2000:]}")
+
+        rows = parse_importtime(result.stderr)
+        summary = summarize_imports(rows)
+        min_us = options["min_ms"] * 1000
+
+        self.stdout.write(f"Total import time: {summary['total_us'] / 1000:.1f} ms ({len(rows)} modules)\n")
+        self.stdout.write(f"Slowest imports (cumulative, >= {options['min_ms']:g} ms):")
+        self.stdout.write(f"{'cumulative ms':>14}{'self ms':>10}  module")
+        slowest = sorted(rows, key=lambda row: row.cumulative_us, reverse=True)
+        for row in [row for row in slowest if row.cumulative_us >= min_us][:options["top"]]:
+            self.stdout.write(f"{row.cumulative_us / 1000:>14.1f}{row.self_us / 1000:>10.1f}  {row.name}")
+
+        self.stdout.write("\nSelf time by top-level package:")
+        for package, self_us in list(summary["by_package"].items())[:options["top"]]:
+            if self_us >= min_us:
+                self.stdout.write(f"{self_us / 1000:>14.1f}  {package}")
@@ -0,0 +1,605 @@
+"""
+Process-safe metrics registry for GenAI Contract Platform.
+
+Counters and histograms are labeled and accumulate locally under a lock. A
+background thread in each worker process flushes the deltas into one Redis
+hash per metric, so every worker reads the same cluster-wide totals and they
+survive restarts. When Redis is unreachable, deltas are kept and retried, and
+exports fall back to this process's own totals.
+
+Gauges are current values rather than totals: each process writes its own
+value with a heartbeat, and exports sum the processes that are still alive.
+
+render_prometheus() produces the Prometheus text exposition format. Latency
+histograms use fixed buckets, so p50/p95/p99 can be derived with
+histogram_quantile() in Prometheus or with Histogram.quantile() here.
+
+Scrapers don't have user tokens. /metrics/ also lets through requests that
+carry METRICS_TOKEN as a bearer token, or that come from an address in
+METRICS_ALLOWED_NETWORKS. Both are off unless set.
+"""
+
+import hmac
+import ipaddress
+import json
+import logging
+import math
+import os
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.permissions import BasePermission
+from rest_framework.renderers import BaseRenderer
+
+from .cache import CacheManager, METRICS_PREFIX
+
+logger = logging.getLogger(__name__)
+
+METRICS_FLUSH_INTERVAL = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+
+# Request latency buckets in seconds; AI-backed endpoints take tens of seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Gauge values from processes that have not flushed for this long are ignored
+GAUGE_STALE_AFTER = max(METRICS_FLUSH_INTERVAL * 3, 30)
+HEARTBEAT_FIELD = "heartbeat"
+
+_flusher_lock = threading.Lock()
+_flusher_pid = None
+
+
+def _labels_field(values: Sequence[str]) -> str:
+    return json.dumps(list(values), separators=(",", ":"))
+
+
+def _instance_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base class for labeled metrics stored as Redis hash fields"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._totals: Dict[str, float] = {}
+        self._pending: Dict[str, float] = {}
+
+    @property
+    def redis_key(self) -> str:
+        return CacheManager.generate_cache_key(METRICS_PREFIX, "registry", self.name)
+
+    def _label_values(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _add(self, field: str, amount: float) -> None:
+        with self._lock:
+            self._totals[field] = self._totals.get(field, 0) + amount
+            self._pending[field] = self._pending.get(field, 0) + amount
+        _ensure_flusher()
+
+    def take_pending(self) -> Dict[str, float]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore_pending(self, pending: Dict[str, float]) -> None:
+        """Put back deltas whose flush failed"""
+        with self._lock:
+            for field, amount in pending.items():
+                self._pending[field] = self._pending.get(field, 0) + amount
+
+    def local_values(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._totals)
+
+    def write(self, pipeline, pending: Dict[str, float]) -> None:
+        """Queue the Redis commands that apply pending deltas"""
+        for field, amount in pending.items():
+            if float(amount).is_integer():
+                pipeline.hincrby(self.redis_key, field, int(amount))
+            else:
+                pipeline.hincrbyfloat(self.redis_key, field, amount)
+
+    def _label_string(self, values: Sequence[str], extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, values)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self._add(_labels_field(self._label_values(labels)), amount)
+
+    def totals(self, values: Dict[str, float]) -> Dict[Tuple[str, ...], float]:
+        return {tuple(json.loads(field)): amount for field, amount in values.items()}
+
+    def render(self, values: Dict[str, float]) -> List[str]:
+        return [
+            f"{self.name}{self._label_string(label_values)} {_format_value(amount)}"
+            for label_values, amount in sorted(self.totals(values).items())
+        ]
+
+
+class Histogram(Metric):
+    """Distribution of observations in fixed buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        prefix = _labels_field(self._label_values(labels))
+        # Only the bucket the value falls in is incremented; render() accumulates
+        bucket = next(b for b in self.buckets if value <= b)
+        with self._lock:
+            for field, amount in ((f"{prefix}|{_format_value(bucket)}", 1),
+                                  (f"{prefix}|sum", value),
+                                  (f"{prefix}|count", 1)):
+                self._totals[field] = self._totals.get(field, 0) + amount
+                self._pending[field] = self._pending.get(field, 0) + amount
+        _ensure_flusher()
+
+    def series(self, values: Dict[str, float]) -> Dict[Tuple[str, ...], Dict]:
+        """Group raw hash fields into {labels: {"buckets": [...], "sum": x, "count": n}}"""
+        series = {}
+        for field, amount in values.items():
+            prefix, suffix = field.rsplit("|", 1)
+            entry = series.setdefault(tuple(json.loads(prefix)), {
+                "buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0
+            })
+            if suffix == "sum":
+                entry["sum"] = amount
+            elif suffix == "count":
+                entry["count"] = int(amount)
+            else:
+                bound = math.inf if suffix == "+Inf" else float(suffix)
+                if bound in self.buckets:
+                    entry["buckets"][self.buckets.index(bound)] += int(amount)
+        return series
+
+    def quantile(self, q: float, entry: Dict) -> float:
+        """Estimate a quantile from bucket counts by linear interpolation, like histogram_quantile()"""
+        total = sum(entry["buckets"])
+        if total == 0:
+            return 0.0
+        rank = q * total
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, entry["buckets"]):
+            if cumulative + count >= rank and count:
+                if bound == math.inf:
+                    return lower
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound if bound != math.inf else lower
+        return lower
+
+    def render(self, values: Dict[str, float]) -> List[str]:
+        lines = []
+        for label_values, entry in sorted(self.series(values).items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry["buckets"]):
+                cumulative += count
+                le = {"le": _format_value(bound)}
+                lines.append(f"{self.name}_bucket{self._label_string(label_values, le)} {cumulative}")
+            labels = self._label_string(label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(entry['sum'])}")
+            lines.append(f"{self.name}_count{labels} {entry['count']}")
+        return lines
+
+
+class Gauge(Metric):
+    """
+    Value that goes up and down, such as a pool size.
+
+    Each process stores its own value in a field suffixed with its instance
+    id, next to a heartbeat field refreshed on every flush. Instances whose
+    heartbeat is older than GAUGE_STALE_AFTER seconds are left out of the
+    sum, so a worker that died does not keep its last value forever, and
+    MetricsRegistry.collect() deletes their fields from the hash.
+    """
+
+    kind = "gauge"
+
+    def _field(self, labels: Dict[str, str]) -> str:
+        return f"{_labels_field(self._label_values(labels))}|{_instance_id()}"
+
+    def set(self, value: float, **labels) -> None:
+        field = self._field(labels)
+        with self._lock:
+            self._totals[field] = value
+        _ensure_flusher()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        field = self._field(labels)
+        with self._lock:
+            self._totals[field] = self._totals.get(field, 0) + amount
+        _ensure_flusher()
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def take_pending(self) -> Dict[str, float]:
+        # The whole current state is written every flush, along with the heartbeat
+        return self.local_values()
+
+    def restore_pending(self, pending: Dict[str, float]) -> None:
+        # Nothing to keep: the next flush writes the current values again
+        pass
+
+    def local_values(self) -> Dict[str, float]:
+        values = super().local_values()
+        if values:
+            values[f"{HEARTBEAT_FIELD}|{_instance_id()}"] = time.time()
+        return values
+
+    def write(self, pipeline, pending: Dict[str, float]) -> None:
+        pipeline.hset(self.redis_key, mapping=pending)
+
+    @staticmethod
+    def _alive(values: Dict[str, float]) -> set:
+        now = time.time()
+        return {
+            field.rsplit("|", 1)[1]
+            for field, beat in values.items()
+            if field.startswith(f"{HEARTBEAT_FIELD}|") and now - beat <= GAUGE_STALE_AFTER
+        }
+
+    def stale_fields(self, values: Dict[str, float]) -> List[str]:
+        """Fields, heartbeats included, of instances that stopped heartbeating"""
+        alive = self._alive(values)
+        return [field for field in values if field.rsplit("|", 1)[1] not in alive]
+
+    def totals(self, values: Dict[str, float]) -> Dict[Tuple[str, ...], float]:
+        alive = self._alive(values)
+        totals = {}
+        for field, value in values.items():
+            prefix, instance = field.rsplit("|", 1)
+            if prefix == HEARTBEAT_FIELD or instance not in alive:
+                continue
+            label_values = tuple(json.loads(prefix))
+            totals[label_values] = totals.get(label_values, 0) + value
+        return totals
+
+    def render(self, values: Dict[str, float]) -> List[str]:
+        return [
+            f"{self.name}{self._label_string(label_values)} {_format_value(value)}"
+            for label_values, value in sorted(self.totals(values).items())
+        ]
+
+
+class MetricsRegistry:
+    """Holds every metric and moves their values to and from Redis"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def metrics(self) -> List[Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def flush(self) -> bool:
+        """
+        Push pending deltas to Redis in one pipeline.
+
+        Returns:
+            True if successful, False if the deltas were kept for the next attempt
+        """
+        batches = [(metric, metric.take_pending()) for metric in self.metrics()]
+        batches = [(metric, pending) for metric, pending in batches if pending]
+        if not batches:
+            return True
+        try:
+            from django_redis import get_redis_connection
+            pipeline = get_redis_connection("default").pipeline(transaction=False)
+            for metric, pending in batches:
+                metric.write(pipeline, pending)
+            pipeline.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to flush metrics to Redis: {e}")
+            for metric, pending in batches:
+                metric.restore_pending(pending)
+            return False
+
+    def collect(self) -> Tuple[Dict[str, Dict[str, float]], str]:
+        """
+        Read the current value of every metric.
+
+        Returns:
+            ({metric name: {field: value}}, source) where source is "redis"
+            for cluster-wide totals or "local" for this process only
+        """
+        if self.flush():
+            try:
+                from django_redis import get_redis_connection
+                pipeline = get_redis_connection("default").pipeline(transaction=False)
+                metrics = self.metrics()
+                for metric in metrics:
+                    pipeline.hgetall(metric.redis_key)
+                results = pipeline.execute()
+                values = {}
+                stale = []
+                for metric, raw in zip(metrics, results):
+                    values[metric.name] = {
+                        (k.decode() if isinstance(k, bytes) else k): float(v) for k, v in raw.items()
+                    }
+                    if isinstance(metric, Gauge):
+                        fields = metric.stale_fields(values[metric.name])
+                        if fields:
+                            stale.append((metric, fields))
+                self._delete_stale(stale)
+                return values, "redis"
+            except Exception as e:
+                logger.warning(f"Failed to read metrics from Redis: {e}")
+        return {metric.name: metric.local_values() for metric in self.metrics()}, "local"
+
+    @staticmethod
+    def _delete_stale(stale: List[Tuple[Metric, List[str]]]) -> None:
+        """Drop the gauge fields of dead instances, which would otherwise pile up with every restart"""
+        if not stale:
+            return
+        try:
+            from django_redis import get_redis_connection
+            pipeline = get_redis_connection("default").pipeline(transaction=False)
+            for metric, fields in stale:
+                pipeline.hdel(metric.redis_key, *fields)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Failed to delete stale gauge fields: {e}")
+
+    def render_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        values, _ = self.collect()
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render(values.get(metric.name, {})))
+        return "\n".join(lines) + "\n"
+
+
+class PrometheusRenderer(BaseRenderer):
+    """Passes pre-rendered exposition text through; selected by Accept: text/plain or ?format=prometheus"""
+
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        # Errors (e.g. 401) arrive as dicts
+        return json.dumps(data).encode(self.charset)
+
+
+SCRAPER_AUTH = "metrics-scraper"
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """
+    Accepts `Authorization: Bearer <METRICS_TOKEN>` as a scraper. Any other
+    header is left to the authentication classes after this one.
+    """
+
+    def authenticate(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        header = request.META.get("HTTP_AUTHORIZATION", "")
+        scheme, _, credentials = header.partition(" ")
+        if not token or scheme.lower() != "bearer":
+            return None
+        if not hmac.compare_digest(credentials.strip().encode(), token.encode()):
+            return None
+        # Not at import time: this module loads before the app registry is ready
+        from django.contrib.auth.models import AnonymousUser
+        return AnonymousUser(), SCRAPER_AUTH
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="metrics"'
+
+
+def _address_in(address: Optional[str], setting: str) -> bool:
+    """Whether an address falls in one of the CIDRs listed in `setting`"""
+    networks = getattr(settings, setting, ())
+    if not networks or not address:
+        return False
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    for network in networks:
+        try:
+            if ip in ipaddress.ip_network(network, strict=False):
+                return True
+        except ValueError:
+            logger.warning(f"Ignoring malformed {setting} entry: {network!r}")
+    return False
+
+
+def allowed_scrape_address(address: Optional[str]) -> bool:
+    """Whether a client address falls in METRICS_ALLOWED_NETWORKS"""
+    return _address_in(address, 'METRICS_ALLOWED_NETWORKS')
+
+
+def scrape_client_address(request) -> Optional[str]:
+    """
+    The address a scrape came from, for the METRICS_ALLOWED_NETWORKS check.
+
+    Behind a proxy REMOTE_ADDR is the proxy, which would let anyone it
+    forwards in. X-Forwarded-For is only believed from the proxies listed in
+    METRICS_TRUSTED_PROXIES, walking back from the nearest hop until an
+    address that is not one of them. A proxy itself is never the scraper.
+    """
+    address = request.META.get("REMOTE_ADDR")
+    forwarded = [hop.strip() for hop in request.META.get("HTTP_X_FORWARDED_FOR", "").split(",") if hop.strip()]
+    while forwarded and _address_in(address, 'METRICS_TRUSTED_PROXIES'):
+        address = forwarded.pop()
+    if _address_in(address, 'METRICS_TRUSTED_PROXIES'):
+        return None
+    return address
+
+
+class CanScrapeMetrics(BasePermission):
+    """
+    Signed-in users, the scraper token, or an allowlisted address.
+
+    The allowlist matches the direct peer, so it only works for scrapes that
+    don't go through a proxy, unless the proxy is listed in
+    METRICS_TRUSTED_PROXIES (see scrape_client_address).
+    """
+
+    def has_permission(self, request, view):
+        if request.auth == SCRAPER_AUTH:
+            return True
+        if request.user and request.user.is_authenticated:
+            return True
+        return allowed_scrape_address(scrape_client_address(request))
+
+
+def _ensure_flusher() -> None:
+    """Start the periodic flush thread once per process (again after a fork)"""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+        thread = threading.Thread(target=_flush_periodically, name="metrics-flush", daemon=True)
+        thread.start()
+
+
+def _flush_periodically() -> None:
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            registry.flush()
+        except Exception as e:
+            logger.error(f"Metrics flush thread error: {e}")
+
+
+def summarize_requests(values: Dict[str, Dict[str, float]]) -> Dict:
+    """
+    JSON summary of the request metrics.
+
+    Args:
+        values: Metric values as returned by MetricsRegistry.collect()
+
+    Returns:
+        Dict with request_count, average_latency (seconds) and per-endpoint
+        count/p50/p95/p99 keyed by "<view> <method>"
+    """
+    merged = {}
+    for (view, method, _status), entry in REQUEST_LATENCY.series(values.get(REQUEST_LATENCY.name, {})).items():
+        target = merged.setdefault(f"{view} {method}", {
+            "buckets": [0] * len(REQUEST_LATENCY.buckets), "sum": 0.0, "count": 0
+        })
+        target["buckets"] = [a + b for a, b in zip(target["buckets"], entry["buckets"])]
+        target["sum"] += entry["sum"]
+        target["count"] += entry["count"]
+
+    request_count = sum(entry["count"] for entry in merged.values())
+    total_latency = sum(entry["sum"] for entry in merged.values())
+    return {
+        "request_count": request_count,
+        "average_latency": total_latency / request_count if request_count > 0 else 0.0,
+        "endpoints": {
+            endpoint: {
+                "count": entry["count"],
+                "p50": round(REQUEST_LATENCY.quantile(0.50, entry), 4),
+                "p95": round(REQUEST_LATENCY.quantile(0.95, entry), 4),
+                "p99": round(REQUEST_LATENCY.quantile(0.99, entry), 4),
+            }
+            for endpoint, entry in sorted(merged.items())
+        },
+    }
+
+
+def record_cache_lookup(endpoint: str, hit: bool) -> None:
+    """Count a read-through cache hit or miss for an endpoint"""
+    CACHE_LOOKUPS.inc(endpoint=endpoint, result="hit" if hit else "miss")
+
+
+def summarize_cache_lookups(values: Dict[str, Dict[str, float]]) -> Dict:
+    """
+    JSON summary of the read-through cache lookups.
+
+    Args:
+        values: Metric values as returned by MetricsRegistry.collect()
+
+    Returns:
+        Dict of hits, misses and hit_ratio keyed by endpoint
+    """
+    ratios = {}
+    for (endpoint, result), amount in sorted(CACHE_LOOKUPS.totals(values.get(CACHE_LOOKUPS.name, {})).items()):
+        stats = ratios.setdefault(endpoint, {"hits": 0, "misses": 0})
+        stats["hits" if result == "hit" else "misses"] += int(amount)
+    for stats in ratios.values():
+        total = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / total, 4) if total else 0.0
+    return ratios
+
+
+registry = MetricsRegistry()
+
+REQUESTS_TOTAL = registry.counter(
+    "http_requests_total", "HTTP requests handled, by view, method and status.",
+    ("view", "method", "status"),
+)
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "Time spent in the view, by view, method and status.",
+    ("view", "method", "status"),
+)
+CACHE_LOOKUPS = registry.counter(
+    "cache_lookups_total", "Read-through cache lookups, by endpoint and result (hit or miss).",
+    ("endpoint", "result"),
+)
@@ -0,0 +1,265 @@
+"""
+Mongo command and connection pool monitoring.
+
+Registered on the MongoClient in config/mongo.py:
+
+    CommandMonitor - latency histogram per collection and command, a failure
+                     counter, and a WARNING log for every command slower than
+                     MONGO_SLOW_QUERY_MS with the shape of its filter (values
+                     replaced by "?", so no contract data reaches the logs)
+    PoolMonitor    - time spent waiting to check a connection out of the pool,
+                     checkout failures, and gauges for open and checked-out
+                     connections per server
+
+Everything is exported through the metrics registry and shows up on /metrics/.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from django.conf import settings
+from pymongo import monitoring
+
+from .metrics import registry
+from .timing import current_timer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_MS = 100
+
+MONGO_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CHECKOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+
+# Where each command keeps its filter; pipelines are shaped stage by stage
+FILTER_FIELDS = {
+    "find": ("filter", "sort", "projection"),
+    "aggregate": ("pipeline",),
+    "count": ("query",),
+    "distinct": ("query",),
+    "findAndModify": ("query", "sort", "update"),
+    "update": ("updates",),
+    "delete": ("deletes",),
+}
+
+MONGO_COMMAND_LATENCY = registry.histogram(
+    "mongo_command_duration_seconds", "Mongo command latency, by collection and command.",
+    ("collection", "command"), buckets=MONGO_LATENCY_BUCKETS,
+)
+MONGO_COMMAND_FAILURES = registry.counter(
+    "mongo_command_failures_total", "Mongo commands that returned an error, by collection and command.",
+    ("collection", "command"),
+)
+MONGO_SLOW_COMMANDS = registry.counter(
+    "mongo_slow_commands_total", "Mongo commands slower than MONGO_SLOW_QUERY_MS, by collection and command.",
+    ("collection", "command"),
+)
+MONGO_CHECKOUT_WAIT = registry.histogram(
+    "mongo_pool_checkout_seconds", "Time spent waiting for a pooled connection, by server.",
+    ("address",), buckets=CHECKOUT_BUCKETS,
+)
+MONGO_CHECKOUT_FAILURES = registry.counter(
+    "mongo_pool_checkout_failures_total", "Failed connection checkouts, by server and reason.",
+    ("address", "reason"),
+)
+MONGO_POOL_CONNECTIONS = registry.gauge(
+    "mongo_pool_connections", "Open pooled connections, by server.",
+    ("address",),
+)
+MONGO_POOL_CHECKED_OUT = registry.gauge(
+    "mongo_pool_checked_out_connections", "Connections currently checked out of the pool, by server.",
+    ("address",),
+)
+
+
+def query_shape(value: Any) -> Any:
+    """
+    Replace the values in a filter with "?" and keep its structure.
+
+    Operators and field names are kept, scalars become "?", and a list of
+    scalars (e.g. an $in list) collapses to a single "?".
+
+    Args:
+        value: Filter document, pipeline or scalar
+
+    Returns:
+        The shape, safe to log
+    """
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(item, (dict, list, tuple)) for item in value):
+            return [query_shape(item) for item in value]
+        return "?"
+    return "?"
+
+
+def command_shape(command_name: str, command: Dict) -> Dict:
+    """Shape of the parts of a command that decide how it is executed"""
+    shape = {}
+    for field in FILTER_FIELDS.get(command_name, ()):
+        if field not in command:
+            continue
+        if field in ("updates", "deletes"):
+            shape[field] = [query_shape(statement.get("q", {})) for statement in command[field]]
+        else:
+            shape[field] = query_shape(command[field])
+    return shape
+
+
+def _collection_name(command_name: str, command: Dict) -> str:
+    if command_name == "getMore":
+        target = command.get("collection")
+    else:
+        target = command.get(command_name)
+    # Database-level commands (ping, aggregate: 1) have no collection
+    return target if isinstance(target, str) else ""
+
+
+def _address(address) -> str:
+    host, port = address
+    return f"{host}:{port}"
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Records latency per collection and command and logs slow commands"""
+
+    def __init__(self):
+        self.slow_query_ms = getattr(settings, 'MONGO_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+        # Started events carry the command, finished ones only its ids
+        self._inflight: Dict[tuple, tuple] = {}
+
+    def started(self, event):
+        self._inflight[(event.connection_id, event.request_id)] = (
+            _collection_name(event.command_name, event.command), event.command,
+        )
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool) -> None:
+        collection, command = self._inflight.pop((event.connection_id, event.request_id), ("", {}))
+        try:
+            seconds = event.duration_micros / 1_000_000
+            MONGO_COMMAND_LATENCY.observe(seconds, collection=collection, command=event.command_name)
+            if failed:
+                MONGO_COMMAND_FAILURES.inc(collection=collection, command=event.command_name)
+            if seconds * 1000 >= self.slow_query_ms:
+                MONGO_SLOW_COMMANDS.inc(collection=collection, command=event.command_name)
+                self._log_slow(event, collection, command, seconds, failed)
+        except Exception as e:
+            logger.error(f"Failed to record Mongo command metrics: {e}")
+
+    def _log_slow(self, event, collection, command, seconds, failed) -> None:
+        timer = current_timer()
+        record = {
+            "command": event.command_name,
+            "database": event.database_name,
+            "collection": collection,
+            "duration_ms": round(seconds * 1000, 2),
+            "failed": failed,
+            "shape": command_shape(event.command_name, command),
+            "server": _address(event.connection_id),
+            "request_id": timer.request_id if timer else None,
+        }
+        logger.warning(f"Slow Mongo command: {json.dumps(record, default=str)}")
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks checkout wait and pool size per server"""
+
+    def __init__(self):
+        # Checkouts happen on the calling thread, between started and checked_out
+        self._checkout_started = threading.local()
+
+    def _started_at(self):
+        if not hasattr(self._checkout_started, "times"):
+            self._checkout_started.times = {}
+        return self._checkout_started.times
+
+    def connection_check_out_started(self, event):
+        self._started_at()[event.address] = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = self._started_at().pop(event.address, None)
+        address = _address(event.address)
+        if started is not None:
+            MONGO_CHECKOUT_WAIT.observe(time.perf_counter() - started, address=address)
+        MONGO_POOL_CHECKED_OUT.inc(address=address)
+
+    def connection_check_out_failed(self, event):
+        started = self._started_at().pop(event.address, None)
+        address = _address(event.address)
+        if started is not None:
+            MONGO_CHECKOUT_WAIT.observe(time.perf_counter() - started, address=address)
+        MONGO_CHECKOUT_FAILURES.inc(address=address, reason=event.reason)
+        logger.warning(f"Mongo connection checkout failed for {address}: {event.reason}")
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.dec(address=_address(event.address))
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc(address=_address(event.address))
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.dec(address=_address(event.address))
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        logger.warning(f"Mongo connection pool cleared for {_address(event.address)}")
+
+    def pool_closed(self, event):
+        pass
+
+
+def summarize_mongo(values: Dict[str, Dict[str, float]]) -> Dict:
+    """
+    JSON summary of the Mongo metrics.
+
+    Args:
+        values: Metric values as returned by MetricsRegistry.collect()
+
+    Returns:
+        Dict with per "<collection>.<command>" count/p50/p95/p99/failures/slow,
+        and per-server pool size, checked-out connections and checkout p95
+    """
+    failures = MONGO_COMMAND_FAILURES.totals(values.get(MONGO_COMMAND_FAILURES.name, {}))
+    slow = MONGO_SLOW_COMMANDS.totals(values.get(MONGO_SLOW_COMMANDS.name, {}))
+    commands = {}
+    for labels, entry in sorted(MONGO_COMMAND_LATENCY.series(values.get(MONGO_COMMAND_LATENCY.name, {})).items()):
+        collection, command = labels
+        commands[f"{collection}.{command}" if collection else command] = {
+            "count": entry["count"],
+            "p50": round(MONGO_COMMAND_LATENCY.quantile(0.50, entry), 4),
+            "p95": round(MONGO_COMMAND_LATENCY.quantile(0.95, entry), 4),
+            "p99": round(MONGO_COMMAND_LATENCY.quantile(0.99, entry), 4),
+            "failures": int(failures.get(labels, 0)),
+            "slow": int(slow.get(labels, 0)),
+        }
+
+    pools = {}
+    connections = MONGO_POOL_CONNECTIONS.totals(values.get(MONGO_POOL_CONNECTIONS.name, {}))
+    checked_out = MONGO_POOL_CHECKED_OUT.totals(values.get(MONGO_POOL_CHECKED_OUT.name, {}))
+    waits = MONGO_CHECKOUT_WAIT.series(values.get(MONGO_CHECKOUT_WAIT.name, {}))
+    for (address,) in sorted(set(connections) | set(checked_out) | set(waits)):
+        wait = waits.get((address,))
+        pools[address] = {
+            "connections": int(connections.get((address,), 0)),
+            "checked_out": int(checked_out.get((address,), 0)),
+            "checkouts": wait["count"] if wait else 0,
+            "checkout_wait_p95": round(MONGO_CHECKOUT_WAIT.quantile(0.95, wait), 6) if wait else 0.0,
+        }
+    return {"commands": commands, "pools": pools}
@@ -0,0 +1,328 @@
+"""
+On-demand request profiling for staff users.
+
+With PROFILING_ENABLED set, a staff user can profile a single request by
+sending an X-Profile header or a ?profile= query parameter:
+
+    sample   - wall-clock sampling of the request's threads, stored as
+               collapsed stacks (flamegraph.pl / speedscope compatible); the
+               default
+    cprofile - deterministic cProfile run, stored as a pstats dump
+
+Async views run on the event loop, not in the thread that entered the
+middleware, and hand blocking calls to the I/O pool (see aio.py). While a
+request is profiled, AsyncAPIView.dispatch and run_sync mark the threads
+they run on with profiled_thread(), and those are profiled too; sampled
+stacks from them start with a "thread:<name>" frame. While an async view
+awaits, the loop runs other requests, whose frames show up in the loop
+thread's part of the profile as well.
+
+The profile is kept in the cache under the request id (see X-Request-ID) and
+fetched from /api/profiles/<request_id>/. When PROFILING_ENABLED is off the
+middleware raises MiddlewareNotUsed, so Django drops it from the stack and
+requests pay nothing.
+"""
+
+import base64
+import contextvars
+import cProfile
+import logging
+import marshal
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .cache import CacheManager
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_PREFIX = "profile:"
+PROFILE_TTL = 60 * 60  # profiles are kept for an hour
+
+MODE_SAMPLE = "sample"
+MODE_CPROFILE = "cprofile"
+FORMAT_COLLAPSED = "collapsed"
+FORMAT_PSTATS = "pstats"
+
+DEFAULT_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+
+class ProfileSession:
+    """Threads, besides the request's own, working for a profiled request"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.profilers: List[cProfile.Profile] = []
+        self._threads = Counter()
+        self._names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def enter(self, ident: int, name: str) -> None:
+        with self._lock:
+            self._threads[ident] += 1
+            self._names[ident] = name
+
+    def leave(self, ident: int) -> None:
+        with self._lock:
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def threads(self) -> Dict[int, str]:
+        """Thread id -> name of the threads working for the request right now"""
+        with self._lock:
+            return {ident: self._names[ident] for ident in self._threads}
+
+    def add_profiler(self, profiler: cProfile.Profile) -> None:
+        with self._lock:
+            self.profilers.append(profiler)
+
+
+_session: contextvars.ContextVar[Optional[ProfileSession]] = contextvars.ContextVar("profile_session", default=None)
+
+
+@contextmanager
+def profiled_thread():
+    """
+    Include the current thread in the profile of the request being served, if
+    it is profiled, until the block ends. Costs one context lookup otherwise.
+    """
+    session = _session.get()
+    if session is None:
+        yield
+        return
+    if session.mode == MODE_CPROFILE:
+        # One profiler per thread; a thread already profiling another request is skipped
+        profiler = cProfile.Profile() if sys.getprofile() is None else None
+        try:
+            if profiler is not None:
+                profiler.enable()
+        except ValueError:
+            profiler = None
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                session.add_profiler(profiler)
+        return
+    ident = threading.get_ident()
+    session.enter(ident, threading.current_thread().name)
+    try:
+        yield
+    finally:
+        session.leave(ident)
+
+
+class StackSampler:
+    """
+    Samples a thread's Python stack at a fixed interval from a helper thread.
+
+    With a session, the threads marked by profiled_thread() are sampled as
+    well, each stack rooted at a "thread:<name>" frame.
+    """
+
+    def __init__(self, thread_id: int, interval: float = DEFAULT_SAMPLE_INTERVAL,
+                 session: Optional[ProfileSession] = None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.session = session
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            self._sample(frames.get(self.thread_id))
+            if self.session is not None:
+                for ident, name in self.session.threads().items():
+                    if ident != self.thread_id:
+                        self._sample(frames.get(ident), f"thread:{name}")
+
+    def _sample(self, frame, root: Optional[str] = None) -> None:
+        if frame is None:
+            return
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        if root is not None:
+            stack.append(root)
+        self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Samples in Brendan Gregg's collapsed-stack format, one 'stack count' per line"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+def dump_pstats(profilers: List[cProfile.Profile]) -> str:
+    """Merge per-thread profilers into one base64 pstats dump"""
+    if not profilers:
+        return base64.b64encode(marshal.dumps({})).decode("ascii")
+    stats = pstats.Stats(profilers[0])
+    for profiler in profilers[1:]:
+        stats.add(profiler)
+    return base64.b64encode(marshal.dumps(stats.stats)).decode("ascii")
+
+
+def profile_cache_key(request_id: str) -> str:
+    return CacheManager.generate_cache_key(PROFILE_PREFIX, request_id)
+
+
+def get_profile(request_id: str) -> Optional[dict]:
+    """Fetch a stored profile by request id"""
+    return CacheManager.get_cache(profile_cache_key(request_id))
+
+
+def requested_mode(request) -> Optional[str]:
+    """Profiling mode asked for by the request, without touching authentication"""
+    value = request.headers.get(PROFILE_HEADER) or request.GET.get(PROFILE_QUERY_PARAM)
+    if not value:
+        return None
+    value = value.lower()
+    if value == MODE_CPROFILE:
+        return MODE_CPROFILE
+    return MODE_SAMPLE
+
+
+def is_staff_request(request) -> bool:
+    """Check the session user, then the JWT bearer token, for staff status"""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    try:
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        result = JWTAuthentication().authenticate(request)
+    except Exception:
+        return False
+    return bool(result and result[0].is_staff)
+
+
+class ProfilingMiddleware:
+    """
+    Runs flagged staff requests under a profiler and stores the result.
+
+    Under ASGI it runs on the event loop: the loop thread and the I/O pool
+    threads working for the request are profiled through profiled_thread()
+    (see the module docstring), and unflagged requests pass straight through
+    instead of being handed to Django's single thread for sync middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed("Request profiling is disabled")
+        self.get_response = get_response
+        self.sample_interval = getattr(settings, 'PROFILING_SAMPLE_INTERVAL', DEFAULT_SAMPLE_INTERVAL)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        mode = requested_mode(request)
+        if mode is None or not is_staff_request(request):
+            return self.get_response(request)
+
+        session = ProfileSession(mode)
+        token = _session.set(session)
+        started = time.perf_counter()
+        try:
+            if mode == MODE_CPROFILE:
+                profiler = cProfile.Profile()
+                response = profiler.runcall(self.get_response, request)
+                data = dump_pstats([profiler, *session.profilers])
+                profile_format = FORMAT_PSTATS
+            else:
+                sampler = StackSampler(threading.get_ident(), self.sample_interval, session)
+                sampler.start()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    sampler.stop()
+                data = sampler.collapsed()
+                profile_format = FORMAT_COLLAPSED
+        finally:
+            _session.reset(token)
+        profile = self.make_profile(request, response, mode, profile_format, data, started)
+        return self.store(request, response, profile)
+
+    async def __acall__(self, request):
+        mode = requested_mode(request)
+        # The staff check may hit the ORM, which stays on Django's thread for sync code
+        if mode is None or not await sync_to_async(is_staff_request)(request):
+            return await self.get_response(request)
+
+        session = ProfileSession(mode)
+        token = _session.set(session)
+        started = time.perf_counter()
+        try:
+            if mode == MODE_CPROFILE:
+                # The loop thread gets its profiler from profiled_thread() like the pool threads
+                with profiled_thread():
+                    response = await self.get_response(request)
+                data = dump_pstats(session.profilers)
+                profile_format = FORMAT_PSTATS
+            else:
+                sampler = StackSampler(threading.get_ident(), self.sample_interval, session)
+                sampler.start()
+                try:
+                    response = await self.get_response(request)
+                finally:
+                    sampler.stop()
+                data = sampler.collapsed()
+                profile_format = FORMAT_COLLAPSED
+        finally:
+            _session.reset(token)
+        profile = self.make_profile(request, response, mode, profile_format, data, started)
+        # Redis only, so it need not queue behind sync code
+        return await sync_to_async(self.store, thread_sensitive=False)(request, response, profile)
+
+    @staticmethod
+    def make_profile(request, response, mode: str, profile_format: str, data: str, started: float) -> dict:
+        return {
+            "request_id": getattr(request, "request_id", None) or uuid.uuid4().hex,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "mode": mode,
+            "format": profile_format,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "created_at": datetime.now().isoformat(),
+            "data": data,
+        }
+
+    @staticmethod
+    def store(request, response, profile: dict):
+        """Keep the profile under its request id and point the response at it"""
+        request_id = profile["request_id"]
+        if CacheManager.set_cache(profile_cache_key(request_id), profile, PROFILE_TTL):
+            response["X-Profile-ID"] = request_id
+            response["X-Profile-URL"] = f"/api/profiles/{request_id}/"
+        logger.info(f"Profiled {request.method} {request.path} ({profile['mode']}, "
+                    f"{profile['duration_ms']} ms) as {request_id}")
+        return response
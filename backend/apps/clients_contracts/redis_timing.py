@@ -0,0 +1,59 @@
+"""
+Redis connection pool that reports round trips to the request timer.
+
+Kept apart from timing.py so importing the timer doesn't import redis; the
+pool is only loaded when django-redis opens its first connection.
+"""
+
+import time
+
+import redis
+
+from .timing import _current_timer
+
+
+class _TimedConnectionMixin:
+    """Times Redis sends and reads; one command (or pipeline) counts once"""
+
+    def send_packed_command(self, command, *args, **kwargs):
+        timer = _current_timer.get()
+        if timer is None:
+            return super().send_packed_command(command, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().send_packed_command(command, *args, **kwargs)
+        finally:
+            timer.add("redis", time.perf_counter() - started)
+
+    def read_response(self, *args, **kwargs):
+        timer = _current_timer.get()
+        if timer is None:
+            return super().read_response(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().read_response(*args, **kwargs)
+        finally:
+            timer.add("redis", time.perf_counter() - started, count=0)
+
+
+_timed_connection_classes = {}
+
+
+def _timed(connection_class):
+    if connection_class not in _timed_connection_classes:
+        _timed_connection_classes[connection_class] = type(
+            f"Timed{connection_class.__name__}", (_TimedConnectionMixin, connection_class), {}
+        )
+    return _timed_connection_classes[connection_class]
+
+
+class TimedConnectionPool(redis.ConnectionPool):
+    """
+    Redis connection pool whose connections report to the request timer.
+
+    Keeps whatever connection class the URL selected (TCP, TLS or unix socket).
+    Used through CACHES["default"]["OPTIONS"]["CONNECTION_POOL_CLASS"].
+    """
+
+    def __init__(self, connection_class=redis.Connection, **kwargs):
+        super().__init__(connection_class=_timed(connection_class), **kwargs)
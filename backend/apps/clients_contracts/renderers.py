@@ -0,0 +1,124 @@
+"""
+Fast JSON renderer and parser for DRF.
+
+Contract details carry analyses, texts and clause arrays of 100 KB and more,
+and the stock JSONRenderer spends a noticeable share of each request in the
+stdlib json module. These classes use orjson instead and encode ObjectIds as
+strings, so views can hand documents to Response as they come from Mongo.
+
+Datetimes, dates and times are handed to DRF's encoder rather than orjson's
+own formatting, and so are Decimals, UUIDs and the rest, so they come out as
+before. The renderer falls back to the stock path (stdlib json with an
+ObjectId-aware encoder) when:
+
+    orjson is not installed
+    the client asks for indentation (Accept: application/json; indent=4, or
+        the browsable API, which renders with indent 4)
+    UNICODE_JSON / COMPACT_JSON are turned off in REST_FRAMEWORK
+    orjson refuses a value (integers beyond 64 bits, say), which then
+        renders or fails exactly as it did before
+
+The output parses to the same values as the stock renderer's, with a few
+differences in the bytes:
+
+    floats are spelled by orjson (1e16, not 1e+16)
+    NaN and Infinity become null, where the stock renderer raises ValueError
+    dict keys may also be dates, times or UUIDs, which stdlib json rejects
+"""
+
+from typing import Any
+
+from bson import ObjectId
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class MongoJSONEncoder(JSONEncoder):
+    """DRF's JSON encoder, plus ObjectId"""
+
+    def default(self, obj):
+        if isinstance(obj, ObjectId):
+            return str(obj)
+        return super().default(obj)
+
+
+_encoder = MongoJSONEncoder()
+
+if orjson is not None:
+    # Keys like stdlib json's (1 -> "1"); datetime values go through json_default
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+else:  # pragma: no cover - optional dependency
+    ORJSON_OPTIONS = 0
+
+
+def json_default(obj: Any) -> Any:
+    """orjson `default` hook for the types orjson doesn't encode itself"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    # datetime ("Z" for UTC, microseconds kept), Decimal, lazy translation strings, querysets, ...
+    return _encoder.default(obj)
+
+
+def dumps(data: Any) -> bytes:
+    """Compact UTF-8 JSON, with ObjectIds as strings"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, default=json_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            pass
+    return MongoJSONEncoder(ensure_ascii=False, separators=(",", ":")).encode(data).encode("utf-8")
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson. Media type and format are the stock
+    renderer's, so clients negotiate it exactly as before; the output differs
+    only as the module docstring lists.
+    """
+
+    encoder_class = MongoJSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        renderer_context = renderer_context or {}
+        if (orjson is None or self.get_indent(accepted_media_type, renderer_context)
+                or self.ensure_ascii or not self.compact):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=json_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # As in JSONRenderer: U+2028/U+2029 are valid JSON but not valid JavaScript
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser backed by orjson, falling back to the stock parser without it"""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if encoding.lower().replace("-", "") != "utf8":
+                data = data.decode(encoding)
+            # orjson rejects NaN and Infinity, like the stock parser with STRICT_JSON
+            return orjson.loads(data)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError(f"JSON parse error - {exc}")
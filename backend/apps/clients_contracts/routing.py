@@ -0,0 +1,219 @@
+"""
+Model routing for AIService operations.
+
+Each operation has a list of candidate models in order of preference
+(AI_MODEL_ROUTES). For every contract, ModelRouter.choose() takes the first
+candidate that:
+
+    - accepts a text of that length (the route's optional max_chars),
+    - has been failing on fewer than AI_ROUTING_MAX_ERROR_RATE of recent
+      calls, and
+    - is expected to finish within what is left of the request's deadline.
+      The estimate is the model's recent latency for the operation times
+      the number of rounds a chunked contract needs.
+
+If no candidate qualifies, it picks the healthy one expected to be fastest.
+With the default routes, analysis and evaluation use deepseek-reasoner
+unless it would not finish in time or keeps failing, in which case they use
+deepseek-chat. Clause extraction always uses deepseek-chat.
+
+Latency and error rates come from the calls AIService records, kept per
+worker process. A hedged call adds the latency of each of its attempts, not
+just the faster one, so the estimate is not skewed low. A skipped model gets no calls to clear its error rate, so the
+rate also decays with time since its last call (halving every
+AI_ROUTING_RECOVERY_HALF_LIFE seconds). Once it is back under the limit the
+model is tried again, and if it keeps failing it is soon ruled out again.
+Every decision is counted in ai_routing_decisions_total, by operation, model
+and reason.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+from config.constants import CHUNK_SIZE, CHUNK_THRESHOLD, CHUNK_WORKERS
+from .deadline import remaining
+from .metrics import registry
+from .telemetry import (
+    OUTCOME_OK, OUTCOME_TIMEOUT, OUTCOME_CONNECTION_ERROR, OUTCOME_HTTP_ERROR, OUTCOME_HEDGE_LOST,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_ROUTES = {
+    "analyze": [{"model": "deepseek-reasoner"}, {"model": "deepseek-chat"}],
+    "evaluate": [{"model": "deepseek-reasoner"}, {"model": "deepseek-chat"}],
+    "extract_clauses": [{"model": "deepseek-chat"}],
+    "connection_test": [{"model": "deepseek-reasoner"}],
+}
+
+# Seconds per call assumed for a model until calls to it have been timed
+DEFAULT_PRIOR_LATENCY = {"deepseek-chat": 15.0, "deepseek-reasoner": 45.0}
+UNKNOWN_MODEL_LATENCY = 30.0
+
+# Weight of the newest call in the latency and error moving averages
+SMOOTHING = 0.2
+# Calls to a model before its error rate can rule it out
+MIN_CALLS = 5
+# Seconds for an idle model's error rate to halve
+DEFAULT_RECOVERY_HALF_LIFE = 120.0
+
+# Outcomes that count against a model; deadline, circuit and hedge outcomes say nothing about it
+FAILURE_OUTCOMES = (OUTCOME_TIMEOUT, OUTCOME_CONNECTION_ERROR, OUTCOME_HTTP_ERROR)
+
+# Decision reasons
+REASON_PREFERRED = "preferred"
+REASON_TOO_LONG = "too_long"
+REASON_UNHEALTHY = "unhealthy"
+REASON_OVER_BUDGET = "over_budget"
+REASON_FASTEST = "fastest"
+REASON_DISABLED = "disabled"
+
+ROUTING_DECISIONS = registry.counter(
+    "ai_routing_decisions_total", "Model choices for AI operations, by operation, model and reason.",
+    ("operation", "model", "reason"),
+)
+
+
+def call_rounds(text_length: int) -> int:
+    """Model calls one after another that a text needs: 1, or the rounds of parallel chunk calls"""
+    if text_length <= CHUNK_THRESHOLD:
+        return 1
+    return math.ceil(math.ceil(text_length / CHUNK_SIZE) / CHUNK_WORKERS)
+
+
+class ModelRouter:
+    """
+    Args:
+        routes: Operation -> candidate routes in order of preference; each
+            route is {"model": name} with an optional "max_chars"
+        max_error_rate: Recent failure rate above which a model is skipped
+        prior_latency: Model -> seconds per call assumed before any is timed
+        enabled: When False, every operation uses its first candidate
+        recovery_half_life: Seconds for the error rate of a model that gets
+            no calls to halve
+    """
+
+    def __init__(self, routes: Dict[str, List[Dict]], max_error_rate: float,
+                 prior_latency: Optional[Dict[str, float]] = None, enabled: bool = True,
+                 recovery_half_life: float = DEFAULT_RECOVERY_HALF_LIFE):
+        self.routes = routes
+        self.max_error_rate = max_error_rate
+        self.prior_latency = prior_latency or DEFAULT_PRIOR_LATENCY
+        self.enabled = enabled
+        self.recovery_half_life = recovery_half_life
+        self._latency: Dict[tuple, float] = {}
+        self._error_rate: Dict[str, float] = defaultdict(float)
+        self._observed_at: Dict[str, float] = {}
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _current_error_rate(self, model: str, now: float) -> float:
+        """The model's error rate, decayed for the time since its last call; call with the lock held"""
+        observed_at = self._observed_at.get(model)
+        if observed_at is None:
+            return self._error_rate[model]
+        return self._error_rate[model] * 0.5 ** ((now - observed_at) / self.recovery_half_life)
+
+    def observe(self, model: str, operation: str, outcome: str, wall_time: float) -> None:
+        """
+        Update a model's latency and error rate from one recorded call.
+
+        A hedged attempt that lost the race updates the latency only: it is
+        a duplicate of a call already counted, but its latency is part of
+        how long the model takes.
+        """
+        failed = outcome in FAILURE_OUTCOMES
+        if not failed and outcome not in (OUTCOME_OK, OUTCOME_HEDGE_LOST):
+            return
+        with self._lock:
+            if outcome == OUTCOME_HEDGE_LOST:
+                self._update_latency(model, operation, wall_time)
+                return
+            now = time.monotonic()
+            error_rate = self._current_error_rate(model, now)
+            self._calls[model] += 1
+            self._error_rate[model] = error_rate + SMOOTHING * (failed - error_rate)
+            self._observed_at[model] = now
+            if not failed:
+                self._update_latency(model, operation, wall_time)
+
+    def _update_latency(self, model: str, operation: str, wall_time: float) -> None:
+        """Add one latency sample to the moving average; call with the lock held"""
+        key = (model, operation)
+        previous = self._latency.get(key)
+        self._latency[key] = wall_time if previous is None else previous + SMOOTHING * (wall_time - previous)
+
+    def expected_latency(self, model: str, operation: str) -> float:
+        """Seconds one call of `operation` is expected to take on `model`"""
+        with self._lock:
+            latency = self._latency.get((model, operation))
+        if latency is None:
+            return self.prior_latency.get(model, UNKNOWN_MODEL_LATENCY)
+        return latency
+
+    def healthy(self, model: str) -> bool:
+        with self._lock:
+            return (self._calls[model] < MIN_CALLS
+                    or self._current_error_rate(model, time.monotonic()) <= self.max_error_rate)
+
+    def choose(self, operation: str, text_length: int = 0) -> str:
+        """
+        Pick the model for one operation on a text.
+
+        Args:
+            operation: AIService operation name
+            text_length: Characters of contract text sent to the model
+
+        Returns:
+            The model name to put in the request payload
+        """
+        candidates = [route["model"] for route in self.routes.get(operation, ())]
+        if not candidates:
+            raise KeyError(f"No model route for operation {operation}")
+        if not self.enabled:
+            return self._decide(operation, candidates[0], REASON_DISABLED)
+
+        budget = remaining()
+        rounds = call_rounds(text_length)
+        skipped = None
+        healthy = []
+        for route in self.routes[operation]:
+            model = route["model"]
+            max_chars = route.get("max_chars")
+            if max_chars is not None and text_length > max_chars:
+                skipped = skipped or REASON_TOO_LONG
+                continue
+            if not self.healthy(model):
+                skipped = skipped or REASON_UNHEALTHY
+                continue
+            healthy.append(model)
+            if budget is not None and self.expected_latency(model, operation) * rounds > budget:
+                skipped = skipped or REASON_OVER_BUDGET
+                continue
+            return self._decide(operation, model, skipped or REASON_PREFERRED)
+
+        # Nothing fits everything: the fastest of the healthy candidates, else the first one
+        model = min(healthy, key=lambda name: self.expected_latency(name, operation)) if healthy else candidates[0]
+        return self._decide(operation, model, REASON_FASTEST)
+
+    @staticmethod
+    def _decide(operation: str, model: str, reason: str) -> str:
+        ROUTING_DECISIONS.inc(operation=operation, model=model, reason=reason)
+        if reason not in (REASON_PREFERRED, REASON_DISABLED):
+            logger.info(f"Routing {operation} to {model} ({reason})")
+        return model
+
+
+model_router = ModelRouter(
+    routes=getattr(settings, 'AI_MODEL_ROUTES', DEFAULT_MODEL_ROUTES),
+    max_error_rate=getattr(settings, 'AI_ROUTING_MAX_ERROR_RATE', 0.5),
+    prior_latency=getattr(settings, 'AI_MODEL_PRIOR_LATENCY', DEFAULT_PRIOR_LATENCY),
+    enabled=getattr(settings, 'AI_ROUTING_ENABLED', True),
+    recovery_half_life=getattr(settings, 'AI_ROUTING_RECOVERY_HALF_LIFE', DEFAULT_RECOVERY_HALF_LIFE),
+)
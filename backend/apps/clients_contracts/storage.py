@@ -0,0 +1,166 @@
+"""
+Storage layout for contract documents.
+Large bodies (text, analysis, evaluation reasoning and clauses) live in a side
+collection, compressed, so the hot contract document only carries metadata.
+"""
+
+import json
+import zlib
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from bson import Binary, ObjectId
+from config.mongo import db
+from config.constants import CONTRACTS_COLLECTION, CONTRACT_BODIES_COLLECTION
+from .conditional import VERSION_FIELD, version_bump
+
+logger = logging.getLogger(__name__)
+
+contracts_collection = db[CONTRACTS_COLLECTION]
+contract_bodies_collection = db[CONTRACT_BODIES_COLLECTION]
+
+# Fields stored outside the hot contract document
+BODY_FIELDS = ("text", "analysis", "evaluation_reasoning", "clauses")
+
+# Projection that keeps bodies off the wire (also for legacy inline documents)
+HOT_PROJECTION = {field: 0 for field in BODY_FIELDS}
+
+# Bodies smaller than this are stored uncompressed
+COMPRESSION_THRESHOLD = 1024
+COMPRESSION_LEVEL = 6
+
+CODEC_JSON = "json"
+CODEC_ZLIB = "zlib"
+
+
+class ContractStorage:
+    """Reads and writes contract bodies kept in the side collection"""
+
+    @staticmethod
+    def parse_fields(value: Optional[str], default: Iterable[str] = ()) -> Tuple[str, ...]:
+        """
+        Parse an ``include`` query parameter into a tuple of body fields.
+
+        Args:
+            value: Comma separated field names, "all" or "none"
+            default: Fields to use when the parameter is absent
+
+        Returns:
+            Tuple of known body field names
+        """
+        if value is None:
+            return tuple(default)
+        value = value.strip().lower()
+        if value == "all":
+            return BODY_FIELDS
+        if value in ("", "none"):
+            return ()
+        requested = {part.strip() for part in value.split(",")}
+        return tuple(field for field in BODY_FIELDS if field in requested)
+
+    @staticmethod
+    def split_document(document: Dict) -> Tuple[Dict, Dict]:
+        """Split a contract document into (metadata, bodies)"""
+        metadata = {k: v for k, v in document.items() if k not in BODY_FIELDS}
+        bodies = {k: v for k, v in document.items() if k in BODY_FIELDS}
+        return metadata, bodies
+
+    @staticmethod
+    def encode_body(value: Any) -> Dict:
+        """Serialize a body value, compressing it above the size threshold"""
+        raw = json.dumps(value, default=str, ensure_ascii=False).encode("utf-8")
+        if len(raw) >= COMPRESSION_THRESHOLD:
+            return {"codec": CODEC_ZLIB, "data": Binary(zlib.compress(raw, COMPRESSION_LEVEL)), "size": len(raw)}
+        return {"codec": CODEC_JSON, "data": Binary(raw), "size": len(raw)}
+
+    @staticmethod
+    def decode_body(stored: Dict) -> Any:
+        """Inverse of encode_body"""
+        data = bytes(stored["data"])
+        if stored.get("codec") == CODEC_ZLIB:
+            data = zlib.decompress(data)
+        return json.loads(data.decode("utf-8"))
+
+    @staticmethod
+    def save_bodies(contract_id: ObjectId, bodies: Dict) -> Dict[str, int]:
+        """
+        Upsert body fields into the side collection.
+
+        Args:
+            contract_id: ObjectId of the owning contract
+            bodies: Mapping of body field to value
+
+        Returns:
+            Mapping of body field to uncompressed size, for the hot document
+        """
+        if not bodies:
+            return {}
+        encoded = {field: ContractStorage.encode_body(value) for field, value in bodies.items()}
+        contract_bodies_collection.update_one({"_id": contract_id}, {"$set": encoded}, upsert=True)
+        return {field: stored["size"] for field, stored in encoded.items()}
+
+    @staticmethod
+    def build_update(metadata: Dict, body_sizes: Dict[str, int]) -> Dict:
+        """
+        Build the update document for the hot contract after saving bodies.
+        Inline copies left over from the old layout are removed, and the
+        version counter behind the contract's ETag is bumped.
+        """
+        update = {"$set": {k: v for k, v in metadata.items() if k != VERSION_FIELD}, **version_bump()}
+        for field, size in body_sizes.items():
+            update["$set"][f"body_sizes.{field}"] = size
+        if body_sizes:
+            update["$unset"] = {field: "" for field in body_sizes}
+        return update
+
+    @staticmethod
+    def load_bodies(contract_id: ObjectId, fields: Iterable[str] = BODY_FIELDS) -> Dict:
+        """Load the requested body fields for one contract"""
+        return ContractStorage.load_bodies_many([contract_id], fields).get(contract_id, {})
+
+    @staticmethod
+    def load_bodies_many(contract_ids: List[ObjectId], fields: Iterable[str] = BODY_FIELDS) -> Dict[ObjectId, Dict]:
+        """
+        Load the requested body fields for several contracts with one $in query.
+        Fields missing from the side collection are read from legacy inline documents.
+        """
+        fields = tuple(fields)
+        if not contract_ids or not fields:
+            return {}
+        projection = {field: 1 for field in fields}
+        loaded = {contract_id: {} for contract_id in contract_ids}
+        for stored in contract_bodies_collection.find({"_id": {"$in": list(contract_ids)}}, projection):
+            loaded[stored["_id"]] = {
+                field: ContractStorage.decode_body(stored[field]) for field in fields if field in stored
+            }
+
+        legacy_ids = [contract_id for contract_id, bodies in loaded.items() if len(bodies) < len(fields)]
+        if legacy_ids:
+            for inline in contracts_collection.find({"_id": {"$in": legacy_ids}}, projection):
+                bodies = loaded[inline["_id"]]
+                for field in fields:
+                    if field not in bodies and field in inline:
+                        bodies[field] = inline[field]
+        return loaded
+
+    @staticmethod
+    def attach_bodies(contract: Dict, fields: Iterable[str] = BODY_FIELDS) -> Dict:
+        """Load body fields into a hot contract document (``_id`` still an ObjectId)"""
+        contract.update(ContractStorage.load_bodies(contract["_id"], fields))
+        return contract
+
+    @staticmethod
+    def attach_bodies_many(contracts: List[Dict], fields: Iterable[str] = BODY_FIELDS) -> List[Dict]:
+        """Load body fields into several hot contract documents"""
+        loaded = ContractStorage.load_bodies_many([contract["_id"] for contract in contracts], fields)
+        for contract in contracts:
+            contract.update(loaded.get(contract["_id"], {}))
+        return contracts
+
+    @staticmethod
+    def delete_bodies(contract_ids: List[ObjectId]) -> int:
+        """Delete the side documents of removed contracts"""
+        if not contract_ids:
+            return 0
+        result = contract_bodies_collection.delete_many({"_id": {"$in": list(contract_ids)}})
+        logger.info(f"Deleted {result.deleted_count} contract body documents")
+        return result.deleted_count
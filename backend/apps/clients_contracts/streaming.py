@@ -0,0 +1,147 @@
+"""
+Streaming JSON responses for list endpoints.
+
+List views normally read the whole cursor into a list and let DRF render it
+as one JSON document, so memory grows with the collection. In streaming mode
+the view hands over a generator of document batches instead. Each batch is
+encoded and written as soon as it is read, so a request only holds one batch
+(STREAM_BATCH_SIZE documents) at a time:
+
+    ?stream=true                      JSON array, same body as the buffered response
+    ?format=ndjson                    one JSON document per line
+    Accept: application/x-ndjson
+
+ObjectIds are written as strings and datetimes in ISO 8601.
+
+Django fully buffers a sync iterator served under ASGI, and an async iterator
+served under WSGI. streaming_response() therefore picks the iterator type
+from the request, and under ASGI it advances the batch generator on the I/O
+pool (see aio.py).
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from .aio import iterate_sync
+from .renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STREAM_BATCH_SIZE = 200
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_QUERY_PARAM = "stream"
+
+
+def encode_document(document: Any) -> bytes:
+    """Compact JSON for one document, with ObjectIds as strings"""
+    return dumps(document)
+
+
+def stream_batch_size() -> int:
+    return getattr(settings, 'STREAM_BATCH_SIZE', DEFAULT_STREAM_BATCH_SIZE)
+
+
+def batched(iterable: Iterable, size: Optional[int] = None) -> Iterator[List]:
+    """Lists of up to `size` items (STREAM_BATCH_SIZE by default)"""
+    size = size or stream_batch_size()
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_format(request) -> Optional[str]:
+    """
+    Streaming mode asked for by a request.
+
+    Returns:
+        "ndjson", "json", or None for the normal buffered response
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    if getattr(renderer, 'format', None) == "ndjson":
+        return "ndjson"
+    if request.query_params.get(STREAM_QUERY_PARAM, "").lower() in ("1", "true", "yes"):
+        return "json"
+    return None
+
+
+def encode_chunks(batches: Iterable[List[Dict]], fmt: str) -> Iterator[bytes]:
+    """
+    Encoded body, one chunk per batch.
+
+    Args:
+        batches: Iterable of document lists
+        fmt: "json" for a JSON array, "ndjson" for newline-delimited documents
+    """
+    if fmt == "ndjson":
+        for batch in batches:
+            if batch:
+                yield b"".join(encode_document(document) + b"\n" for document in batch)
+        return
+
+    separator = b"["
+    for batch in batches:
+        if batch:
+            yield separator + b",".join(encode_document(document) for document in batch)
+            separator = b","
+    # An empty collection still has to produce a valid array
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def _logged(chunks: Iterator[bytes], path: str) -> Iterator[bytes]:
+    # The status line is already sent, so a failure can only cut the body short
+    try:
+        yield from chunks
+    except Exception as e:
+        logger.error(f"Streaming response for {path} failed: {e}")
+        raise
+
+
+def streaming_response(request, batches: Iterable[List[Dict]], fmt: str) -> StreamingHttpResponse:
+    """
+    StreamingHttpResponse that encodes document batches as they are read.
+
+    Args:
+        request: The DRF request, used to tell ASGI from WSGI
+        batches: Blocking iterable of document lists, read lazily
+        fmt: "json" or "ndjson", see stream_format()
+
+    Returns:
+        StreamingHttpResponse
+    """
+    chunks = _logged(encode_chunks(batches, fmt), request.path)
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = iterate_sync(chunks)
+    content_type = NDJSON_MEDIA_TYPE if fmt == "ndjson" else "application/json"
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    # Keep nginx from buffering the whole body before passing it on
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Selects streaming NDJSON via Accept: application/x-ndjson or ?format=ndjson.
+    Streaming views bypass it; it renders the non-streamed responses (such as
+    errors) in the same format.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        documents = data if isinstance(data, list) else [data]
+        return b"".join(encode_document(document) + b"\n" for document in documents)
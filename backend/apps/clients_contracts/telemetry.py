@@ -0,0 +1,250 @@
+"""
+Telemetry for DeepSeek model calls.
+
+AIService reports every completion request through record_call(): wall time,
+time spent queued behind other chunks, retries, the token counts from
+the response's usage block, the estimated cost and the outcome. Each call is
+exported as metrics, and when a view wraps its AI work in collect_usage() the
+calls are also saved per contract in the ai_usage collection.
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+from config.mongo import db
+from config.constants import AI_USAGE_COLLECTION
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+usage_collection = db[AI_USAGE_COLLECTION]
+
+# USD per million tokens; cache hits are billed at the lower input rate
+DEFAULT_MODEL_PRICING = {
+    "deepseek-chat": {"input_cache_hit": 0.07, "input_cache_miss": 0.27, "output": 1.10},
+    "deepseek-reasoner": {"input_cache_hit": 0.14, "input_cache_miss": 0.55, "output": 2.19},
+}
+MODEL_PRICING = getattr(settings, 'AI_MODEL_PRICING', DEFAULT_MODEL_PRICING)
+
+# Outcomes
+OUTCOME_OK = "ok"
+OUTCOME_TIMEOUT = "timeout"
+OUTCOME_CONNECTION_ERROR = "connection_error"
+OUTCOME_HTTP_ERROR = "http_error"
+OUTCOME_ERROR = "error"
+OUTCOME_DEADLINE_EXCEEDED = "deadline_exceeded"
+OUTCOME_CIRCUIT_OPEN = "circuit_open"
+# A hedged duplicate whose response arrived second (see hedging.py); billed all the same
+OUTCOME_HEDGE_LOST = "hedge_lost"
+
+AI_LATENCY_BUCKETS = (0.5, 1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180)
+
+AI_REQUESTS = registry.counter(
+    "ai_requests_total", "Model completion requests, by model, operation and outcome.",
+    ("model", "operation", "outcome"),
+)
+AI_LATENCY = registry.histogram(
+    "ai_request_duration_seconds", "Wall time of model completion requests, including retries.",
+    ("model", "operation", "chunked"), buckets=AI_LATENCY_BUCKETS,
+)
+AI_QUEUE_WAIT = registry.histogram(
+    "ai_queue_wait_seconds", "Time chunk requests waited for a worker before being sent.",
+    ("model", "operation"),
+)
+AI_RETRIES = registry.counter(
+    "ai_retries_total", "Retries of DeepSeek calls after connection errors, 429 and 5xx overload.",
+    ("model", "operation"),
+)
+AI_TOKENS = registry.counter(
+    "ai_tokens_total", "Tokens reported by the model, by kind (prompt, completion, cached, reasoning).",
+    ("model", "operation", "kind"),
+)
+AI_COST = registry.counter(
+    "ai_cost_usd_total", "Estimated model spend in USD.",
+    ("model", "operation"),
+)
+
+# Calls recorded in the current request, if a view is collecting them
+_collected_calls: contextvars.ContextVar[Optional[List[Dict]]] = contextvars.ContextVar(
+    "collected_ai_calls", default=None
+)
+
+
+def estimate_cost(model: str, usage: Dict[str, int]) -> float:
+    """
+    Estimate the USD cost of one call from its usage block.
+
+    Args:
+        model: Model name sent in the request
+        usage: Token counts as returned by DeepSeek
+
+    Returns:
+        Cost in USD, 0.0 for models without a price
+    """
+    pricing = MODEL_PRICING.get(model)
+    if not pricing:
+        return 0.0
+    prompt = usage.get("prompt_tokens", 0)
+    cached = usage.get("prompt_cache_hit_tokens", 0)
+    miss = usage.get("prompt_cache_miss_tokens", prompt - cached)
+    completion = usage.get("completion_tokens", 0)
+    cost = (
+        cached * pricing["input_cache_hit"]
+        + miss * pricing["input_cache_miss"]
+        + completion * pricing["output"]
+    ) / 1_000_000
+    return round(cost, 8)
+
+
+def record_call(model: str, operation: str, outcome: str, wall_time: float,
+                usage: Optional[Dict[str, Any]] = None, queue_wait: Optional[float] = None,
+                retries: int = 0, chunked: bool = False, status_code: Optional[int] = None) -> Dict:
+    """
+    Record one model call in the metrics and the current collector.
+
+    Args:
+        model: Model name sent in the request
+        operation: AIService operation (analyze, evaluate, extract_clauses, ...)
+        outcome: One of the OUTCOME_* constants
+        wall_time: Seconds from sending the request to the last byte, including retries
+        usage: The response's usage block, if any
+        queue_wait: Seconds the chunk waited in the executor before being sent
+        retries: Retries made by AIService._post_completion
+        chunked: Whether the call is one chunk of a larger contract
+        status_code: Final HTTP status, if a response arrived
+
+    Returns:
+        The call record
+    """
+    usage = usage or {}
+    reasoning = (usage.get("completion_tokens_details") or {}).get("reasoning_tokens", 0)
+    call = {
+        "model": model,
+        "operation": operation,
+        "outcome": outcome,
+        "chunked": chunked,
+        "wall_time": wall_time,
+        "queue_wait": queue_wait,
+        "retries": retries,
+        "status_code": status_code,
+        "prompt_tokens": usage.get("prompt_tokens", 0),
+        "completion_tokens": usage.get("completion_tokens", 0),
+        "cached_tokens": usage.get("prompt_cache_hit_tokens", 0),
+        "reasoning_tokens": reasoning,
+        "cost_usd": estimate_cost(model, usage),
+    }
+    try:
+        AI_REQUESTS.inc(model=model, operation=operation, outcome=outcome)
+        AI_LATENCY.observe(wall_time, model=model, operation=operation, chunked=str(chunked).lower())
+        if queue_wait is not None:
+            AI_QUEUE_WAIT.observe(queue_wait, model=model, operation=operation)
+        if retries:
+            AI_RETRIES.inc(retries, model=model, operation=operation)
+        for kind, field in (("prompt", "prompt_tokens"), ("completion", "completion_tokens"),
+                            ("cached", "cached_tokens"), ("reasoning", "reasoning_tokens")):
+            if call[field]:
+                AI_TOKENS.inc(call[field], model=model, operation=operation, kind=kind)
+        if call["cost_usd"]:
+            AI_COST.inc(call["cost_usd"], model=model, operation=operation)
+    except Exception as e:
+        logger.error(f"Failed to record AI call metrics: {e}")
+
+    collected = _collected_calls.get()
+    if collected is not None:
+        collected.append(call)
+    return call
+
+
+@contextmanager
+def collect_usage():
+    """
+    Collect the model calls made inside the block, including chunk workers.
+
+    Threads started inside the block only see the collector if they run in a
+    copy of the current context (see contextvars.copy_context).
+
+    Yields:
+        List that receives one record per call
+    """
+    calls: List[Dict] = []
+    token = _collected_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _collected_calls.reset(token)
+
+
+def map_in_context(executor, fn, items) -> List:
+    """
+    Like executor.map, but each call runs in a copy of the caller's context.
+
+    fn receives the item and the perf_counter() time it was queued, so chunk
+    workers can report how long they waited for a free thread and still append
+    to the caller's usage collector.
+    """
+    queued_at = time.perf_counter()
+    futures = [executor.submit(contextvars.copy_context().run, fn, item, queued_at) for item in items]
+    return [future.result() for future in futures]
+
+
+def save_usage(calls: List[Dict], contract_id: Optional[str] = None, user_id: Optional[int] = None,
+               endpoint: Optional[str] = None) -> int:
+    """
+    Persist collected calls as usage records, one per operation and model.
+
+    Args:
+        calls: Records gathered by collect_usage()
+        contract_id: Contract the calls were made for, if any
+        user_id: Django user who triggered them
+        endpoint: View that made the calls
+
+    Returns:
+        Number of records inserted
+    """
+    groups: Dict[tuple, Dict] = {}
+    for call in calls:
+        record = groups.setdefault((call["operation"], call["model"]), {
+            "contract_id": contract_id,
+            "user_id": user_id,
+            "endpoint": endpoint,
+            "operation": call["operation"],
+            "model": call["model"],
+            "calls": 0,
+            "chunked": False,
+            "failed_calls": 0,
+            "retries": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cached_tokens": 0,
+            "reasoning_tokens": 0,
+            "cost_usd": 0.0,
+            "wall_time": 0.0,
+            "max_wall_time": 0.0,
+            "queue_wait": 0.0,
+            "created_at": datetime.now(),
+        })
+        record["calls"] += 1
+        record["chunked"] = record["chunked"] or call["chunked"]
+        record["failed_calls"] += call["outcome"] not in (OUTCOME_OK, OUTCOME_HEDGE_LOST)
+        record["retries"] += call["retries"]
+        for field in ("prompt_tokens", "completion_tokens", "cached_tokens", "reasoning_tokens"):
+            record[field] += call[field]
+        record["cost_usd"] = round(record["cost_usd"] + call["cost_usd"], 8)
+        record["wall_time"] += call["wall_time"]
+        record["max_wall_time"] = max(record["max_wall_time"], call["wall_time"])
+        record["queue_wait"] += call["queue_wait"] or 0.0
+
+    if not groups:
+        return 0
+    try:
+        usage_collection.insert_many(list(groups.values()))
+        return len(groups)
+    except Exception as e:
+        logger.error(f"Failed to save AI usage for contract {contract_id}: {e}")
+        return 0
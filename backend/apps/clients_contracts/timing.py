@@ -0,0 +1,205 @@
+"""
+Per-request latency breakdown.
+
+ServerTimingMiddleware starts a RequestTimer for every request and exposes it
+through a contextvar. Code paths that matter for latency add their time to it:
+
+    with span("pdf"):
+        ...
+
+Mongo commands are timed by MongoTimingListener (a pymongo CommandListener),
+Redis round trips by TimedConnectionPool (see redis_timing.py), DeepSeek calls by AIService and
+response rendering by the middleware itself. The totals are returned in a
+Server-Timing header, and a structured record is logged for every request.
+Slow requests are sampled and logged at WARNING with their full breakdown.
+
+When no request is being timed (management commands, background threads),
+span() and the listeners do nothing.
+"""
+
+import contextvars
+import json
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Default thresholds; overridden by SLOW_REQUEST_MS / SLOW_REQUEST_SAMPLE_RATE in settings
+DEFAULT_SLOW_REQUEST_MS = 2000
+DEFAULT_SLOW_REQUEST_SAMPLE_RATE = 1.0
+
+_current_timer: contextvars.ContextVar[Optional["RequestTimer"]] = contextvars.ContextVar(
+    "request_timer", default=None
+)
+
+
+class RequestTimer:
+    """Accumulates time per span name for one request"""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self._spans: Dict[str, list] = {}  # name -> [seconds, count]
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float, count: int = 1) -> None:
+        with self._lock:
+            entry = self._spans.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += count
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Span totals so far, in milliseconds"""
+        with self._lock:
+            return {
+                name: {"ms": round(seconds * 1000, 2), "count": count}
+                for name, (seconds, count) in self._spans.items()
+            }
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return _current_timer.get()
+
+
+@contextmanager
+def span(name: str):
+    """Add the time spent in the block to the current request's timer, if any"""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - started)
+
+
+def format_server_timing(spans: Dict[str, Dict[str, float]], total_ms: float) -> str:
+    """
+    Build a Server-Timing header value.
+
+    Time not covered by any span is reported as "app". Spans that run in
+    parallel (AI chunks) are summed, so they can exceed the total.
+    """
+    parts = []
+    covered = 0.0
+    for name, entry in spans.items():
+        covered += entry["ms"]
+        parts.append(f'{name};dur={entry["ms"]};desc="{entry["count"]}x"')
+    parts.append(f"app;dur={round(max(total_ms - covered, 0.0), 2)}")
+    parts.append(f"total;dur={round(total_ms, 2)}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """
+    Times each request and reports the breakdown.
+
+    Must be first in MIDDLEWARE so the total covers the other middleware.
+    Sets request.request_id from a well-formed incoming X-Request-ID header
+    or a new uuid, and echoes it on the response. Works under WSGI and ASGI;
+    under ASGI the timer lives in the request's task context.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        from django.conf import settings
+        self.get_response = get_response
+        self.slow_request_ms = getattr(settings, 'SLOW_REQUEST_MS', DEFAULT_SLOW_REQUEST_MS)
+        self.sample_rate = getattr(settings, 'SLOW_REQUEST_SAMPLE_RATE', DEFAULT_SLOW_REQUEST_SAMPLE_RATE)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timer = self.start(request)
+        token = _current_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.finish(request, response, timer)
+
+    async def __acall__(self, request):
+        timer = self.start(request)
+        token = _current_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        return self.finish(request, response, timer)
+
+    def start(self, request) -> RequestTimer:
+        incoming = request.headers.get(REQUEST_ID_HEADER, "")
+        request_id = incoming if _REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+        request.request_id = request_id
+        return RequestTimer(request_id)
+
+    def finish(self, request, response, timer: RequestTimer):
+        total_ms = timer.elapsed() * 1000
+        spans = timer.snapshot()
+        response["Server-Timing"] = format_server_timing(spans, total_ms)
+        response[REQUEST_ID_HEADER] = request.request_id
+        self.log(request, response, total_ms, spans)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that too
+        timer = _current_timer.get()
+        if timer is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timer.add("render", time.perf_counter() - started)
+            )
+        return response
+
+    def log(self, request, response, total_ms, spans) -> None:
+        record = {
+            "request_id": request.request_id,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "spans": spans,
+        }
+        if total_ms >= self.slow_request_ms and random.random() < self.sample_rate:
+            logger.warning(f"Slow request: {json.dumps(record)}")
+        else:
+            logger.debug(json.dumps(record))
+
+
+class MongoTimingListener(monitoring.CommandListener):
+    """Adds the duration of every Mongo command to the current request's timer"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        timer = _current_timer.get()
+        if timer is not None:
+            timer.add("mongo", event.duration_micros / 1_000_000)
+
+    def failed(self, event):
+        timer = _current_timer.get()
+        if timer is not None:
+            timer.add("mongo", event.duration_micros / 1_000_000)
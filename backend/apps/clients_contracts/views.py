@@ -1,53 +1,188 @@
 from rest_framework.views import APIView 
 from rest_framework.response import Response 
 from rest_framework import status 
-from config.mongo import db 
+from config.mongo import db, read_db
+from config.constants import AI_USAGE_COLLECTION
 from datetime import datetime
 from bson import ObjectId 
 from bson.errors import InvalidId
+from pymongo import ReturnDocument
 import os
-import requests
-import PyPDF2
 import io
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 import time
 from functools import wraps
 from django.utils.decorators import method_decorator
 from rest_framework.pagination import PageNumberPagination
 from django.utils.deprecation import MiddlewareMixin
-from .ai_service import AIService
+from asgiref.sync import sync_to_async
+from .storage import ContractStorage, BODY_FIELDS, HOT_PROJECTION
+from .conditional import (
+    VALIDATOR_PROJECTION, VERSION_FIELD, document_validators, is_conditional, list_validators, not_modified,
+    same_revision, set_validators, version_bump,
+)
+from .admission import admit, ai_admission
+from .breaker import deepseek_breaker
+from .compression import precompress
+from .streaming import NDJSONRenderer, batched, stream_batch_size, stream_format, streaming_response
+from .cache import ContractCache, AnalysisCache, ClientCache, get_tier_stats
+from .metrics import (
+    registry, REQUESTS_TOTAL, REQUEST_LATENCY, CanScrapeMetrics, MetricsTokenAuthentication, PrometheusRenderer,
+    record_cache_lookup, summarize_cache_lookups, summarize_requests,
+)
+from .telemetry import collect_usage, save_usage
+from .timing import span, current_timer
+from .profiling import get_profile, FORMAT_PSTATS
+from .monitoring import summarize_mongo
+from .aio import AsyncAPIView, AsyncCollection, run_sync
+from django.http import HttpResponse
+from django.conf import settings
+import base64
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.settings import api_settings
+from .renderers import FastJSONRenderer
 
-ai_service = AIService()
+_ai_service = None
 
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
+
+# Budget for requests that call DeepSeek; X-Request-Timeout can shorten it (see deadline.py)
+AI_REQUEST_TIMEOUT = getattr(settings, 'AI_REQUEST_TIMEOUT', 280)
 contracts_collection = db["contracts"] 
 logs_collection = db["logs"]
 clients_collection = db["clients"]
+# Read-heavy endpoints that tolerate replication lag may read from secondaries.
+# Anything written back to the cache is read from the primary instead, so a
+# lagging secondary can't re-cache data that was just invalidated.
+contracts_read_collection = read_db["contracts"]
+logs_read_collection = read_db["logs"]
+usage_read_collection = read_db[AI_USAGE_COLLECTION]
+# Awaitable handles for the async views
+contracts_async = AsyncCollection(contracts_collection)
+logs_read_async = AsyncCollection(logs_read_collection)
+
+def get_ai_service():
+    """The shared AIService, imported and created on first use"""
+    global _ai_service
+    if _ai_service is None:
+        from .ai_service import AIService
+        _ai_service = AIService()
+    return _ai_service
 
-request_count = 0
-cumulative_latency = 0.0
+def extract_pdf_text(uploaded_file):
+    """Text of an uploaded PDF; PyPDF2 is only imported once a PDF arrives"""
+    import PyPDF2
+    with span("pdf"):
+        pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.read()))
+        return "".join(page.extract_text() for page in pdf_reader.pages)
 
-def track_metrics_dispatch(self, request, *args, **kwargs):
-    global request_count, cumulative_latency
-    start = time.time()
-    response = super(self.__class__, self).dispatch(request, *args, **kwargs)
-    latency = time.time() - start
-    request_count += 1
-    cumulative_latency += latency
+async def track_metrics_dispatch_async(self, request, *args, **kwargs):
+    start = time.perf_counter()
+    with collect_usage() as ai_calls:
+        response = await super(self.__class__, self).dispatch(request, *args, **kwargs)
+    record_request_metrics(self, request, response, time.perf_counter() - start)
+    if ai_calls:
+        await run_sync(save_usage, *usage_context(self, request, response, ai_calls, kwargs))
     return response
 
-class ContractListCreateView(APIView):
+def record_request_metrics(view, request, response, latency):
+    labels = {"view": view.__class__.__name__, "method": request.method, "status": str(response.status_code)}
+    REQUESTS_TOTAL.inc(**labels)
+    REQUEST_LATENCY.observe(latency, **labels)
+
+def usage_context(view, request, response, ai_calls, kwargs):
+    """save_usage() arguments for the AI calls made by one request"""
+    # New contracts only know their id once the response is built
+    data = getattr(response, 'data', None)
+    contract_id = kwargs.get('contract_id') or (data.get('contract_id') if isinstance(data, dict) else None)
+    user = getattr(request, 'user', None)
+    return ai_calls, contract_id, getattr(user, 'id', None), view.__class__.__name__
+
+def etag_variant(view, request, fields=()):
+    """What shapes a response body besides the documents, for its ETag"""
+    return (view.__class__.__name__, request.accepted_renderer.format, *fields)
+
+def list_revisions(collection, query):
+    """
+    _id, version and updated_at of every match, in collection order.
+
+    Enough for a list ETag, and the ids then drive the rest of the request.
+    Pass a primary collection: the body is built from the primary, so a
+    validator read from a lagging secondary could tag new data with an old
+    ETag.
+    """
+    return list(collection.find(query, VALIDATOR_PROJECTION))
+
+def summaries_for_revisions(revisions):
+    """
+    Hot documents for a list of contract revisions, in the same order.
+
+    `revisions` are validator projections (as from list_revisions). Cached
+    summaries are fetched in one MGET; those missing or at another version or
+    updated_at than their revision are read from the primary with a single
+    $in query and written back in one pipelined call. Otherwise a summary
+    re-cached by a reader that raced a write could outlive the write and be
+    served under the new list ETag. The returned dicts are copies with
+    ObjectId _ids, ready for ContractStorage.attach_bodies_many.
+    """
+    ids = [doc["_id"] for doc in revisions]
+    cached = ContractCache.get_contract_summaries([str(obj_id) for obj_id in ids])
+    summaries = {
+        str(doc["_id"]): cached[str(doc["_id"])] for doc in revisions
+        if str(doc["_id"]) in cached and same_revision(cached[str(doc["_id"])], doc)
+    }
+    missing = [obj_id for obj_id in ids if str(obj_id) not in summaries]
+    if missing:
+        fetched = {}
+        for doc in contracts_collection.find({"_id": {"$in": missing}}, HOT_PROJECTION):
+            doc["_id"] = str(doc["_id"])
+            fetched[doc["_id"]] = doc
+        ContractCache.cache_contract_summaries(fetched)
+        summaries.update(fetched)
+    # Contracts deleted since the ids were read are skipped
+    return [dict(summaries[str(obj_id)], _id=obj_id) for obj_id in ids if str(obj_id) in summaries]
+
+def iter_contract_summaries(query, fields=None):
+    """
+    Contract summaries matching a query, for streaming: the id cursor is read
+    and the summaries are loaded (with bodies, if asked for) one batch at a time.
+    """
+    size = stream_batch_size()
+    cursor = contracts_read_collection.find(query, VALIDATOR_PROJECTION).batch_size(size)
+    for docs in batched(cursor, size):
+        contracts = summaries_for_revisions(docs)
+        if fields:
+            ContractStorage.attach_bodies_many(contracts, fields)
+        yield contracts
+
+class ContractListCreateView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
-    def get(self, request): 
-        contracts = list(contracts_collection.find({}))
-        # Convert ObjectId to string for JSON serialization
-        for contract in contracts:
-            contract['_id'] = str(contract['_id'])
-        return Response(contracts)
+    request_timeout = {"POST": AI_REQUEST_TIMEOUT}
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer, NDJSONRenderer]
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
+    async def get(self, request): 
+        # Bodies are only loaded when asked for via ?include=
+        fields = ContractStorage.parse_fields(request.query_params.get('include'))
+        fmt = stream_format(request)
+        if fmt:
+            return streaming_response(request, iter_contract_summaries({}, fields), fmt)
+        revisions = await run_sync(list_revisions, contracts_collection, {})
+        validators = list_validators(revisions, *etag_variant(self, request, fields))
+        unchanged = not_modified(request, validators)
+        if unchanged is not None:
+            return unchanged
+        contracts = await run_sync(summaries_for_revisions, revisions)
+        if fields:
+            await run_sync(ContractStorage.attach_bodies_many, contracts, fields)
+        return set_validators(Response(contracts), validators)
     
-    def post(self, request): 
+    @admit(ai_admission)
+    async def post(self, request): 
+        # PDF parsing and the two model calls block; keep them off the event loop
+        return await run_sync(self._create, request)
+
+    def _create(self, request):
         data = request.data.copy()  # Make a mutable copy
         contract_text = data.get('text')
         # If 'text' is missing, try to extract from uploaded file
@@ -62,10 +197,7 @@ class ContractListCreateView(APIView):
                 )
             if uploaded_file.name.endswith('.pdf'):
                 try:
-                    pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.read()))
-                    contract_text = ""
-                    for page in pdf_reader.pages:
-                        contract_text += page.extract_text()
+                    contract_text = extract_pdf_text(uploaded_file)
                     if not contract_text.strip():
                         return Response(
                             {"error": "Could not extract text from PDF. The file might be empty or corrupted."},
@@ -109,12 +241,12 @@ class ContractListCreateView(APIView):
         data['created_at'] = datetime.now().isoformat()
         data['updated_at'] = datetime.now().isoformat()
         try:
-            analysis_result = ai_service.analyze_contract(data['text'])
+            analysis_result = get_ai_service().analyze_contract(data['text'])
             data['analysis'] = analysis_result['analysis']
             data['model_used'] = analysis_result['model_used']
             data['analysis_date'] = datetime.now().isoformat()
 
-            evaluation_result = ai_service.evaluate_contract(data['text'])
+            evaluation_result = get_ai_service().evaluate_contract(data['text'])
             data['approved'] = evaluation_result['approved']
             data['evaluation_reasoning'] = evaluation_result['reasoning']
         except Exception as e:
@@ -142,9 +274,15 @@ class ContractListCreateView(APIView):
             'approved': data['approved'],
             'evaluation_reasoning': data['evaluation_reasoning'],
             'clauses': [],
-            'clause_count': 0
+            'clause_count': 0,
+            'version': 1
         }
-        result = contracts_collection.insert_one(contract_document)
+        # Bodies go to the side collection first so the hot document never points at missing data
+        contract_id = ObjectId()
+        metadata, bodies = ContractStorage.split_document(contract_document)
+        metadata['_id'] = contract_id
+        metadata['body_sizes'] = ContractStorage.save_bodies(contract_id, bodies)
+        result = contracts_collection.insert_one(metadata)
         data['_id'] = str(result.inserted_id)
         return Response({
             'message': 'Contract Created and Analyzed!',
@@ -157,19 +295,41 @@ class ContractListCreateView(APIView):
         }, status=status.HTTP_201_CREATED)
 
 
-class ContractDetailView(APIView):
+class ContractDetailView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
-    def get(self, request, contract_id): 
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
+    async def get(self, request, contract_id): 
         try: 
             obj_id = ObjectId(contract_id)
         except InvalidId: 
             return Response({"error": "Invalid Contract ID"}, status=status.HTTP_400_BAD_REQUEST)
-        contract = contracts_collection.find_one({"_id": obj_id})
-        if not contract:
+        fields = ContractStorage.parse_fields(request.query_params.get('include'), default=BODY_FIELDS)
+        variant = etag_variant(self, request, fields)
+        # One _id lookup of a few fields answers an unchanged contract with a 304,
+        # and tells whether the cached copy is still the current revision
+        revision = await contracts_async.find_one({"_id": obj_id}, VALIDATOR_PROJECTION)
+        if not revision:
             return Response({"error": "Contract not found"}, status=status.HTTP_404_NOT_FOUND)
-        contract['_id'] = str(contract['_id'])  # Serialize ObjectId
+        unchanged = not_modified(request, document_validators(revision, *variant))
+        if unchanged is not None:
+            return unchanged
+        # The cache holds the full document; narrower ?include= requests are served from it too.
+        # A copy re-cached by a reader that raced a write is read again instead of served.
+        contract = await run_sync(ContractCache.get_contract, contract_id)
+        if contract is not None and not same_revision(contract, revision):
+            contract = None
+        record_cache_lookup('contract-detail', contract is not None)
+        if contract is not None:
+            contract = {k: v for k, v in contract.items() if k not in BODY_FIELDS or k in fields}
+        else:
+            contract = await contracts_async.find_one({"_id": obj_id}, HOT_PROJECTION)
+            if not contract:
+                return Response({"error": "Contract not found"}, status=status.HTTP_404_NOT_FOUND)
+            await run_sync(ContractStorage.attach_bodies, contract, fields)
+            contract['_id'] = str(contract['_id'])  # Serialize ObjectId
+            if fields == BODY_FIELDS:
+                await run_sync(ContractCache.cache_contract, contract_id, contract)
         # Ensure approved and evaluation_reasoning are present in the response
         if 'approved' not in contract:
             contract['approved'] = None
@@ -179,63 +339,67 @@ class ContractDetailView(APIView):
             print(f"[DEBUG] Contract {contract_id} has {len(contract['clauses'])} clauses in response")
         else:
             print(f"[DEBUG] Contract {contract_id} has no clauses in response")
-        return Response(contract, status=status.HTTP_200_OK)
+        return set_validators(Response(contract, status=status.HTTP_200_OK), document_validators(contract, *variant))
 
-    def put(self, request, contract_id):
-        try:
-            obj_id = ObjectId(contract_id)
-        except InvalidId:
-            return Response({"error": "Invalid Contract ID"}, status=status.HTTP_400_BAD_REQUEST)
-        data = request.data
-        data['updated_at'] = datetime.now().isoformat()
-        result = contracts_collection.update_one({"_id": obj_id}, {"$set": data})
-        if result.matched_count == 0:
-            return Response({"error": "Contract not found"}, status=status.HTTP_404_NOT_FOUND)
-        # Return updated contract with approved/evaluation_reasoning if present
-        contract = contracts_collection.find_one({"_id": obj_id})
-        contract['_id'] = str(contract['_id'])
-        if 'approved' not in contract:
-            contract['approved'] = None
-        if 'evaluation_reasoning' not in contract:
-            contract['evaluation_reasoning'] = None
-        return Response(contract, status=status.HTTP_200_OK)
+    async def put(self, request, contract_id):
+        return await run_sync(self._update, request, contract_id)
+
+    async def patch(self, request, contract_id):
+        return await run_sync(self._update, request, contract_id)
 
-    def patch(self, request, contract_id):
+    def _update(self, request, contract_id):
         try:
             obj_id = ObjectId(contract_id)
         except InvalidId:
             return Response({"error": "Invalid Contract ID"}, status=status.HTTP_400_BAD_REQUEST)
-        data = request.data
-        data['updated_at'] = datetime.now().isoformat()
-        result = contracts_collection.update_one({"_id": obj_id}, {"$set": data})
-        if result.matched_count == 0:
+        metadata, bodies = ContractStorage.split_document(request.data)
+        metadata['updated_at'] = datetime.now().isoformat()
+        body_sizes = ContractStorage.save_bodies(obj_id, bodies)
+        # Update and read back in one round trip; bodies just written are already in hand
+        contract = contracts_collection.find_one_and_update(
+            {"_id": obj_id},
+            ContractStorage.build_update(metadata, body_sizes),
+            projection=HOT_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if not contract:
+            ContractStorage.delete_bodies([obj_id])
             return Response({"error": "Contract not found"}, status=status.HTTP_404_NOT_FOUND)
+        ContractCache.invalidate_contract(contract_id)
+        contract.update(bodies)
+        # The full document by default, as before bodies moved out; ?include= narrows it
+        include = ContractStorage.parse_fields(request.query_params.get('include'), default=BODY_FIELDS)
+        fields = [field for field in include if field not in bodies]
+        if fields:
+            ContractStorage.attach_bodies(contract, fields)
         # Return updated contract with approved/evaluation_reasoning if present
-        contract = contracts_collection.find_one({"_id": obj_id})
-        contract['_id'] = str(contract['_id'])
         if 'approved' not in contract:
             contract['approved'] = None
         if 'evaluation_reasoning' not in contract:
             contract['evaluation_reasoning'] = None
         return Response(contract, status=status.HTTP_200_OK)
 
-    def delete(self, request, contract_id):
+    async def delete(self, request, contract_id):
         try:
             obj_id = ObjectId(contract_id)
         except InvalidId:
             return Response({"error": "Invalid Contract ID"}, status=status.HTTP_400_BAD_REQUEST)
-        result = contracts_collection.delete_one({"_id": obj_id})
+        result = await contracts_async.delete_one({"_id": obj_id})
         if result.deleted_count == 0:
             return Response({"error": "Contract not found"}, status=status.HTTP_404_NOT_FOUND)
+        await run_sync(ContractStorage.delete_bodies, [obj_id])
+        await run_sync(ContractCache.invalidate_contract, contract_id)
         return Response({"message": "Contract deleted successfully"}, status=status.HTTP_200_OK)
 
 
-class ContractClauseExtractionView(APIView):
+class ContractClauseExtractionView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
+    request_timeout = AI_REQUEST_TIMEOUT
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
     
-    def post(self, request, contract_id=None):
+    @admit(ai_admission)
+    async def post(self, request, contract_id=None):
         print(f"[DEBUG] Received clause extraction POST for contract_id={contract_id}")
         """Extract clauses from existing contract text in database."""
         if contract_id:
@@ -244,16 +408,17 @@ class ContractClauseExtractionView(APIView):
             except InvalidId:
                 return Response({"error": "Invalid Contract ID"}, status=status.HTTP_400_BAD_REQUEST)
 
-            contract = contracts_collection.find_one({"_id": obj_id})
+            contract = await contracts_async.find_one({"_id": obj_id}, {"_id": 1})
             if not contract:
                 return Response({"error": "Contract not found"}, status=status.HTTP_404_NOT_FOUND)
 
-            if 'text' not in contract:
+            bodies = await run_sync(ContractStorage.load_bodies, obj_id, ("text",))
+            if 'text' not in bodies:
                 return Response({"error": "Contract does not contain analyzable text"}, status=status.HTTP_400_BAD_REQUEST)
 
             try:
                 # Extract clauses from existing contract text
-                clause_result = ai_service.extract_clauses(contract['text'])
+                clause_result = await run_sync(get_ai_service().extract_clauses, bodies['text'])
                 # Update contract with clause data and extraction timestamp
                 update_fields = {
                     "clauses": clause_result.get('clauses', []),
@@ -261,7 +426,10 @@ class ContractClauseExtractionView(APIView):
                     "clause_extracted_at": datetime.now().isoformat(),
                     "updated_at": datetime.now().isoformat()
                 }
-                contracts_collection.update_one({"_id": obj_id}, {"$set": update_fields})
+                metadata, clause_bodies = ContractStorage.split_document(update_fields)
+                body_sizes = await run_sync(ContractStorage.save_bodies, obj_id, clause_bodies)
+                await contracts_async.update_one({"_id": obj_id}, ContractStorage.build_update(metadata, body_sizes))
+                await run_sync(ContractCache.invalidate_contract, contract_id)
                 print(f"[DEBUG] Clause extraction result for contract_id={contract_id}: {clause_result}")
                 print(f"[DEBUG] Saving {len(clause_result['clauses']) if 'clauses' in clause_result else 0} clauses to contract {contract_id}")
                 return Response({
@@ -282,11 +450,16 @@ class ContractClauseExtractionView(APIView):
         )
 
 
-class ContractAnalysisView(APIView):
+class ContractAnalysisView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
-    def post(self, request, contract_id=None):
+    request_timeout = AI_REQUEST_TIMEOUT
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
+    @admit(ai_admission)
+    async def post(self, request, contract_id=None):
+        return await run_sync(self._reanalyze, request, contract_id)
+
+    def _reanalyze(self, request, contract_id=None):
         print(f"[DEBUG] Entered ContractAnalysisView.post with contract_id={contract_id}")
         print(f"[DEBUG] request.FILES: {request.FILES}")
         print(f"[DEBUG] request.data: {request.data}")
@@ -297,7 +470,9 @@ class ContractAnalysisView(APIView):
                 print("[DEBUG] Invalid Contract ID")
                 return Response({"error": "Invalid Contract ID"}, status=status.HTTP_400_BAD_REQUEST)
 
-            contract = contracts_collection.find_one({"_id": obj_id})
+            contract = contracts_collection.find_one(
+                {"_id": obj_id}, {"title": 1, "client": 1, "signed": 1, "date": 1}
+            )
             if not contract:
                 print("[DEBUG] Contract not found in DB")
                 return Response({"error": "Contract not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -310,10 +485,7 @@ class ContractAnalysisView(APIView):
 
             if uploaded_file.name.endswith(".pdf"):
                 try:
-                    pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.read()))
-                    contract_text = ""
-                    for page in pdf_reader.pages:
-                        contract_text += page.extract_text()
+                    contract_text = extract_pdf_text(uploaded_file)
                     if not contract_text.strip():
                         print("[DEBUG] Could not extract text from PDF")
                         return Response({"error": "Could not extract text from PDF. The file might be empty or corrupted."}, status=status.HTTP_400_BAD_REQUEST)
@@ -333,8 +505,8 @@ class ContractAnalysisView(APIView):
 
             try:
                 print("[DEBUG] Starting AI analysis and evaluation (no clause extraction)...")
-                analysis_result = ai_service.analyze_contract(contract_text)
-                evaluation_result = ai_service.evaluate_contract(contract_text)
+                analysis_result = get_ai_service().analyze_contract(contract_text)
+                evaluation_result = get_ai_service().evaluate_contract(contract_text)
                 print(f"[DEBUG] analysis_result: {analysis_result}")
                 print(f"[DEBUG] evaluation_result: {evaluation_result}")
                 
@@ -351,9 +523,23 @@ class ContractAnalysisView(APIView):
                     'approved': evaluation_result['approved'],
                     'evaluation_reasoning': evaluation_result['reasoning']
                 }
-                contracts_collection.update_one({"_id": obj_id}, {"$set": update_fields})
-                updated_contract = contracts_collection.find_one({"_id": obj_id})
-                updated_contract['_id'] = str(updated_contract['_id'])
+                metadata, bodies = ContractStorage.split_document(update_fields)
+                body_sizes = ContractStorage.save_bodies(obj_id, bodies)
+                updated_contract = contracts_collection.find_one_and_update(
+                    {"_id": obj_id},
+                    ContractStorage.build_update(metadata, body_sizes),
+                    projection=HOT_PROJECTION,
+                    return_document=ReturnDocument.AFTER
+                )
+                if not updated_contract:
+                    ContractStorage.delete_bodies([obj_id])
+                    return Response({"error": "Contract not found"}, status=status.HTTP_404_NOT_FOUND)
+                ContractCache.invalidate_contract(contract_id)
+                updated_contract.update(bodies)
+                include = ContractStorage.parse_fields(request.query_params.get('include'), default=BODY_FIELDS)
+                remaining = [field for field in include if field not in bodies]
+                if remaining:
+                    ContractStorage.attach_bodies(updated_contract, remaining)
                 print(f"[DEBUG] Updated contract: {updated_contract}")
                 
                 # Determine success message based on whether fallback responses were used
@@ -373,11 +559,11 @@ class ContractAnalysisView(APIView):
         # ... existing code ...
 
 
-class ContractAnalysisDetailView(APIView):
+class ContractAnalysisDetailView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
-    def get(self, request, contract_id): 
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
+    async def get(self, request, contract_id): 
         try: 
             obj_id = ObjectId(contract_id)
         except InvalidId: 
@@ -385,33 +571,55 @@ class ContractAnalysisDetailView(APIView):
                 {'error': 'Invalid contract ID'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
-        contract = contracts_collection.find_one({"_id": obj_id}, {"_id": 0})
+        # Validators come from the contract, and the cached analysis is keyed by its version
+        contract = await contracts_async.find_one(
+            {"_id": obj_id}, {**VALIDATOR_PROJECTION, "model_used": 1, "analysis_date": 1, "title": 1, "client": 1}
+        )
         if not contract: 
             return Response(
                 {'error': 'Contract not found'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
+        validators = document_validators(contract, *etag_variant(self, request))
+        unchanged = not_modified(request, validators)
+        if unchanged is not None:
+            return unchanged
+
+        version = contract.get(VERSION_FIELD, 0)
+        cached = await run_sync(AnalysisCache.get_analysis, contract_id, version)
+        record_cache_lookup('contract-analysis-detail', cached is not None)
+        if cached is not None:
+            return precompress(set_validators(Response(cached, status=status.HTTP_200_OK), validators), validators.etag)
         
-        if 'analysis' not in contract: 
+        bodies = await run_sync(ContractStorage.load_bodies, obj_id, ("analysis",))
+        if 'analysis' not in bodies: 
             return Response(
                 {'error': 'No analysis found for this contract'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        return Response({
-            'analysis': contract['analysis'], 
+        analysis = {
+            'analysis': bodies['analysis'], 
             'model_used': contract.get('model_used', 'DeepSeek Reasoning Model (Live)'),
             'analysis_date': contract.get('analysis_date'),
             'contract_title': contract.get('title'),
             'contract_client': contract.get('client')
-        }, status=status.HTTP_200_OK)
+        }
+        await run_sync(AnalysisCache.cache_analysis, contract_id, version, analysis)
+        # The body is fixed for this ETag, so its compressed forms are cached too
+        return precompress(set_validators(Response(analysis, status=status.HTTP_200_OK), validators), validators.etag)
 
 
-class ContractEvaluationView(APIView):
+class ContractEvaluationView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
-    def post(self, request): 
+    request_timeout = AI_REQUEST_TIMEOUT
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
+    @admit(ai_admission)
+    async def post(self, request):
+        return await run_sync(self._evaluate, request)
+
+    def _evaluate(self, request): 
         contract_text = request.data.get('text')
         if not contract_text: 
             uploaded_file = request.FILES.get('file')
@@ -423,10 +631,7 @@ class ContractEvaluationView(APIView):
             if uploaded_file.name.endswith('.pdf'):
                 # Read PDF and extract text
                 try:
-                    pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.read()))
-                    contract_text = ""
-                    for page in pdf_reader.pages:
-                        contract_text += page.extract_text()
+                    contract_text = extract_pdf_text(uploaded_file)
                     if not contract_text.strip():
                         return Response(
                             {"error": "Could not extract text from PDF. The file might be empty or corrupted."}, 
@@ -445,7 +650,12 @@ class ContractEvaluationView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
         try: 
-            result = ai_service.evaluate_contract(contract_text)
+            # Identical texts share one DeepSeek call; fallback answers are not cached
+            result = AnalysisCache.get_or_compute_evaluation(
+                contract_text,
+                lambda: get_ai_service().evaluate_contract(contract_text),
+                should_cache=lambda r: not r.get('reasoning', '').startswith('Contract evaluation temporarily unavailable')
+            )
             return Response({
                 "approved": result["approved"], 
                 "reasoning": result["reasoning"]
@@ -456,42 +666,163 @@ class ContractEvaluationView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )                
 
-class HealthzView(APIView):
+class HealthzView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
-    def get(self, request):
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
+    async def get(self, request):
         return Response({"status": "ok"}, status=status.HTTP_200_OK)
 
-class ReadyzView(APIView):
+class ReadyzView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
-    def get(self, request):
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
+    async def get(self, request):
+        return await run_sync(self._check)
+
+    def _check(self):
         try:
             db_stats = contracts_collection.database.command("ping")
             if db_stats.get("ok") == 1.0:
-                return Response({"status": "ready"}, status=status.HTTP_200_OK)
+                # An open AI circuit degrades uploads and analyses, but reads still work
+                ai = deepseek_breaker.snapshot()
+                ready = "ready" if ai["state"] == "closed" else "degraded"
+                return Response({"status": ready, "ai": ai}, status=status.HTTP_200_OK)
             else:
                 return Response({"status": "not ready"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         except Exception as e:
             return Response({"status": "not ready", "error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class MetricsView(APIView):
-    permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
-    def get(self, request):
-        avg_latency = cumulative_latency / request_count if request_count > 0 else 0.0
+class MetricsView(AsyncAPIView):
+    # Prometheus scrapes with METRICS_TOKEN or from METRICS_ALLOWED_NETWORKS; users with their JWT
+    authentication_classes = [MetricsTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    permission_classes = [CanScrapeMetrics]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer, PrometheusRenderer]
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
+    async def get(self, request):
+        # Collecting reads every worker's deltas from Redis
+        return await run_sync(self._metrics, request)
+
+    def _metrics(self, request):
+        # Prometheus scrapers send Accept: text/plain; ?format=prometheus works too
+        if request.accepted_renderer.format == PrometheusRenderer.format:
+            return Response(registry.render_prometheus(), status=status.HTTP_200_OK)
+        values, source = registry.collect()
+        summary = summarize_requests(values)
         return Response({
-            "request_count": request_count,
-            "average_latency": avg_latency
+            "request_count": summary["request_count"],
+            "average_latency": summary["average_latency"],
+            "endpoints": summary["endpoints"],
+            "source": source,
+            "mongo": summarize_mongo(values),
+            "cache": summarize_cache_lookups(values),
+            "cache_tiers": get_tier_stats()
         }, status=status.HTTP_200_OK)
 
+class UsageView(AsyncAPIView):
+    """Aggregated AI usage from the ai_usage collection."""
+    permission_classes = [IsAuthenticated]
+    GROUP_FIELDS = {"model", "operation", "contract_id", "endpoint", "day"}
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
+    async def get(self, request):
+        return await run_sync(self._usage, request)
+
+    def _usage(self, request):
+        group_by = [f.strip() for f in request.query_params.get('group_by', 'model,operation').split(',') if f.strip()]
+        unknown = [f for f in group_by if f not in self.GROUP_FIELDS]
+        if unknown:
+            return Response(
+                {"error": f"Cannot group by: {', '.join(unknown)}. Use {', '.join(sorted(self.GROUP_FIELDS))}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        match = {}
+        if request.query_params.get('contract_id'):
+            match['contract_id'] = request.query_params['contract_id']
+        date_range = {}
+        try:
+            if request.query_params.get('since'):
+                date_range['$gte'] = datetime.strptime(request.query_params['since'], '%Y-%m-%d')
+            if request.query_params.get('until'):
+                date_range['$lt'] = datetime.strptime(request.query_params['until'], '%Y-%m-%d')
+        except ValueError:
+            return Response({"error": "Dates must be in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
+        if date_range:
+            match['created_at'] = date_range
+
+        group_id = {
+            field: ({"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}} if field == 'day' else f"${field}")
+            for field in group_by
+        }
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": group_id,
+                "requests": {"$sum": 1},
+                "calls": {"$sum": "$calls"},
+                "failed_calls": {"$sum": "$failed_calls"},
+                "retries": {"$sum": "$retries"},
+                "prompt_tokens": {"$sum": "$prompt_tokens"},
+                "completion_tokens": {"$sum": "$completion_tokens"},
+                "cached_tokens": {"$sum": "$cached_tokens"},
+                "reasoning_tokens": {"$sum": "$reasoning_tokens"},
+                "cost_usd": {"$sum": "$cost_usd"},
+                "wall_time": {"$sum": "$wall_time"},
+                "max_wall_time": {"$max": "$max_wall_time"},
+            }},
+            {"$sort": {"cost_usd": -1}},
+        ]
+        results = []
+        for row in usage_read_collection.aggregate(pipeline):
+            group = row.pop('_id')
+            row['avg_wall_time'] = row['wall_time'] / row['calls'] if row['calls'] else 0.0
+            row['cost_usd'] = round(row['cost_usd'], 6)
+            results.append({**group, **row})
+
+        totals = {
+            field: sum(row[field] for row in results)
+            for field in ("calls", "prompt_tokens", "completion_tokens", "cached_tokens", "reasoning_tokens")
+        }
+        totals['cost_usd'] = round(sum(row['cost_usd'] for row in results), 6)
+        return Response({"group_by": group_by, "results": results, "totals": totals}, status=status.HTTP_200_OK)
+
+class ProfileView(APIView):
+    """Profiles captured by ProfilingMiddleware, as collapsed stacks or a pstats file. Staff only."""
+    permission_classes = [IsAdminUser]
+    def get(self, request, request_id):
+        profile = get_profile(request_id)
+        if profile is None:
+            return Response({"error": "Profile not found or expired"}, status=status.HTTP_404_NOT_FOUND)
+        if request.query_params.get('meta') == 'true':
+            return Response({k: v for k, v in profile.items() if k != 'data'}, status=status.HTTP_200_OK)
+        if profile['format'] == FORMAT_PSTATS:
+            response = HttpResponse(base64.b64decode(profile['data']), content_type='application/octet-stream')
+            response['Content-Disposition'] = f'attachment; filename="{request_id}.prof"'
+        else:
+            response = HttpResponse(profile['data'], content_type='text/plain; charset=utf-8')
+            response['Content-Disposition'] = f'inline; filename="{request_id}.collapsed"'
+        return response
+
 # Logging middleware
 class RequestLogMiddleware(MiddlewareMixin):
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        # The session user may still need the ORM, which stays on Django's thread for sync code;
+        # the Mongo write goes to the I/O pool instead of queueing there too
+        user = await sync_to_async(self.log_user)(request)
+        await run_sync(self.write_log, request, response, user)
+        return response
+
     def process_response(self, request, response):
-        user = str(request.user) if hasattr(request, 'user') and request.user.is_authenticated else None
+        return self.write_log(request, response, self.log_user(request))
+
+    @staticmethod
+    def log_user(request):
+        return str(request.user) if hasattr(request, 'user') and request.user.is_authenticated else None
+
+    def write_log(self, request, response, user):
         log_entry = {
             "user": user,
             "endpoint": request.path,
@@ -499,6 +830,11 @@ class RequestLogMiddleware(MiddlewareMixin):
             "date": datetime.now().isoformat(),
             "status": response.status_code
         }
+        timer = current_timer()
+        if timer is not None:
+            log_entry["request_id"] = timer.request_id
+            log_entry["duration_ms"] = round(timer.elapsed() * 1000, 2)
+            log_entry["timings"] = timer.snapshot()
         logs_collection.insert_one(log_entry)
         return response
 
@@ -507,9 +843,9 @@ class LogsPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
 
-class LogsView(APIView):
+class LogsView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def get(self, request):
+    async def get(self, request):
         user = request.query_params.get('user')
         endpoint = request.query_params.get('endpoint')
         date = request.query_params.get('date')
@@ -526,30 +862,60 @@ class LogsView(APIView):
                 query['status'] = int(status_code)
             except ValueError:
                 pass
-        logs_cursor = logs_collection.find(query).sort('date', -1)
-        logs_list = list(logs_cursor)
-        for log in logs_list:
-            if '_id' in log:
-                log['_id'] = str(log['_id'])
+        logs_list = await logs_read_async.find_list(query, sort=[('date', -1)])
         paginator = LogsPagination()
         page = paginator.paginate_queryset(logs_list, request)
         return paginator.get_paginated_response(page)
 
-class ClientListCreateView(APIView):
+def iter_clients():
+    """Client documents from the collection in batches, for streaming"""
+    size = stream_batch_size()
+    for clients in batched(clients_collection.find({}).batch_size(size), size):
+        for client in clients:
+            client.setdefault('active', True)
+        yield clients
+
+class ClientListCreateView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer, NDJSONRenderer]
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
     
-    def get(self, request):
-        clients = list(clients_collection.find({}))
-        # Convert ObjectId to string for JSON serialization
-        for client in clients:
-            client['_id'] = str(client['_id'])
-            if 'active' not in client:
-                client['active'] = True
-        return Response(clients)
+    async def get(self, request):
+        return await run_sync(self._list, request)
+
+    def _list(self, request):
+        clients = ClientCache.get_all_clients()
+        record_cache_lookup('clients', clients is not None)
+        fmt = stream_format(request)
+        if fmt:
+            # Streamed reads skip filling the cache, which needs the full list
+            return streaming_response(request, batched(clients) if clients is not None else iter_clients(), fmt)
+        variant = etag_variant(self, request)
+        if clients is None and is_conditional(request):
+            # Nothing cached: check the client's copy before reading whole documents
+            unchanged = not_modified(request, list_validators(list_revisions(clients_collection, {}), *variant))
+            if unchanged is not None:
+                return unchanged
+        if clients is None:
+            clients = list(clients_collection.find({}))
+            # Convert ObjectId to string for JSON serialization
+            for client in clients:
+                client['_id'] = str(client['_id'])
+                if 'active' not in client:
+                    client['active'] = True
+            ClientCache.cache_all_clients(clients)
+        # A cached list carries its own versions, so it answers conditional requests too
+        validators = list_validators(clients, *variant)
+        unchanged = not_modified(request, validators)
+        if unchanged is not None:
+            return unchanged
+        return set_validators(Response(clients), validators)
     
-    def post(self, request):
+    async def post(self, request):
+        return await run_sync(self._create, request)
+
+    def _create(self, request):
         data = request.data
         required_fields = ['name']
         missing_fields = [field for field in required_fields if field not in data]
@@ -563,48 +929,56 @@ class ClientListCreateView(APIView):
             "email": data.get("email"),
             "company_id": data.get("company_id"),
             "created_at": datetime.now().isoformat(),
-            "active": True  # Always active on creation
+            "active": True,  # Always active on creation
+            "version": 1
         }
         result = clients_collection.insert_one(client_doc)
         client_doc["_id"] = str(result.inserted_id)
+        ClientCache.invalidate_client(client_doc["_id"])
         return Response(client_doc, status=status.HTTP_201_CREATED)
 
-class ClientDetailView(APIView):
+class ClientDetailView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
     
-    def get(self, request, client_id):
-        try:
-            obj_id = ObjectId(client_id)
-        except InvalidId:
-            return Response({"error": "Invalid Client ID"}, status=status.HTTP_400_BAD_REQUEST)
-        client = clients_collection.find_one({"_id": obj_id})
-        if not client:
-            return Response({"error": "Client not found"}, status=status.HTTP_404_NOT_FOUND)
-        client['_id'] = str(client['_id'])
-        if 'active' not in client:
-            client['active'] = True
-        return Response(client, status=status.HTTP_200_OK)
+    async def get(self, request, client_id):
+        return await run_sync(self._retrieve, request, client_id)
 
-    def put(self, request, client_id):
+    def _retrieve(self, request, client_id):
         try:
             obj_id = ObjectId(client_id)
         except InvalidId:
             return Response({"error": "Invalid Client ID"}, status=status.HTTP_400_BAD_REQUEST)
-        data = request.data
-        update_fields = {k: v for k, v in data.items() if k in ['name', 'email', 'company_id', 'active']}
-        update_fields['updated_at'] = datetime.now().isoformat()
-        result = clients_collection.update_one({"_id": obj_id}, {"$set": update_fields})
-        if result.matched_count == 0:
+        variant = etag_variant(self, request)
+        revision = clients_collection.find_one({"_id": obj_id}, VALIDATOR_PROJECTION)
+        if not revision:
             return Response({"error": "Client not found"}, status=status.HTTP_404_NOT_FOUND)
-        client = clients_collection.find_one({"_id": obj_id})
-        client['_id'] = str(client['_id'])
-        if 'active' not in client:
-            client['active'] = True
-        return Response(client, status=status.HTTP_200_OK)
+        unchanged = not_modified(request, document_validators(revision, *variant))
+        if unchanged is not None:
+            return unchanged
+        # As for contracts, a cached copy behind the current revision is read again
+        client = ClientCache.get_client(client_id)
+        if client is not None and not same_revision(client, revision):
+            client = None
+        record_cache_lookup('client-detail', client is not None)
+        if client is None:
+            client = clients_collection.find_one({"_id": obj_id})
+            if not client:
+                return Response({"error": "Client not found"}, status=status.HTTP_404_NOT_FOUND)
+            client['_id'] = str(client['_id'])
+            if 'active' not in client:
+                client['active'] = True
+            ClientCache.cache_client(client_id, client)
+        return set_validators(Response(client, status=status.HTTP_200_OK), document_validators(client, *variant))
+
+    async def put(self, request, client_id):
+        return await run_sync(self._update, request, client_id)
+
+    async def patch(self, request, client_id):
+        return await run_sync(self._update, request, client_id)
 
-    def patch(self, request, client_id):
+    def _update(self, request, client_id):
         try:
             obj_id = ObjectId(client_id)
         except InvalidId:
@@ -612,37 +986,49 @@ class ClientDetailView(APIView):
         data = request.data
         update_fields = {k: v for k, v in data.items() if k in ['name', 'email', 'company_id', 'active']}
         update_fields['updated_at'] = datetime.now().isoformat()
-        result = clients_collection.update_one({"_id": obj_id}, {"$set": update_fields})
-        if result.matched_count == 0:
+        client = clients_collection.find_one_and_update(
+            {"_id": obj_id},
+            {"$set": update_fields, **version_bump()},
+            return_document=ReturnDocument.AFTER
+        )
+        if not client:
             return Response({"error": "Client not found"}, status=status.HTTP_404_NOT_FOUND)
-        client = clients_collection.find_one({"_id": obj_id})
-        client['_id'] = str(client['_id'])
+        ClientCache.invalidate_client(client_id)
         if 'active' not in client:
             client['active'] = True
         return Response(client, status=status.HTTP_200_OK)
 
-    def delete(self, request, client_id):
+    async def delete(self, request, client_id):
+        return await run_sync(self._delete, client_id)
+
+    def _delete(self, client_id):
         try:
             obj_id = ObjectId(client_id)
         except InvalidId:
             return Response({"error": "Invalid Client ID"}, status=status.HTTP_400_BAD_REQUEST)
-        # Get the client name before deletion
-        client = clients_collection.find_one({"_id": obj_id})
+        # Delete and get the client name back in one round trip
+        client = clients_collection.find_one_and_delete({"_id": obj_id}, projection={"name": 1})
         if not client:
             return Response({"error": "Client not found"}, status=status.HTTP_404_NOT_FOUND)
         client_name = client["name"]
-        result = clients_collection.delete_one({"_id": obj_id})
-        if result.deleted_count == 0:
-            return Response({"error": "Client not found"}, status=status.HTTP_404_NOT_FOUND)
-        # Delete all contracts for this client
+        # Delete all contracts for this client, including their bodies
+        contract_ids = [contract["_id"] for contract in contracts_collection.find({"client": client_name}, {"_id": 1})]
         contracts_collection.delete_many({"client": client_name})
+        ContractStorage.delete_bodies(contract_ids)
+        ClientCache.invalidate_client(client_id)
+        if contract_ids:
+            ContractCache.invalidate_contracts([str(deleted_id) for deleted_id in contract_ids])
         return Response({"message": "Client and all associated contracts deleted successfully"}, status=status.HTTP_200_OK)
 
-class ClientContractsView(APIView):
+class ClientContractsView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
-    def get(self, request, client_id):
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer, NDJSONRenderer]
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
+    async def get(self, request, client_id):
+        return await run_sync(self._list, request, client_id)
+
+    def _list(self, request, client_id):
         # Find client by id
         try:
             obj_id = ObjectId(client_id)
@@ -651,26 +1037,40 @@ class ClientContractsView(APIView):
         client = clients_collection.find_one({"_id": obj_id})
         if not client:
             return Response({"error": "Client not found"}, status=status.HTTP_404_NOT_FOUND)
-        # Find contracts for this client (by name)
-        contracts = list(contracts_collection.find({"client": client["name"]}))
-        for contract in contracts:
-            contract["_id"] = str(contract["_id"])
-        return Response(contracts, status=status.HTTP_200_OK)
+        # Find contracts for this client (by name); bodies only when asked for via ?include=
+        fields = ContractStorage.parse_fields(request.query_params.get('include'))
+        fmt = stream_format(request)
+        if fmt:
+            return streaming_response(request, iter_contract_summaries({"client": client["name"]}, fields), fmt)
+        revisions = list_revisions(contracts_collection, {"client": client["name"]})
+        validators = list_validators(revisions, *etag_variant(self, request, fields))
+        unchanged = not_modified(request, validators)
+        if unchanged is not None:
+            return unchanged
+        contracts = summaries_for_revisions(revisions)
+        if fields:
+            ContractStorage.attach_bodies_many(contracts, fields)
+        return set_validators(Response(contracts, status=status.HTTP_200_OK), validators)
 
-class ContractReanalyzeView(APIView):
+class ContractReanalyzeView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
-    def dispatch(self, request, *args, **kwargs):
-        return track_metrics_dispatch(self, request, *args, **kwargs)
+    request_timeout = AI_REQUEST_TIMEOUT
+    async def dispatch(self, request, *args, **kwargs):
+        return await track_metrics_dispatch_async(self, request, *args, **kwargs)
     
-    def post(self, request, contract_id=None):
+    @admit(ai_admission)
+    async def post(self, request, contract_id=None):
         """Reanalyze an existing contract with a new file."""
+        return await run_sync(self._reanalyze, request, contract_id)
+
+    def _reanalyze(self, request, contract_id):
         try:
             obj_id = ObjectId(contract_id)
         except InvalidId:
             return Response({"error": "Invalid Contract ID"}, status=status.HTTP_400_BAD_REQUEST)
 
         # Get existing contract
-        contract = contracts_collection.find_one({"_id": obj_id})
+        contract = contracts_collection.find_one({"_id": obj_id}, {"_id": 1})
         if not contract:
             return Response({"error": "Contract not found"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -685,10 +1085,7 @@ class ContractReanalyzeView(APIView):
         # Extract text from file
         if uploaded_file.name.endswith('.pdf'):
             try:
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(uploaded_file.read()))
-                contract_text = ""
-                for page in pdf_reader.pages:
-                    contract_text += page.extract_text()
+                contract_text = extract_pdf_text(uploaded_file)
                 if not contract_text.strip():
                     return Response(
                         {"error": "Could not extract text from PDF. The file might be empty or corrupted."},
@@ -709,8 +1106,8 @@ class ContractReanalyzeView(APIView):
 
         try:
             # Analyze the new text
-            analysis_result = ai_service.analyze_contract(contract_text)
-            evaluation_result = ai_service.evaluate_contract(contract_text)
+            analysis_result = get_ai_service().analyze_contract(contract_text)
+            evaluation_result = get_ai_service().evaluate_contract(contract_text)
 
             # Update contract with new analysis
             update_data = {
@@ -727,14 +1124,18 @@ class ContractReanalyzeView(APIView):
             if 'title' in request.data:
                 update_data['title'] = request.data['title']
 
-            # Update the contract
+            # Update the contract; the new text and analysis go to the side collection
+            metadata, bodies = ContractStorage.split_document(update_data)
+            body_sizes = ContractStorage.save_bodies(obj_id, bodies)
             result = contracts_collection.update_one(
                 {"_id": obj_id},
-                {"$set": update_data}
+                ContractStorage.build_update(metadata, body_sizes)
             )
 
             if result.matched_count == 0:
+                ContractStorage.delete_bodies([obj_id])
                 return Response({"error": "Contract not found"}, status=status.HTTP_404_NOT_FOUND)
+            ContractCache.invalidate_contract(contract_id)
 
             return Response({
                 'message': 'Contract reanalyzed successfully',
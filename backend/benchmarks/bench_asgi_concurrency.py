@@ -0,0 +1,155 @@
+"""
+Benchmark: concurrent-connection capacity of the sync (WSGI) and async (ASGI) setups.
+
+Opens N keep-alive connections per step and has each one send GET requests
+back to back for a fixed time, then reports throughput, latency percentiles
+and errors. The capacity of a target is the highest concurrency whose p95
+stays under --slo-ms with under 1% errors.
+
+Start both servers with the same number of worker processes, e.g.:
+
+    # the previous setup: sync workers, one request per thread
+    gunicorn config.wsgi:application --workers 2 --threads 8 --bind 127.0.0.1:8001
+    # ASGI with the async views
+    gunicorn config.asgi:application --worker-class uvicorn.workers.UvicornWorker \\
+        --workers 2 --bind 127.0.0.1:8002
+
+Usage (from backend/):
+    python benchmarks/bench_asgi_concurrency.py \\
+        --target wsgi=http://127.0.0.1:8001 --target asgi=http://127.0.0.1:8002 \\
+        --path /api/contracts/ --concurrency 1,8,32,128,512 --token <jwt access token>
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def read_response(reader):
+    """Read one HTTP/1.x response; returns (status code, whether the connection stays open)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    keep_alive = status_line.startswith(b"HTTP/1.1")
+    length = None
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+        elif name == "connection" and value.strip().lower() in ("close", "keep-alive"):
+            keep_alive = value.strip().lower() == "keep-alive"
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    elif length is None:
+        await reader.read()
+        keep_alive = False
+    return status, keep_alive
+
+
+async def connection(host, port, request, deadline, latencies, errors):
+    """One keep-alive client sending requests until the deadline"""
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=10)
+            writer.write(request)
+            await writer.drain()
+            status, keep_alive = await asyncio.wait_for(read_response(reader), timeout=60)
+            if status >= 400:
+                errors.append(status)
+            else:
+                latencies.append(time.perf_counter() - started)
+            if not keep_alive:
+                # Sync workers close after every response; reconnecting is part of their cost
+                writer.close()
+                reader = writer = None
+        except Exception as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def run_step(base_url, path, token, concurrency, duration):
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+        f"Authorization: Bearer {token}\r\nAccept: application/json\r\n\r\n"
+    ).encode()
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        connection(host, port, request, deadline, latencies, errors) for _ in range(concurrency)
+    ))
+    latencies.sort()
+    total = len(latencies) + len(errors)
+
+    def pct(q):
+        return latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000 if latencies else float("nan")
+
+    return {
+        "requests_per_s": len(latencies) / duration,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else float("nan"),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "error_rate": len(errors) / total if total else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", action="append", required=True, help="name=base_url, repeatable")
+    parser.add_argument("--path", default="/api/contracts/")
+    parser.add_argument("--token", default=os.getenv("BENCH_TOKEN", ""), help="JWT access token")
+    parser.add_argument("--concurrency", default="1,8,32,128,512")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per step")
+    parser.add_argument("--slo-ms", type=float, default=500.0, help="p95 latency budget for the capacity figure")
+    args = parser.parse_args()
+
+    steps = [int(c) for c in args.concurrency.split(",")]
+    capacity = {}
+    for target in args.target:
+        name, _, base_url = target.partition("=")
+        print(f"== {name} ({base_url}{args.path})")
+        print(f"{'conns':>6}{'req/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+        capacity[name] = 0
+        for concurrency in steps:
+            result = asyncio.run(run_step(base_url, args.path, args.token, concurrency, args.duration))
+            print(f"{concurrency:>6}{result['requests_per_s']:>10.1f}{result['mean_ms']:>10.1f}"
+                  f"{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+                  f"{result['error_rate']:>9.1%}")
+            if result["p95_ms"] <= args.slo_ms and result["error_rate"] < 0.01:
+                capacity[name] = concurrency
+        print()
+
+    print(f"Capacity (p95 <= {args.slo_ms:.0f} ms, errors < 1%):")
+    for name, conns in capacity.items():
+        print(f"  {name:<10}{conns} connections")
+
+
+if __name__ == "__main__":
+    main()
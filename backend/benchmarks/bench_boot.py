@@ -0,0 +1,69 @@
+"""
+Benchmark: cold start of a worker process and of the test suite.
+
+Each run starts a fresh interpreter that sets up Django and imports a module
+(config.urls by default, which is what a worker needs before it can serve
+its first request), so it measures interpreter start, imports and
+module-level work such as opening clients. Reports min/median/max over N runs.
+
+With --pytest it also times `pytest --collect-only`, the fixed cost paid
+before the first test runs.
+
+Usage (from backend/):
+    python benchmarks/bench_boot.py --runs 10
+    python benchmarks/bench_boot.py --module config.asgi --pytest
+
+Compare two revisions by running it on each checkout. Use `python manage.py
+importtime` to see which imports make up the time.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def time_command(command, env):
+    started = time.perf_counter()
+    result = subprocess.run(command, capture_output=True, text=True, env=env)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr[-2000:]}")
+    return elapsed
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    print(f"{label:<32}{timings[0] * 1000:>10.0f}{statistics.median(timings) * 1000:>10.0f}"
+          f"{timings[-1] * 1000:>10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="config.urls", help="Module to import after django.setup()")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--pytest", action="store_true", help="Also time pytest --collect-only")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    # Bytecode is cached after the first run, as it is in a built image
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    print(f"{'':<32}{'min ms':>10}{'median ms':>10}{'max ms':>10}")
+    report("python -c pass", [time_command([sys.executable, "-c", "pass"], env) for _ in range(args.runs)])
+
+    boot = [sys.executable, "-c", f"import django; django.setup(); import {args.module}"]
+    time_command(boot, env)  # warm the bytecode cache
+    report(f"boot ({args.module})", [time_command(boot, env) for _ in range(args.runs)])
+
+    if args.pytest:
+        collect = [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider"]
+        time_command(collect, env)
+        report("pytest --collect-only", [time_command(collect, env) for _ in range(max(args.runs // 2, 1))])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark: encode/decode cost and Redis memory of cached values per codec.
+
+Compares the old JSON text encoding with every serializer/compressor pair
+available in apps/clients_contracts/cache_codecs.py, on payloads shaped like
+what the views cache: a contract detail, an analysis result and a contract list.
+
+Usage (from backend/, Redis optional):
+    python benchmarks/bench_cache_codecs.py --iterations 2000
+    python benchmarks/bench_cache_codecs.py --no-redis
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from django.conf import settings
+
+settings.configure()
+
+from apps.clients_contracts.cache_codecs import CacheCodec, COMPRESSORS, SERIALIZERS
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/1")
+KEY_PREFIX = "bench:codec:"
+
+CLAUSE_TEXT = (
+    "The Supplier shall indemnify and hold harmless the Client against all losses, "
+    "damages and expenses arising from any breach of this Agreement. "
+)
+ANALYSIS_TEXT = (
+    "**Key terms:** payment within 30 days of invoice; termination for convenience on "
+    "60 days' notice.\n**Risks:** the limitation of liability excludes indirect damages "
+    "but has no cap on direct damages.\n"
+)
+
+
+def make_payloads():
+    clauses = [
+        {"type": f"Clause {i}", "content": CLAUSE_TEXT * 3, "risk_level": "medium", "explanation": "Broad scope."}
+        for i in range(25)
+    ]
+    contract = {
+        "_id": "60f7b3c4e1b2c3d4e5f6a7b8",
+        "title": "Master Services Agreement",
+        "client": "Acme Corporation",
+        "signed": True,
+        "date": "2025-01-15",
+        "text": CLAUSE_TEXT * 400,
+        "analysis": ANALYSIS_TEXT * 40,
+        "clauses": clauses,
+        "body_sizes": {"text": 60000, "analysis": 9000},
+    }
+    analysis = {
+        "contract_id": "60f7b3c4e1b2c3d4e5f6a7b8",
+        "analysis": ANALYSIS_TEXT * 40,
+        "model_used": "deepseek-chat",
+        "analysis_date": "2025-01-15T12:00:00",
+    }
+    contract_list = [
+        {"_id": f"60f7b3c4e1b2c3d4e5f6{i:04x}", "title": f"Contract {i}", "client": "Acme Corporation",
+         "signed": bool(i % 2), "date": "2025-01-15", "body_sizes": {"text": 48000, "analysis": 4200}}
+        for i in range(200)
+    ]
+    return {"contract detail": contract, "analysis": analysis, "contract list": contract_list}
+
+
+class LegacyJsonCodec:
+    """The encoding used before the codec layer: json.dumps text"""
+    def encode(self, value):
+        return json.dumps(value, default=str)
+
+    def decode(self, payload):
+        return json.loads(payload)
+
+
+def time_per_op(func, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def redis_memory(redis_conn, key, payload):
+    if redis_conn is None:
+        return None
+    redis_conn.set(key, payload)
+    return redis_conn.memory_usage(key, samples=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--compress-min-bytes", type=int, default=1024)
+    parser.add_argument("--no-redis", action="store_true", help="skip the Redis memory measurement")
+    args = parser.parse_args()
+
+    redis_conn = None
+    if not args.no_redis:
+        try:
+            import redis
+            redis_conn = redis.Redis.from_url(REDIS_URL)
+            redis_conn.ping()
+        except Exception as e:
+            print(f"Redis unavailable ({e}); memory column skipped\n")
+            redis_conn = None
+
+    codecs = {"legacy json text": LegacyJsonCodec()}
+    for serializer in SERIALIZERS:
+        for compressor in COMPRESSORS:
+            codecs[f"{serializer}+{compressor}"] = CacheCodec(serializer, compressor, args.compress_min_bytes)
+
+    for payload_name, value in make_payloads().items():
+        print(f"== {payload_name}")
+        print(f"{'codec':<20}{'bytes':>10}{'encode us':>12}{'decode us':>12}{'redis bytes':>14}")
+        for codec_name, codec in codecs.items():
+            encoded = codec.encode(value)
+            encode_us = time_per_op(lambda: codec.encode(value), args.iterations)
+            decode_us = time_per_op(lambda: codec.decode(encoded), args.iterations)
+            memory = redis_memory(redis_conn, f"{KEY_PREFIX}{payload_name}:{codec_name}", encoded)
+            memory_col = f"{memory:>14}" if memory is not None else f"{'-':>14}"
+            print(f"{codec_name:<20}{len(encoded):>10}{encode_us:>12.1f}{decode_us:>12.1f}{memory_col}")
+        print()
+
+    if redis_conn is not None:
+        keys = list(redis_conn.scan_iter(match=f"{KEY_PREFIX}*"))
+        if keys:
+            redis_conn.unlink(*keys)
+
+
+if __name__ == "__main__":
+    main()
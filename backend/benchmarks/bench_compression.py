@@ -0,0 +1,85 @@
+"""
+Benchmark: response compression per encoding and level.
+
+Compresses a rendered contract detail and analysis with every available
+encoding, at the fast levels the middleware uses in the request path and the
+best levels used for precompressed analysis bodies, and prints size, ratio
+and time per body. The repeated sample text compresses better than real
+contracts; compare encodings with each other, not with production ratios.
+
+Usage (from backend/, no services needed):
+    python benchmarks/bench_compression.py --iterations 50
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import django
+from django.conf import settings
+
+settings.configure()
+django.setup()
+
+from apps.clients_contracts.compression import ENCODERS, available_encodings, compress
+from apps.clients_contracts.renderers import FastJSONRenderer
+
+CLAUSE_TEXT = (
+    "The Supplier shall indemnify and hold harmless the Client against all losses, "
+    "damages and expenses arising from any breach of this Agreement. "
+)
+ANALYSIS_TEXT = (
+    "**Key terms:** payment within 30 days of invoice; termination for convenience on "
+    "60 days' notice.\n**Risks:** the limitation of liability excludes indirect damages "
+    "but has no cap on direct damages.\n"
+)
+
+
+def make_bodies():
+    renderer = FastJSONRenderer()
+    clauses = [
+        {"type": f"Clause {i}", "content": CLAUSE_TEXT * 3, "risk_level": "medium", "explanation": "Broad scope."}
+        for i in range(60)
+    ]
+    detail = {"title": "Master Services Agreement", "client": "Acme Corporation", "text": CLAUSE_TEXT * 600,
+              "analysis": ANALYSIS_TEXT * 400, "clauses": clauses}
+    analysis = {"analysis": ANALYSIS_TEXT * 400, "model_used": "deepseek-reasoner",
+                "contract_title": "Master Services Agreement", "contract_client": "Acme Corporation"}
+    return {"contract detail": renderer.render(detail), "analysis": renderer.render(analysis)}
+
+
+def time_per_op(func, iterations):
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    missing = [name for name in ("zstd", "br") if name not in ENCODERS]
+    if missing:
+        print(f"Not installed, skipped: {', '.join(missing)}\n")
+
+    bodies = make_bodies()
+    print(f"{'body':<18}{'encoding':<12}{'KB':>8}{'ratio':>8}{'ms':>9}")
+    for name, body in bodies.items():
+        print(f"{name:<18}{'identity':<12}{len(body) / 1024:>8.1f}{1.0:>8.1f}{0.0:>9.3f}")
+        for encoding in available_encodings():
+            for best in (False, True):
+                compressed = compress(body, encoding, best=best)
+                seconds = time_per_op(lambda: compress(body, encoding, best=best), args.iterations)
+                label = f"{encoding} {'best' if best else 'fast'}"
+                print(f"{name:<18}{label:<12}{len(compressed) / 1024:>8.1f}"
+                      f"{len(body) / len(compressed):>8.1f}{seconds * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
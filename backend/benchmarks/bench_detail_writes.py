@@ -0,0 +1,95 @@
+"""
+Benchmark: latency of detail-view writes under concurrent load.
+
+Compares the old write path (update_one followed by find_one) with a single
+find_one_and_update(return_document=AFTER) using the hot-document projection.
+
+Usage (from backend/, with MongoDB running):
+    python benchmarks/bench_detail_writes.py --workers 16 --writes 2000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from pymongo import MongoClient, ReturnDocument
+from apps.clients_contracts.storage import HOT_PROJECTION
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+BENCH_DB_NAME = os.getenv("BENCH_DB_NAME", "genai_contracts_bench")
+
+
+def two_round_trips(collection, obj_id):
+    update = {"$set": {"signed": True, "updated_at": datetime.now().isoformat()}}
+    result = collection.update_one({"_id": obj_id}, update)
+    if result.matched_count == 0:
+        return None
+    return collection.find_one({"_id": obj_id}, HOT_PROJECTION)
+
+
+def single_round_trip(collection, obj_id):
+    update = {"$set": {"signed": True, "updated_at": datetime.now().isoformat()}}
+    return collection.find_one_and_update(
+        {"_id": obj_id}, update, projection=HOT_PROJECTION, return_document=ReturnDocument.AFTER
+    )
+
+
+def run(collection, ids, write, workers, writes):
+    def timed(i):
+        start = time.perf_counter()
+        write(collection, ids[i % len(ids)])
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        started = time.perf_counter()
+        latencies = sorted(executor.map(timed, range(writes)))
+        elapsed = time.perf_counter() - started
+    return {
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[int(len(latencies) * 0.50)] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "writes_per_s": writes / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--contracts", type=int, default=200)
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    collection = client[BENCH_DB_NAME]["contracts"]
+    collection.drop()
+    ids = collection.insert_many([
+        {"title": f"Bench Contract {i}", "client": "Bench Client", "signed": False, "date": "2025-01-01"}
+        for i in range(args.contracts)
+    ]).inserted_ids
+
+    # Warm up connections before measuring
+    run(collection, ids, single_round_trip, args.workers, args.workers * 10)
+
+    results = {
+        "update_one + find_one": run(collection, ids, two_round_trips, args.workers, args.writes),
+        "find_one_and_update": run(collection, ids, single_round_trip, args.workers, args.writes),
+    }
+    print(f"{'write path':<24}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'writes/s':>12}")
+    for name, stats in results.items():
+        print(f"{name:<24}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+              f"{stats['p99_ms']:>10.2f}{stats['writes_per_s']:>12.0f}")
+    saved = results["update_one + find_one"]["mean_ms"] - results["find_one_and_update"]["mean_ms"]
+    print(f"\nLatency saved per write (mean): {saved:.2f} ms")
+
+    client.drop_database(BENCH_DB_NAME)
+
+
+if __name__ == "__main__":
+    main()
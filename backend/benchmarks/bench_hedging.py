@@ -0,0 +1,98 @@
+"""
+Benchmark: DeepSeek tail latency with and without hedged requests.
+
+Starts the local stand-in server (deepseek_stub.py) and sends the same
+sequence of clause-extraction completions through AIService twice: once
+unhedged, and once with hedging enabled for the operation. Prints latency
+percentiles, how many requests were sent twice, and the estimated spend.
+
+Usage (from backend/, no services needed):
+    python benchmarks/bench_hedging.py --requests 400 --concurrency 8
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import django
+from django.conf import settings
+
+settings.configure()
+django.setup()
+
+from deepseek_stub import COMPLETIONS_PATH, add_latency_arguments, latency_from, make_server
+
+OPERATION = "extract_clauses"
+MODEL = "deepseek-chat"
+
+
+def percentile(latencies, q):
+    return latencies[min(int(len(latencies) * q), len(latencies) - 1)]
+
+
+def run(ai_service, policy, requests, concurrency):
+    from apps.clients_contracts.telemetry import collect_usage, map_in_context
+
+    ai_service.ai_hedging = policy
+    payload = {"model": MODEL, "messages": [{"role": "user", "content": "Short contract text"}]}
+
+    def timed(_, queued_at):
+        started = time.perf_counter()
+        ai_service.AIService._post_completion(payload, {}, 120, OPERATION).raise_for_status()
+        return time.perf_counter() - started
+
+    with collect_usage() as calls:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = sorted(map_in_context(executor, timed, range(requests)))
+        # Let losing hedges finish so their spend is counted
+        time.sleep(max(latencies))
+    sent = sum(1 for call in calls if call["outcome"] != "hedge_lost")
+    return {
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "duplicated": len(calls) - sent,
+        "cost_usd": sum(call["cost_usd"] for call in calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--budget", type=float, default=0.05, help="fraction of requests that may be hedged")
+    parser.add_argument("--warmup", type=int, default=50, help="requests sent first to learn the p95")
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    server = make_server(args.port, latency_from(args))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["DEEPSEEK_API_URL"] = f"http://127.0.0.1:{args.port}{COMPLETIONS_PATH}"
+
+    from apps.clients_contracts import ai_service
+    from apps.clients_contracts.hedging import HedgePolicy
+
+    unhedged = HedgePolicy((), (MODEL,), args.budget, default_delay=10)
+    hedged = HedgePolicy((OPERATION,), (MODEL,), args.budget, default_delay=10)
+    run(ai_service, hedged, args.warmup, args.concurrency)
+
+    print(f"{args.requests} requests, {args.concurrency} at a time; median {args.median}s, "
+          f"{args.tail_rate:.0%} take {args.tail_factor:g}x longer; hedge budget {args.budget:.0%}")
+    print(f"{'mode':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'dup':>6}{'cost $':>10}")
+    for name, policy in (("unhedged", unhedged), ("hedged", hedged)):
+        result = run(ai_service, policy, args.requests, args.concurrency)
+        print(f"{name:<10}{result['p50_ms']:>10.0f}{result['p95_ms']:>10.0f}{result['p99_ms']:>10.0f}"
+              f"{result['max_ms']:>10.0f}{result['duplicated']:>6}{result['cost_usd']:>10.4f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
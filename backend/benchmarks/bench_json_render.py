@@ -0,0 +1,116 @@
+"""
+Benchmark: DRF JSON rendering and parsing, stock vs orjson-backed classes.
+
+Renders payloads shaped like the contract detail (100 KB+ of text, analysis
+and clauses) and the contract list with DRF's JSONRenderer and with
+FastJSONRenderer, then parses the same bodies with JSONParser and
+FastJSONParser. The stock renderer gets the _id strings the views used to
+convert by hand, and the fast one gets the documents with ObjectIds as they
+come from Mongo.
+
+Usage (from backend/, no services needed):
+    python benchmarks/bench_json_render.py --iterations 500
+"""
+
+import argparse
+import copy
+import io
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import django
+from django.conf import settings
+
+settings.configure()
+django.setup()
+
+from bson import ObjectId
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from apps.clients_contracts.renderers import FastJSONParser, FastJSONRenderer, orjson
+
+CLAUSE_TEXT = (
+    "The Supplier shall indemnify and hold harmless the Client against all losses, "
+    "damages and expenses arising from any breach of this Agreement. "
+)
+ANALYSIS_TEXT = (
+    "**Key terms:** payment within 30 days of invoice; termination for convenience on "
+    "60 days' notice.\n**Risks:** the limitation of liability excludes indirect damages "
+    "but has no cap on direct damages.\n"
+)
+
+
+def make_payloads():
+    now = datetime(2025, 1, 15, 9, 0, tzinfo=timezone.utc)
+    clauses = [
+        {"type": f"Clause {i}", "content": CLAUSE_TEXT * 3, "risk_level": "medium", "explanation": "Broad scope."}
+        for i in range(60)
+    ]
+    detail = {
+        "_id": ObjectId(),
+        "title": "Master Services Agreement",
+        "client": "Acme Corporation",
+        "signed": True,
+        "date": "2025-01-15",
+        "text": CLAUSE_TEXT * 600,
+        "analysis": ANALYSIS_TEXT * 400,
+        "evaluation_reasoning": ANALYSIS_TEXT * 20,
+        "clauses": clauses,
+        "created_at": now,
+    }
+    contract_list = [
+        {"_id": ObjectId(), "title": f"Contract {i}", "client": "Acme Corporation", "signed": bool(i % 2),
+         "date": "2025-01-15", "approved": True, "clause_count": 12, "created_at": now,
+         "body_sizes": {"text": 48000, "analysis": 4200, "evaluation_reasoning": 1800, "clauses": 900}}
+        for i in range(1000)
+    ]
+    return {"contract detail": detail, "contract list (1000)": contract_list}
+
+
+def with_string_ids(payload):
+    """What the views did before: stringify every _id, then render"""
+    payload = copy.copy(payload)
+    documents = payload if isinstance(payload, list) else [payload]
+    for i, document in enumerate(documents):
+        documents[i] = dict(document, _id=str(document["_id"]))
+    return payload if isinstance(payload, list) else documents[0]
+
+
+def time_per_op(func, iterations):
+    func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed; FastJSONRenderer falls back to the stock encoder\n")
+
+    stock, fast = JSONRenderer(), FastJSONRenderer()
+    print(f"{'payload':<30}{'size KB':>9}{'stock ms':>11}{'fast ms':>10}{'speedup':>9}")
+    for name, payload in make_payloads().items():
+        body = fast.render(payload)
+        stock_s = time_per_op(lambda: stock.render(with_string_ids(payload)), args.iterations)
+        fast_s = time_per_op(lambda: fast.render(payload), args.iterations)
+        print(f"{'render ' + name:<30}{len(body) / 1024:>9.1f}{stock_s * 1000:>11.3f}"
+              f"{fast_s * 1000:>10.3f}{stock_s / fast_s:>8.1f}x")
+
+        stock_s = time_per_op(lambda: JSONParser().parse(io.BytesIO(body)), args.iterations)
+        fast_s = time_per_op(lambda: FastJSONParser().parse(io.BytesIO(body)), args.iterations)
+        print(f"{'parse ' + name:<30}{len(body) / 1024:>9.1f}{stock_s * 1000:>11.3f}"
+              f"{fast_s * 1000:>10.3f}{stock_s / fast_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
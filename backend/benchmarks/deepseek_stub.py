@@ -0,0 +1,110 @@
+"""
+Local stand-in for the DeepSeek chat completions API.
+
+Answers POST /v1/chat/completions with a canned completion after a random
+delay: log-normal around --median seconds, and --tail-factor times longer
+for a --tail-rate fraction of requests, like a replica that got stuck. Used
+by bench_hedging.py. Point the backend at it with:
+
+    DEEPSEEK_API_URL=http://127.0.0.1:8099/v1/chat/completions
+
+Usage (from backend/):
+    python benchmarks/deepseek_stub.py --port 8099 --median 0.5 --tail-rate 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/v1/chat/completions"
+CLAUSES = [{"type": "Payment Terms", "content": "Payment due within 30 days.",
+            "risk_level": "low", "obligations": ["Pay invoices within 30 days"]}]
+
+
+class LatencyModel:
+    def __init__(self, median: float, sigma: float, tail_rate: float, tail_factor: float, seed: int = None):
+        self.median = median
+        self.sigma = sigma
+        self.tail_rate = tail_rate
+        self.tail_factor = tail_factor
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            delay = self.median * self._random.lognormvariate(0, self.sigma)
+            if self._random.random() < self.tail_rate:
+                delay *= self.tail_factor
+        return delay
+
+
+def completion(model: str) -> dict:
+    return {
+        "id": "stub",
+        "object": "chat.completion",
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": json.dumps(CLAUSES)},
+                     "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1200, "completion_tokens": 150, "total_tokens": 1350,
+                  "prompt_cache_hit_tokens": 0, "prompt_cache_miss_tokens": 1200},
+    }
+
+
+def make_server(port: int, latency: LatencyModel, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != COMPLETIONS_PATH:
+                self.send_error(404)
+                return
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(latency.sample())
+            body = json.dumps(completion(payload.get("model", "deepseek-chat"))).encode()
+            try:
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up on this request
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def add_latency_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--median", type=float, default=0.5, help="median latency in seconds")
+    parser.add_argument("--sigma", type=float, default=0.25, help="log-normal spread")
+    parser.add_argument("--tail-rate", type=float, default=0.05, help="fraction of stuck requests")
+    parser.add_argument("--tail-factor", type=float, default=10.0, help="how much longer stuck requests take")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def latency_from(args) -> LatencyModel:
+    return LatencyModel(args.median, args.sigma, args.tail_rate, args.tail_factor, args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8099)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    server = make_server(args.port, latency_from(args))
+    print(f"DeepSeek stand-in on http://127.0.0.1:{args.port}{COMPLETIONS_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
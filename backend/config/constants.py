@@ -2,12 +2,14 @@ import os
 
 # API Configuration
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
-DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+DEEPSEEK_API_URL = os.getenv("DEEPSEEK_API_URL", "https://api.deepseek.com/v1/chat/completions")
 
 # Database Collections
 CONTRACTS_COLLECTION = "contracts"
 LOGS_COLLECTION = "logs"
 CLIENTS_COLLECTION = "clients"
+CONTRACT_BODIES_COLLECTION = "contract_bodies"
+AI_USAGE_COLLECTION = "ai_usage"
 
 # Metrics Tracking
 request_count = 0
@@ -15,6 +17,10 @@ cumulative_latency = 0.0
 
 # AI Model Configuration
 DEEPSEEK_MODEL = "deepseek-reasoner"
+# Contracts longer than CHUNK_THRESHOLD characters are sent in CHUNK_SIZE chunks, CHUNK_WORKERS at a time
+CHUNK_THRESHOLD = 50000
+CHUNK_SIZE = 20000
+CHUNK_WORKERS = 4
 
 # Pagination
 DEFAULT_PAGE_SIZE = 10
@@ -1,12 +1,103 @@
 # config/mongo.py
-from pymongo import MongoClient
+from pymongo import MongoClient, read_preferences
 import os
 from dotenv import load_dotenv
+from apps.clients_contracts.timing import MongoTimingListener
+from apps.clients_contracts.monitoring import CommandMonitor, PoolMonitor
 
 load_dotenv()  # Load variables from .env if needed
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "genai_contracts")
 
-client = MongoClient(MONGO_URI)
-db = client[MONGO_DB_NAME]
\ No newline at end of file
+# Read preference for read-heavy endpoints (lists, logs, usage); see read_db below
+MONGO_READ_HEAVY_PREFERENCE = os.getenv("MONGO_READ_HEAVY_PREFERENCE", "secondaryPreferred")
+# Secondaries lagging further behind than this are not read from (Mongo's minimum is 90)
+MONGO_MAX_STALENESS_SECONDS = int(os.getenv("MONGO_MAX_STALENESS_SECONDS", "-1"))
+
+READ_PREFERENCES = {
+    "primary": read_preferences.Primary,
+    "primaryPreferred": read_preferences.PrimaryPreferred,
+    "secondary": read_preferences.Secondary,
+    "secondaryPreferred": read_preferences.SecondaryPreferred,
+    "nearest": read_preferences.Nearest,
+}
+
+
+def _int_env(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def client_options():
+    """
+    MongoClient keyword arguments from the environment.
+
+    Only variables that are set are passed, so anything left unset keeps the
+    driver default, and options given in MONGO_URI still apply.
+
+        MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS
+        MONGO_COMPRESSORS                  e.g. "zstd,snappy,zlib"
+        MONGO_ZLIB_COMPRESSION_LEVEL
+        MONGO_CONNECT_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS
+        MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS
+        MONGO_RETRY_WRITES, MONGO_RETRY_READS   "true" / "false"
+        MONGO_APP_NAME
+    """
+    options = {
+        "maxPoolSize": _int_env("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": _int_env("MONGO_MIN_POOL_SIZE"),
+        "maxIdleTimeMS": _int_env("MONGO_MAX_IDLE_TIME_MS"),
+        "zlibCompressionLevel": _int_env("MONGO_ZLIB_COMPRESSION_LEVEL"),
+        "connectTimeoutMS": _int_env("MONGO_CONNECT_TIMEOUT_MS"),
+        "socketTimeoutMS": _int_env("MONGO_SOCKET_TIMEOUT_MS"),
+        "serverSelectionTimeoutMS": _int_env("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+        "waitQueueTimeoutMS": _int_env("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        "appname": os.getenv("MONGO_APP_NAME") or None,
+    }
+    if os.getenv("MONGO_COMPRESSORS"):
+        # The driver negotiates with the server and skips codecs it can't import
+        options["compressors"] = os.getenv("MONGO_COMPRESSORS")
+    for name, variable in (("retryWrites", "MONGO_RETRY_WRITES"), ("retryReads", "MONGO_RETRY_READS")):
+        if os.getenv(variable):
+            options[name] = os.getenv(variable).lower() == "true"
+    return {name: value for name, value in options.items() if value is not None}
+
+
+def create_client(uri=None, **overrides):
+    """
+    Build a MongoClient with the environment's pool, compression, timeout and
+    retry settings and the monitoring listeners.
+
+    Args:
+        uri: Connection string, MONGO_URI by default
+        **overrides: MongoClient options that take precedence over the environment
+
+    Returns:
+        MongoClient
+    """
+    options = client_options()
+    # Connect on the first operation rather than at import, so importing this
+    # module starts no threads and forked workers don't inherit live sockets
+    options.setdefault("connect", False)
+    options.update(overrides)
+    options.setdefault("event_listeners", [MongoTimingListener(), CommandMonitor(), PoolMonitor()])
+    return MongoClient(uri or MONGO_URI, **options)
+
+
+def read_preference(name=MONGO_READ_HEAVY_PREFERENCE, max_staleness=MONGO_MAX_STALENESS_SECONDS):
+    """Read preference instance for a mode name such as "secondaryPreferred" """
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference: {name}. Use one of {', '.join(READ_PREFERENCES)}")
+    if name == "primary":
+        return read_preferences.Primary()
+    return READ_PREFERENCES[name](max_staleness=max_staleness)
+
+
+client = create_client()
+db = client[MONGO_DB_NAME]
+
+# Same database, but reads may go to a secondary. Only for reads that tolerate
+# replication lag and are not written back to the cache; against a standalone
+# server every mode reads from the primary.
+read_db = db.with_options(read_preference=read_preference())
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so Server-Timing totals cover every other middleware
+    "apps.clients_contracts.timing.ServerTimingMiddleware",
+    # Above everything that reads or writes the body (see apps/clients_contracts/compression.py)
+    "apps.clients_contracts.compression.CompressionMiddleware",
+    # Before anything that does I/O, so Mongo and DeepSeek calls see the request deadline
+    "apps.clients_contracts.deadline.DeadlineMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -54,6 +61,8 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "apps.clients_contracts.views.RequestLogMiddleware",
     'corsheaders.middleware.CorsMiddleware',
+    # Removed from the stack at startup unless PROFILING_ENABLED is set
+    "apps.clients_contracts.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -75,6 +84,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+ASGI_APPLICATION = "config.asgi.application"
 
 
 # Database
@@ -130,10 +140,16 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
+    # orjson-backed JSON with ObjectId support; see apps/clients_contracts/renderers.py
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'apps.clients_contracts.renderers.FastJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.clients_contracts.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
@@ -196,13 +212,102 @@ CORS_ALLOWED_ORIGINS = [
 CACHES = {
     "default": {
         "BACKEND": "django_redis.cache.RedisCache",
-        "LOCATION": "redis://127.0.0.1:6379/1",
+        "LOCATION": os.getenv("REDIS_URL", "redis://127.0.0.1:6379/1"),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            # Fail fast so a Redis outage degrades to cache misses instead of stalling requests
+            "SOCKET_CONNECT_TIMEOUT": 1,
+            "SOCKET_TIMEOUT": 1,
+            # Reports Redis round trips to the per-request Server-Timing breakdown
+            "CONNECTION_POOL_CLASS": "apps.clients_contracts.redis_timing.TimedConnectionPool",
         }
     }
 }
 
+# In-process cache tier in front of Redis, kept coherent through pub/sub invalidation
+LOCAL_CACHE_ENABLED = os.getenv("LOCAL_CACHE_ENABLED", "true").lower() == "true"
+LOCAL_CACHE_MAX_ENTRIES = int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "2048"))
+LOCAL_CACHE_MAX_BYTES = int(os.getenv("LOCAL_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+LOCAL_CACHE_TTL = int(os.getenv("LOCAL_CACHE_TTL", "30"))
+
+# Encoding of cached values (see apps/clients_contracts/cache_codecs.py)
+CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "json")  # json or msgpack
+CACHE_COMPRESSOR = os.getenv("CACHE_COMPRESSOR", "zstd")  # zstd, lz4, zlib or none
+CACHE_COMPRESS_MIN_BYTES = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+
+# Stampede protection for recomputed cache entries (CacheManager.get_or_compute)
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", "300"))
+CACHE_XFETCH_BETA = float(os.getenv("CACHE_XFETCH_BETA", "1.0"))
+CACHE_LOCK_TIMEOUT = int(os.getenv("CACHE_LOCK_TIMEOUT", "120"))
+CACHE_LOCK_WAIT = int(os.getenv("CACHE_LOCK_WAIT", "30"))
+
+# Requests slower than this are logged with their timing breakdown, at the given sample rate
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", "2000"))
+SLOW_REQUEST_SAMPLE_RATE = float(os.getenv("SLOW_REQUEST_SAMPLE_RATE", "1.0"))
+
+# Seconds between flushes of each worker's metric deltas to Redis (see apps/clients_contracts/metrics.py)
+METRICS_FLUSH_INTERVAL = int(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+# How Prometheus gets into /metrics/ without a user token: a shared bearer token
+# and/or client networks (comma-separated CIDRs, e.g. "10.0.0.0/8"). Off when empty.
+# The networks are matched against the direct peer, so they only work for scrapes
+# that don't go through a proxy. Never list a proxy's network there: everyone it
+# forwards would get in. For scrapes through nginx, list nginx in
+# METRICS_TRUSTED_PROXIES instead, and its X-Forwarded-For is checked.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_ALLOWED_NETWORKS = [net.strip() for net in os.getenv("METRICS_ALLOWED_NETWORKS", "").split(",") if net.strip()]
+METRICS_TRUSTED_PROXIES = [net.strip() for net in os.getenv("METRICS_TRUSTED_PROXIES", "").split(",") if net.strip()]
+
+# Mongo commands slower than this are logged with their filter shape (see apps/clients_contracts/monitoring.py)
+MONGO_SLOW_QUERY_MS = int(os.getenv("MONGO_SLOW_QUERY_MS", "100"))
+
+# Threads per process for blocking calls made by async views (see apps/clients_contracts/aio.py)
+ASYNC_IO_WORKERS = int(os.getenv("ASYNC_IO_WORKERS", "32"))
+
+# Documents per batch when list endpoints stream (?stream=true, ?format=ndjson)
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "200"))
+
+# Request deadlines (X-Request-Timeout, see apps/clients_contracts/deadline.py); the cap stays
+# below nginx's proxy_read_timeout (300 s) so no work outlives the proxy connection
+REQUEST_TIMEOUT_DEFAULT = float(os.getenv("REQUEST_TIMEOUT_DEFAULT", "30"))
+REQUEST_TIMEOUT_MAX = float(os.getenv("REQUEST_TIMEOUT_MAX", "290"))
+AI_REQUEST_TIMEOUT = float(os.getenv("AI_REQUEST_TIMEOUT", "280"))
+
+# Admission control for AI-bound views (see apps/clients_contracts/admission.py), per worker
+# process; by default AI_RESERVED_WORKERS threads of the async I/O pool stay free for reads
+AI_RESERVED_WORKERS = int(os.getenv("AI_RESERVED_WORKERS", "8"))
+AI_MAX_IN_FLIGHT = int(os.getenv("AI_MAX_IN_FLIGHT", str(max(ASYNC_IO_WORKERS - AI_RESERVED_WORKERS, 1))))
+AI_MAX_QUEUE = int(os.getenv("AI_MAX_QUEUE", "16"))
+AI_MAX_PER_USER = int(os.getenv("AI_MAX_PER_USER", "2"))
+AI_QUEUE_TIMEOUT = float(os.getenv("AI_QUEUE_TIMEOUT", "10"))
+
+# DeepSeek circuit breaker, shared through Redis (see apps/clients_contracts/breaker.py)
+AI_BREAKER_FAILURE_THRESHOLD = int(os.getenv("AI_BREAKER_FAILURE_THRESHOLD", "5"))
+AI_BREAKER_WINDOW = float(os.getenv("AI_BREAKER_WINDOW", "60"))
+AI_BREAKER_COOLDOWN = float(os.getenv("AI_BREAKER_COOLDOWN", "30"))
+AI_BREAKER_PROBE_TIMEOUT = float(os.getenv("AI_BREAKER_PROBE_TIMEOUT", "150"))
+
+# Hedged DeepSeek requests (see apps/clients_contracts/hedging.py), off unless operations are listed,
+# e.g. AI_HEDGE_OPERATIONS=extract_clauses; AI_HEDGE_BUDGET is the fraction of calls that may be sent twice
+AI_HEDGE_OPERATIONS = [name.strip() for name in os.getenv("AI_HEDGE_OPERATIONS", "").split(",") if name.strip()]
+AI_HEDGE_MODELS = [name.strip() for name in os.getenv("AI_HEDGE_MODELS", "deepseek-chat").split(",") if name.strip()]
+AI_HEDGE_BUDGET = float(os.getenv("AI_HEDGE_BUDGET", "0.05"))
+AI_HEDGE_DEFAULT_DELAY = float(os.getenv("AI_HEDGE_DEFAULT_DELAY", "10"))
+
+# Model routing per AI operation (see apps/clients_contracts/routing.py); candidates and their
+# order can be changed with an AI_MODEL_ROUTES dict, latency priors with AI_MODEL_PRIOR_LATENCY
+AI_ROUTING_ENABLED = os.getenv("AI_ROUTING_ENABLED", "True").lower() == "true"
+AI_ROUTING_MAX_ERROR_RATE = float(os.getenv("AI_ROUTING_MAX_ERROR_RATE", "0.5"))
+AI_ROUTING_RECOVERY_HALF_LIFE = float(os.getenv("AI_ROUTING_RECOVERY_HALF_LIFE", "120"))
+
+# Response compression: smallest body worth compressing, and encodings in order of preference
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_ENCODINGS = [name.strip() for name in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if name.strip()]
+
+# On-demand profiling for staff (X-Profile: sample|cprofile)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+PROFILING_SAMPLE_INTERVAL = float(os.getenv("PROFILING_SAMPLE_INTERVAL", "0.005"))
+
 # Cache time settings
 CACHE_TTL = 60 * 15  # 15 minutes
 
@@ -29,6 +29,8 @@ from apps.clients_contracts.views import (
     HealthzView,
     ReadyzView,
     MetricsView,
+    UsageView,
+    ProfileView,
     LogsView,
     ClientListCreateView,
     ClientDetailView,
@@ -48,6 +50,7 @@ urlpatterns = [
     path('readyz/', ReadyzView.as_view(), name='ready'),
     path('metrics/', MetricsView.as_view(), name='metrics'),
     path('logs/', LogsView.as_view(), name='logs'),
+    path('api/profiles/<str:request_id>/', ProfileView.as_view(), name='profile-detail'),
     
     # Authentication
     path('api/auth/login/', LoginView.as_view(), name='login'),
@@ -66,4 +69,7 @@ urlpatterns = [
     path('api/clients/', ClientListCreateView.as_view(), name='clients'),
     path('api/clients/<str:client_id>/', ClientDetailView.as_view(), name='client-detail'),
     path('api/clients/<str:client_id>/contracts/', ClientContractsView.as_view(), name='client-contracts'),
+    
+    # AI usage
+    path('api/usage/', UsageView.as_view(), name='ai-usage'),
 ]
@@ -1,7 +1,7 @@
 import pytest
 import os
 import sys
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from django.test import override_settings
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
@@ -11,6 +11,30 @@ from rest_framework_simplejwt.tokens import RefreshToken
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
 
 from apps.clients_contracts.views import contracts_collection, clients_collection
+from apps.clients_contracts.cache import clear_all_cache
+
+
+def completion(content="Approved.", status_code=200, retry_after=None):
+    """
+    Build a mock DeepSeek chat completion response.
+    """
+    response = Mock()
+    response.status_code = status_code
+    response.headers = {'Retry-After': retry_after} if retry_after is not None else {}
+    response.json.return_value = {
+        "choices": [{"message": {"content": content}}],
+        "usage": {"prompt_tokens": 1000, "completion_tokens": 100},
+    }
+    return response
+
+
+@pytest.fixture(autouse=True)
+def no_metrics_flusher():
+    """
+    Keep tests from starting the background thread that flushes metrics to Redis.
+    """
+    with patch('apps.clients_contracts.metrics._ensure_flusher'):
+        yield
 
 
 @pytest.fixture(scope='session')
@@ -164,6 +188,7 @@ def clean_mongodb():
         clients_collection.delete_many({})
     except:
         pass
+    clear_all_cache()
 
 
 @pytest.fixture
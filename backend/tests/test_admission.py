@@ -0,0 +1,169 @@
+import unittest
+from unittest.mock import Mock, patch
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+import mongomock
+from django.test import RequestFactory
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.clients_contracts.admission import (
+    AdmissionController, admit, ai_admission, REASON_QUEUE_FULL, REASON_QUEUE_TIMEOUT, REASON_USER_LIMIT,
+)
+from apps.clients_contracts.views import ClientDetailView, ContractEvaluationView
+from apps.clients_contracts.deadline import deadline_scope
+
+
+class TestAdmission(unittest.TestCase):
+    """Test admission control for the AI-bound views."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def controller(self, **limits):
+        options = dict(max_in_flight=1, max_queue=1, max_per_user=2, queue_timeout=1)
+        options.update(limits)
+        return AdmissionController('test', **options)
+
+    def test_limits(self):
+        """Test in-flight, queue and per-user limits with 429 vs 503."""
+        controller = self.controller(max_queue=0)
+
+        self.assertIsNone(controller.acquire('alice'))
+        busy = controller.acquire('bob')
+        controller.release('alice', 10)
+
+        self.assertEqual((busy.status_code, busy.reason), (503, REASON_QUEUE_FULL))
+        self.assertGreaterEqual(busy.retry_after, 1)
+        self.assertEqual(controller.in_flight, 0)
+
+        controller = self.controller(max_in_flight=5, max_per_user=1)
+        self.assertIsNone(controller.acquire('alice'))
+        greedy = controller.acquire('alice')
+        self.assertEqual((greedy.status_code, greedy.reason), (429, REASON_USER_LIMIT))
+        self.assertIsNone(controller.acquire('bob'))
+
+    def test_queued_request_gets_the_next_slot(self):
+        """Test that a waiting request is admitted when a slot frees up."""
+        controller = self.controller()
+        controller.acquire('alice')
+        results = []
+
+        waiter = threading.Thread(target=lambda: results.append(controller.acquire('bob')))
+        waiter.start()
+        time.sleep(0.05)
+        self.assertEqual(controller.queued, 1)
+        controller.release('alice', 1)
+        waiter.join(1)
+
+        self.assertEqual(results, [None])
+        self.assertEqual((controller.in_flight, controller.queued), (1, 0))
+
+    def test_queue_wait_stops_at_deadline(self):
+        """Test that a queued request gives up at the request deadline."""
+        controller = self.controller(queue_timeout=30)
+        controller.acquire('alice')
+
+        started = time.monotonic()
+        with deadline_scope(0.1):
+            rejection = controller.acquire('bob')
+
+        self.assertEqual((rejection.status_code, rejection.reason), (503, REASON_QUEUE_TIMEOUT))
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(controller.queued, 0)
+
+    def test_async_wait_does_not_block_the_loop(self):
+        """Test async acquisition while another coroutine releases the slot."""
+        controller = self.controller()
+
+        async def scenario():
+            await controller.acquire_async('alice')
+            waiter = asyncio.ensure_future(controller.acquire_async('bob'))
+            await asyncio.sleep(0.05)
+            self.assertEqual(controller.queued, 1)
+            controller.release('alice', 1)
+            return await waiter
+
+        self.assertIsNone(asyncio.run(scenario()))
+        self.assertEqual(controller.in_flight, 1)
+
+    def test_decorated_handlers(self):
+        """Test the decorator on sync and async handlers, and the rejection response."""
+        controller = self.controller(max_queue=0)
+        view = Mock()
+
+        @admit(controller)
+        def handler(view, request):
+            self.assertEqual(controller.in_flight, 1)
+            return 'ran'
+
+        @admit(controller)
+        async def async_handler(view, request):
+            return 'ran async'
+
+        request = self.factory.post('/api/contracts/')
+        self.assertEqual(handler(view, request), 'ran')
+        self.assertEqual(asyncio.run(async_handler(view, request)), 'ran async')
+        self.assertEqual(controller.in_flight, 0)
+
+        controller.acquire('other')
+        response = handler(view, request)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], str(response.data['retry_after']))
+
+    def test_reads_get_through_while_ai_slots_are_saturated(self):
+        """Test under ASGI that queued AI requests leave the loop and pool free for reads."""
+        factory = APIRequestFactory()
+        clients = mongomock.MongoClient().db.clients
+        client_id = str(clients.insert_one({'name': 'Reader'}).inserted_id)
+        ai_service = Mock()
+        ai_service.evaluate_contract.side_effect = lambda text: time.sleep(0.5) or {'approved': True, 'reasoning': 'Fine.'}
+
+        def request(method, path, user_id, **kwargs):
+            request = getattr(factory, method)(path, **kwargs)
+            force_authenticate(request, user=Mock(is_authenticated=True, pk=user_id))
+            return request
+
+        def evaluation(user_id):
+            return ContractEvaluationView.as_view()(
+                request('post', '/api/contracts/evaluate/', user_id, data={'text': 'Contract'}, format='json')
+            )
+
+        async def scenario():
+            running = asyncio.ensure_future(evaluation(1))
+            await asyncio.sleep(0.05)
+            queued = asyncio.ensure_future(evaluation(2))
+            await asyncio.sleep(0.05)
+            shed = await evaluation(3)
+            started = time.monotonic()
+            read = await ClientDetailView.as_view()(request('get', f'/api/clients/{client_id}/', 4), client_id=client_id)
+            elapsed = time.monotonic() - started
+            saturated = (ai_admission.in_flight, ai_admission.queued)
+            return shed, read, elapsed, saturated, await running, await queued
+
+        with patch.multiple(ai_admission, max_in_flight=1, max_queue=1, queue_timeout=5), \
+                patch('apps.clients_contracts.views.get_ai_service', return_value=ai_service), \
+                patch('apps.clients_contracts.views.AnalysisCache.get_or_compute_evaluation',
+                      side_effect=lambda text, compute, should_cache: compute()), \
+                patch('apps.clients_contracts.views.clients_collection', clients), \
+                patch('apps.clients_contracts.views.ClientCache') as client_cache:
+            client_cache.get_client.return_value = None
+            shed, read, elapsed, saturated, running, queued = asyncio.run(scenario())
+
+        self.assertEqual(shed.status_code, 503)
+        self.assertEqual(saturated, (1, 1))
+        self.assertEqual(read.status_code, 200)
+        self.assertEqual(read.data['name'], 'Reader')
+        self.assertLess(elapsed, 0.25)
+        self.assertEqual((running.status_code, queued.status_code), (200, 200))
+        self.assertEqual((ai_admission.in_flight, ai_admission.queued), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
 
 from apps.clients_contracts.ai_service import AIService
+from apps.clients_contracts.telemetry import collect_usage, estimate_cost, save_usage
 
 
 class TestAIService(unittest.TestCase):
@@ -261,5 +262,91 @@ class TestAIService(unittest.TestCase):
                 self.assertFalse(result)
 
 
+class TestAITelemetry(unittest.TestCase):
+    """Test per-call telemetry and usage records."""
+
+    def _response(self, usage):
+        response = Mock()
+        response.status_code = 200
+        response.json.return_value = {
+            "choices": [{"message": {"content": "The contract is approved."}}],
+            "usage": usage
+        }
+        return response
+
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_usage_is_collected(self, mock_post):
+        """Test that token counts, cost and outcome are recorded per call."""
+        mock_post.return_value = self._response({
+            "prompt_tokens": 1000, "completion_tokens": 200,
+            "prompt_cache_hit_tokens": 400, "prompt_cache_miss_tokens": 600,
+            "completion_tokens_details": {"reasoning_tokens": 150}
+        })
+
+        with collect_usage() as calls:
+            AIService.evaluate_contract("Short contract text")
+
+        self.assertEqual(len(calls), 1)
+        call = calls[0]
+        self.assertEqual((call['model'], call['operation'], call['outcome']), ('deepseek-reasoner', 'evaluate', 'ok'))
+        self.assertEqual((call['prompt_tokens'], call['cached_tokens'], call['reasoning_tokens']), (1000, 400, 150))
+        self.assertFalse(call['chunked'])
+        self.assertGreater(call['cost_usd'], 0)
+
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_chunk_workers_report_to_the_caller(self, mock_post):
+        """Test that chunk calls made in executor threads reach the collector with queue wait."""
+        mock_post.return_value = self._response({"prompt_tokens": 10, "completion_tokens": 5})
+
+        with collect_usage() as calls:
+            AIService.analyze_contract("x" * 60000)
+
+        self.assertEqual(len(calls), 3)
+        self.assertTrue(all(call['chunked'] for call in calls))
+        self.assertTrue(all(call['queue_wait'] is not None for call in calls))
+
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_timeouts_are_recorded_as_failures(self, mock_post):
+        """Test that a timed-out call is recorded and the fallback still returned."""
+        import requests
+        mock_post.side_effect = requests.exceptions.Timeout()
+
+        with collect_usage() as calls:
+            result = AIService.analyze_contract("Short contract text")
+
+        self.assertEqual(result['model_used'], 'Fallback Response')
+        self.assertEqual(calls[0]['outcome'], 'timeout')
+
+    def test_estimate_cost(self):
+        """Test pricing of cache hits, misses and output tokens."""
+        cost = estimate_cost('deepseek-chat', {
+            'prompt_tokens': 1_000_000, 'prompt_cache_hit_tokens': 500_000, 'completion_tokens': 1_000_000
+        })
+
+        self.assertAlmostEqual(cost, 0.07 / 2 + 0.27 / 2 + 1.10)
+        self.assertEqual(estimate_cost('unknown-model', {'prompt_tokens': 100}), 0.0)
+
+    @patch('apps.clients_contracts.telemetry.usage_collection')
+    def test_save_usage_groups_by_operation_and_model(self, mock_collection):
+        """Test that chunk calls are summed into one usage record."""
+        calls = [
+            {'model': 'deepseek-reasoner', 'operation': 'analyze', 'outcome': 'ok', 'chunked': True,
+             'wall_time': 2.0, 'queue_wait': 0.5, 'retries': 1, 'status_code': 200, 'prompt_tokens': 100,
+             'completion_tokens': 10, 'cached_tokens': 0, 'reasoning_tokens': 0, 'cost_usd': 0.001},
+            {'model': 'deepseek-reasoner', 'operation': 'analyze', 'outcome': 'timeout', 'chunked': True,
+             'wall_time': 60.0, 'queue_wait': None, 'retries': 0, 'status_code': None, 'prompt_tokens': 0,
+             'completion_tokens': 0, 'cached_tokens': 0, 'reasoning_tokens': 0, 'cost_usd': 0.0},
+        ]
+
+        self.assertEqual(save_usage(calls, '60f7b3c4e1b2c3d4e5f6a7b8', 1, 'ContractReanalyzeView'), 1)
+
+        record = mock_collection.insert_many.call_args[0][0][0]
+        self.assertEqual(record['calls'], 2)
+        self.assertEqual(record['failed_calls'], 1)
+        self.assertEqual(record['prompt_tokens'], 100)
+        self.assertEqual(record['max_wall_time'], 60.0)
+        self.assertEqual(record['contract_id'], '60f7b3c4e1b2c3d4e5f6a7b8')
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,139 @@
+import unittest
+from unittest.mock import patch, Mock
+import os
+import sys
+import asyncio
+import threading
+import time
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+import mongomock
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.test import RequestFactory
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.clients_contracts.aio import AsyncCollection, run_sync
+from apps.clients_contracts.timing import ServerTimingMiddleware, span, current_timer
+from apps.clients_contracts.views import (
+    ClientContractsView, ClientDetailView, ClientListCreateView, ContractAnalysisView, ContractDetailView,
+    ContractEvaluationView, ContractListCreateView, ContractReanalyzeView, HealthzView, LogsView,
+)
+
+
+class TestAsyncViews(unittest.TestCase):
+    """Test the async view helpers and ASGI support."""
+
+    def test_run_sync_uses_pool_thread_and_caller_context(self):
+        """Test that blocking calls leave the loop thread but keep the request timer."""
+        factory = RequestFactory()
+        loop_thread = []
+
+        async def view(request):
+            loop_thread.append(threading.get_ident())
+
+            def blocking():
+                with span('mongo'):
+                    return threading.get_ident(), current_timer().request_id
+            return await run_sync(blocking)
+
+        async def middleware_view(request):
+            thread_id, request_id = await view(request)
+            self.assertNotEqual(thread_id, loop_thread[0])
+            self.assertEqual(request_id, 'req-async')
+            return HttpResponse('ok')
+
+        middleware = ServerTimingMiddleware(middleware_view)
+        response = asyncio.run(middleware(factory.get('/', HTTP_X_REQUEST_ID='req-async')))
+
+        self.assertEqual(response['X-Request-ID'], 'req-async')
+        self.assertIn('mongo;dur=', response['Server-Timing'])
+
+    def test_async_collection(self):
+        """Test the awaitable collection wrapper."""
+        collection = AsyncCollection(mongomock.MongoClient().db.contracts)
+
+        async def scenario():
+            await collection.insert_one({'_id': 1, 'date': '2025-01-01'})
+            await collection.insert_one({'_id': 2, 'date': '2025-02-01'})
+            await collection.update_one({'_id': 1}, {'$set': {'signed': True}})
+            newest = await collection.find_list({}, sort=[('date', -1)], limit=1)
+            first = await collection.find_one({'_id': 1})
+            count = await collection.count_documents({})
+            return newest, first, count
+
+        newest, first, count = asyncio.run(scenario())
+
+        self.assertEqual([doc['_id'] for doc in newest], [2])
+        self.assertTrue(first['signed'])
+        self.assertEqual(count, 2)
+
+    def test_views_are_async(self):
+        """Test that Django dispatches the hot, AI and client views as coroutines."""
+        for view in (ContractListCreateView, ContractDetailView, LogsView, ContractAnalysisView,
+                     ContractEvaluationView, ContractReanalyzeView, ClientListCreateView, ClientDetailView,
+                     ClientContractsView):
+            self.assertTrue(view.view_is_async, view.__name__)
+
+    def test_slow_ai_call_does_not_block_async_get(self):
+        """Test that a slow AI call on the I/O pool doesn't hold up a concurrent async GET."""
+        factory = APIRequestFactory()
+        user = Mock(is_authenticated=True, pk=1)
+
+        def slow_evaluation(text):
+            time.sleep(0.5)
+            return {'approved': True, 'reasoning': 'Fine.'}
+
+        ai_service = Mock()
+        ai_service.evaluate_contract.side_effect = slow_evaluation
+        post = factory.post('/api/contracts/evaluate/', {'text': 'Contract text'}, format='json')
+        get = factory.get('/api/healthz/')
+        force_authenticate(post, user=user)
+        force_authenticate(get, user=user)
+
+        async def scenario():
+            evaluation = asyncio.ensure_future(ContractEvaluationView.as_view()(post))
+            await asyncio.sleep(0.05)
+            started = time.monotonic()
+            health = await HealthzView.as_view()(get)
+            elapsed = time.monotonic() - started
+            return health, elapsed, await evaluation
+
+        with patch('apps.clients_contracts.views.get_ai_service', return_value=ai_service), \
+                patch('apps.clients_contracts.views.AnalysisCache.get_or_compute_evaluation',
+                      side_effect=lambda text, compute, should_cache: compute()):
+            health, elapsed, evaluation = asyncio.run(scenario())
+
+        self.assertEqual(health.status_code, 200)
+        self.assertLess(elapsed, 0.25)
+        self.assertEqual(evaluation.status_code, 200)
+        self.assertTrue(evaluation.data['approved'])
+
+    def test_authentication_runs_on_the_sync_thread(self):
+        """Test that DRF's initial() runs where Django keeps the ORM connection, not on the I/O pool."""
+        get = APIRequestFactory().get('/api/healthz/')
+        force_authenticate(get, user=Mock(is_authenticated=True, pk=1))
+        initial = HealthzView.initial
+        threads = []
+
+        def record_thread(view, request, *args, **kwargs):
+            threads.append(threading.get_ident())
+            return initial(view, request, *args, **kwargs)
+
+        async def scenario():
+            response = await HealthzView.as_view()(get)
+            sync_thread = await sync_to_async(threading.get_ident)()
+            pool_thread = await run_sync(threading.get_ident)
+            return response, sync_thread, pool_thread
+
+        with patch.object(HealthzView, 'initial', record_thread):
+            response, sync_thread, pool_thread = asyncio.run(scenario())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(threads, [sync_thread])
+        self.assertNotEqual(threads[0], pool_thread)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import patch, Mock
+import os
+import sys
+import time
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+import requests
+from django.core.cache.backends.locmem import LocMemCache
+from apps.clients_contracts.ai_service import AIService, AICircuitOpen
+from apps.clients_contracts.breaker import CircuitBreaker, CircuitOpen, deepseek_breaker
+from apps.clients_contracts.telemetry import collect_usage
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test the circuit breaker around DeepSeek calls."""
+
+    def setUp(self):
+        self.cache = LocMemCache('test-breaker', {})
+        self.cache.clear()
+        patcher = patch('apps.clients_contracts.breaker.cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker('test', failure_threshold=3, window=60, cooldown=30, probe_timeout=150)
+
+    def fail(self, times):
+        for _ in range(times):
+            self.breaker.record(self.breaker.allow(), False)
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the threshold opens the circuit and a success resets the streak."""
+        self.fail(2)
+        self.breaker.record(self.breaker.allow(), True)
+        self.fail(2)
+        self.assertEqual(self.breaker.snapshot(), {'state': 'closed', 'failures': 2})
+
+        self.fail(1)
+
+        with self.assertRaises(CircuitOpen) as raised:
+            self.breaker.allow()
+        self.assertGreater(raised.exception.retry_after, 29)
+        self.assertEqual(self.breaker.snapshot()['state'], 'open')
+
+    def test_single_probe_after_cooldown(self):
+        """Test that one probe goes through once the cooldown is over, and its outcome decides."""
+        self.fail(3)
+        later = time.time() + 31
+
+        with patch('apps.clients_contracts.breaker.time.time', return_value=later):
+            self.assertEqual(self.breaker.snapshot()['state'], 'half_open')
+            self.assertTrue(self.breaker.allow())
+            with self.assertRaises(CircuitOpen):
+                self.breaker.allow()
+
+            # A failed probe opens the circuit for another cooldown
+            self.breaker.record(True, False)
+            with self.assertRaises(CircuitOpen):
+                self.breaker.allow()
+
+        with patch('apps.clients_contracts.breaker.time.time', return_value=later + 31):
+            probe = self.breaker.allow()
+            self.breaker.record(probe, None)
+            self.assertTrue(self.breaker.allow())
+            self.breaker.record(True, True)
+
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.snapshot(), {'state': 'closed', 'failures': 0})
+
+    @patch('apps.clients_contracts.breaker.cache.get', side_effect=ConnectionError('Redis unavailable'))
+    def test_fails_open_without_cache(self, mock_get):
+        """Test that calls go through when the breaker state cannot be read."""
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.snapshot()['state'], 'unknown')
+
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_open_circuit_skips_deepseek(self, mock_post):
+        """Test that an open circuit fails fast, without retries, and callers fall back."""
+        mock_post.side_effect = requests.exceptions.ConnectionError()
+        for _ in range(deepseek_breaker.failure_threshold):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                AIService._send({"model": "deepseek-chat"}, {}, 60)
+        mock_post.reset_mock()
+
+        with collect_usage() as calls:
+            result = AIService.analyze_contract("Short contract text")
+            with self.assertRaises(AICircuitOpen):
+                AIService._post_completion({"model": "deepseek-chat"}, {}, 60, "evaluate")
+
+        mock_post.assert_not_called()
+        self.assertEqual(result['model_used'], 'Fallback Response')
+        self.assertEqual(calls[0]['outcome'], 'circuit_open')
+        self.assertTrue(issubclass(AICircuitOpen, CircuitOpen))
+
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_client_errors_do_not_count(self, mock_post):
+        """Test that 4xx answers other than 429 are not service failures."""
+        mock_post.return_value = Mock(status_code=400)
+
+        for _ in range(deepseek_breaker.failure_threshold + 1):
+            AIService._send({"model": "deepseek-chat"}, {}, 60)
+
+        self.assertEqual(deepseek_breaker.snapshot()['state'], 'closed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,359 @@
+import unittest
+from unittest.mock import patch, Mock
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from django.core.cache.backends.locmem import LocMemCache
+from apps.clients_contracts.cache import (
+    CacheManager,
+    ContractCache,
+    AnalysisCache,
+    cache_result,
+    make_function_key,
+    LocalCache,
+    local_cache,
+    get_tier_stats,
+    CONTRACT_LISTS_NAMESPACE,
+    INVALIDATION_CHANNEL,
+)
+from apps.clients_contracts.cache_codecs import (
+    CacheCodec,
+    COMPRESSORS,
+    SERIALIZERS,
+    COMPRESSION_NONE,
+    FORMAT_STR,
+    HEADER_SIZE,
+    default_codec,
+)
+
+
+class TestCacheKeys(unittest.TestCase):
+    """Test cache key generation and namespace versioning."""
+
+    def setUp(self):
+        """Use an in-process cache backend instead of Redis."""
+        self.local_cache = LocMemCache('test-cache-keys', {})
+        patcher = patch('apps.clients_contracts.cache.cache', self.local_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+    def test_generate_cache_key_uses_colon_separators(self):
+        """Test that keys match the prefix:part:part layout patterns expect."""
+        key = CacheManager.generate_cache_key('contract:', 'user', '42')
+
+        self.assertEqual(key, 'contract:user:42')
+
+    def test_bump_namespace_changes_versioned_keys(self):
+        """Test that bumping a namespace retires its keys without deleting them."""
+        ContractCache.cache_user_contracts('42', [{'title': 'Old list'}])
+        self.assertEqual(ContractCache.get_user_contracts('42'), [{'title': 'Old list'}])
+
+        ContractCache.invalidate_contract('60f7b3c4e1b2c3d4e5f6a7b8')
+
+        self.assertIsNone(ContractCache.get_user_contracts('42'))
+
+    def test_namespace_version_is_seeded_from_clock(self):
+        """Test that a missing generation counter is not restarted at 1."""
+        version = CacheManager.get_namespace_version(CONTRACT_LISTS_NAMESPACE)
+
+        self.assertGreater(version, 1)
+        self.assertEqual(CacheManager.get_namespace_version(CONTRACT_LISTS_NAMESPACE), version)
+        CacheManager.bump_namespace(CONTRACT_LISTS_NAMESPACE)
+        self.assertEqual(CacheManager.get_namespace_version(CONTRACT_LISTS_NAMESPACE), version + 1)
+
+    @patch('django_redis.get_redis_connection')
+    def test_delete_pattern_scans_in_batches(self, mock_get_connection):
+        """Test that pattern deletion uses SCAN and UNLINK instead of KEYS."""
+        redis_conn = Mock()
+        redis_conn.scan_iter.return_value = iter([f'key{i}' for i in range(1200)])
+        redis_conn.unlink.side_effect = lambda *keys: len(keys)
+        mock_get_connection.return_value = redis_conn
+
+        deleted = CacheManager.delete_pattern('contract:user:*')
+
+        self.assertEqual(deleted, 1200)
+        self.assertEqual(redis_conn.unlink.call_count, 3)
+        redis_conn.keys.assert_not_called()
+
+
+class TestBatchOperations(unittest.TestCase):
+    """Test multi-key cache operations."""
+
+    def setUp(self):
+        """Use an in-process cache backend instead of Redis."""
+        self.locmem = LocMemCache('test-batch', {})
+        patcher = patch('apps.clients_contracts.cache.cache', self.locmem)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+    def test_set_many_and_get_many(self):
+        """Test that values round-trip and missing keys are left out."""
+        CacheManager.set_many({'contract:1': {'title': 'One'}, 'contract:2': 'two'})
+        local_cache.clear()
+
+        with patch.object(self.locmem, 'get_many', wraps=self.locmem.get_many) as mock_get_many:
+            found = CacheManager.get_many(['contract:1', 'contract:2', 'contract:3'])
+
+        self.assertEqual(found, {'contract:1': {'title': 'One'}, 'contract:2': 'two'})
+        mock_get_many.assert_called_once_with(['contract:1', 'contract:2', 'contract:3'])
+
+    def test_get_many_only_fetches_local_misses(self):
+        """Test that keys held in the local tier are not requested from Redis."""
+        CacheManager.set_many({'contract:1': 'one', 'contract:2': 'two'})
+        local_cache.delete('contract:2')
+
+        with patch.object(self.locmem, 'get_many', wraps=self.locmem.get_many) as mock_get_many:
+            found = CacheManager.get_many(['contract:1', 'contract:2'])
+
+        self.assertEqual(found, {'contract:1': 'one', 'contract:2': 'two'})
+        mock_get_many.assert_called_once_with(['contract:2'])
+
+    def test_get_many_treats_undecodable_values_as_misses(self):
+        """Test that a payload this worker cannot decode is skipped instead of failing the batch."""
+        CacheManager.set_many({'contract:1': 'one', 'contract:2': 'two'})
+        local_cache.clear()
+        decode = default_codec.decode
+
+        def decode_or_fail(payload):
+            value = decode(payload)
+            if value == 'two':
+                raise ValueError('Unsupported cache compression: 9')
+            return value
+
+        with patch.object(default_codec, 'decode', side_effect=decode_or_fail):
+            found = CacheManager.get_many(['contract:1', 'contract:2'])
+
+        self.assertEqual(found, {'contract:1': 'one'})
+
+    def test_contract_summaries_are_invalidated(self):
+        """Test that invalidating contracts drops their list summaries."""
+        ContractCache.cache_contract_summaries({'1': {'title': 'One'}, '2': {'title': 'Two'}})
+
+        ContractCache.invalidate_contracts(['1'])
+
+        self.assertEqual(ContractCache.get_contract_summaries(['1', '2']), {'2': {'title': 'Two'}})
+
+
+class TestLocalCache(unittest.TestCase):
+    """Test the in-process tier in front of Redis."""
+
+    def test_evicts_least_recently_used_entry(self):
+        """Test that the entry cap evicts the coldest key."""
+        tier = LocalCache(max_entries=2, max_bytes=1000, ttl=30)
+        tier.set('a', 1, 1)
+        tier.set('b', 2, 1)
+        tier.get('a')
+        tier.set('c', 3, 1)
+
+        self.assertEqual(tier.get('a'), (True, 1))
+        self.assertEqual(tier.get('b'), (False, None))
+        self.assertEqual(tier.stats()['evictions'], 1)
+
+    def test_byte_cap(self):
+        """Test that the byte cap is enforced and oversized values are skipped."""
+        tier = LocalCache(max_entries=100, max_bytes=100, ttl=30)
+        tier.set('a', 'x', 60)
+        tier.set('b', 'y', 60)
+        tier.set('huge', 'z', 500)
+
+        self.assertEqual(tier.get('a'), (False, None))
+        self.assertEqual(tier.get('b'), (True, 'y'))
+        self.assertEqual(tier.get('huge'), (False, None))
+        self.assertEqual(tier.stats()['bytes'], 60)
+
+    @patch('apps.clients_contracts.cache.time.monotonic')
+    def test_entries_expire(self, mock_monotonic):
+        """Test that entries expire after the local TTL or the Redis timeout."""
+        mock_monotonic.return_value = 1000.0
+        tier = LocalCache(max_entries=10, max_bytes=1000, ttl=30)
+        tier.set('short', 1, 1, timeout=5)
+        tier.set('long', 2, 1)
+
+        mock_monotonic.return_value = 1010.0
+
+        self.assertEqual(tier.get('short'), (False, None))
+        self.assertEqual(tier.get('long'), (True, 2))
+
+    @patch('apps.clients_contracts.cache._ensure_invalidation_listener')
+    @patch('django_redis.get_redis_connection')
+    def test_delete_publishes_invalidation(self, mock_get_connection, mock_listener):
+        """Test that deleting a key evicts it locally and notifies other workers."""
+        redis_conn = Mock()
+        mock_get_connection.return_value = redis_conn
+        locmem = LocMemCache('test-local-tier', {})
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+        with patch('apps.clients_contracts.cache.cache', locmem):
+            CacheManager.set_cache('contract:1', {'title': 'Cached'})
+            locmem.clear()
+            self.assertEqual(CacheManager.get_cache('contract:1'), {'title': 'Cached'})
+
+            CacheManager.delete_cache('contract:1')
+            self.assertIsNone(CacheManager.get_cache('contract:1'))
+
+        channel, message = redis_conn.publish.call_args[0]
+        self.assertEqual(channel, INVALIDATION_CHANNEL)
+        self.assertIn('"keys": ["contract:1"]', message)
+
+    @patch('apps.clients_contracts.cache.LOCAL_CACHE_ENABLED', False)
+    def test_redis_tier_counts_concurrent_lookups(self):
+        """Test that Redis tier hits and misses from many threads are all counted."""
+        locmem = LocMemCache('test-redis-tier', {})
+        locmem.clear()
+
+        with patch('apps.clients_contracts.cache.cache', locmem):
+            CacheManager.set_cache('contract:1', {'title': 'Cached'})
+            before = get_tier_stats()['redis']
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda i: CacheManager.get_cache(f'contract:{i % 2}'), range(400)))
+            after = get_tier_stats()['redis']
+
+        self.assertEqual(after['hits'] - before['hits'], 200)
+        self.assertEqual(after['misses'] - before['misses'], 200)
+
+
+class TestStampedeProtection(unittest.TestCase):
+    """Test get_or_compute and the cache_result decorator."""
+
+    def setUp(self):
+        """Use an in-process cache backend instead of Redis."""
+        self.locmem = LocMemCache('test-stampede', {})
+        patcher = patch('apps.clients_contracts.cache.cache', self.locmem)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+
+    def test_concurrent_misses_compute_once(self):
+        """Test that a cold key is computed by one caller while the others wait."""
+        calls = []
+
+        @cache_result(timeout=60, key_prefix='test')
+        def slow_analysis(contract_id):
+            calls.append(contract_id)
+            time.sleep(0.2)
+            return {'analysis': f'Analysis of {contract_id}'}
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: slow_analysis('42'), range(8)))
+
+        self.assertEqual(calls, ['42'])
+        self.assertTrue(all(r == {'analysis': 'Analysis of 42'} for r in results))
+
+    def test_stale_value_served_during_single_refresh(self):
+        """Test that an expired value is returned while one background refresh runs."""
+        CacheManager.get_or_compute('stale-key', lambda: 'old', timeout=60)
+        refreshed = threading.Event()
+        compute = Mock(side_effect=lambda: refreshed.wait(2) and 'new')
+
+        with patch('apps.clients_contracts.cache.time.time', return_value=time.time() + 120):
+            first = CacheManager.get_or_compute('stale-key', compute, timeout=60)
+            second = CacheManager.get_or_compute('stale-key', compute, timeout=60)
+        refreshed.set()
+        deadline = time.monotonic() + 2
+        while CacheManager.get_cache('stale-key')['value'] != 'new' and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual((first, second), ('old', 'old'))
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual(CacheManager.get_cache('stale-key')['value'], 'new')
+
+    @patch('apps.clients_contracts.cache.random.random', return_value=0.9999999)
+    def test_early_refresh_near_expiry(self, mock_random):
+        """Test probabilistic early expiration for slow-to-compute values."""
+        CacheManager.set_cache('early-key', {
+            '__swr__': 1, 'value': 'cached', 'delta': 30.0, 'expiry': time.time() + 5
+        }, 60)
+
+        with patch('apps.clients_contracts.cache.CacheManager._refresh_in_background') as mock_refresh:
+            value = CacheManager.get_or_compute('early-key', lambda: 'fresh', timeout=60)
+
+        self.assertEqual(value, 'cached')
+        mock_refresh.assert_called_once()
+
+    def test_uncacheable_results_are_not_stored(self):
+        """Test that the should_cache predicate keeps fallback answers out of the cache."""
+        fallback = {'approved': False, 'reasoning': 'Contract evaluation temporarily unavailable.'}
+        compute = Mock(return_value=fallback)
+        should_cache = lambda r: not r['reasoning'].startswith('Contract evaluation temporarily unavailable')
+
+        AnalysisCache.get_or_compute_evaluation('Contract text', compute, should_cache)
+        AnalysisCache.get_or_compute_evaluation('Contract text', compute, should_cache)
+
+        self.assertEqual(compute.call_count, 2)
+
+    def test_function_keys_are_stable(self):
+        """Test that keys ignore kwarg order and are hashed."""
+        def analyze(text, model=None, temperature=None):
+            return text
+
+        first = make_function_key('func', analyze, ('a:b',), {'model': 'x', 'temperature': 0})
+        second = make_function_key('func', analyze, ('a:b',), {'temperature': 0, 'model': 'x'})
+        other = make_function_key('func', analyze, ('a', 'b'), {'model': 'x', 'temperature': 0})
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertTrue(first.startswith('func:'))
+        self.assertLessEqual(len(first), 250)
+
+
+class TestCacheCodec(unittest.TestCase):
+    """Test framed encoding of cached values."""
+
+    def test_round_trip_for_every_registered_codec(self):
+        """Test that all serializer/compressor pairs decode what they encode."""
+        analysis = {'analysis': 'The payment terms are standard. ' * 100, 'model_used': 'deepseek-chat'}
+        for serializer in SERIALIZERS:
+            for compressor in COMPRESSORS:
+                codec = CacheCodec(serializer, compressor, compress_min_bytes=256)
+                with self.subTest(serializer=serializer, compressor=compressor):
+                    self.assertEqual(codec.decode(codec.encode(analysis)), analysis)
+                    self.assertEqual(codec.decode(codec.encode([1, 'two'])), [1, 'two'])
+
+    def test_strings_are_not_parsed_as_json(self):
+        """Test that a cached string which looks like JSON comes back unchanged."""
+        codec = CacheCodec('json', 'zlib')
+        payload = codec.encode('{"looks": "like json"}')
+
+        self.assertEqual(payload[3], FORMAT_STR)
+        self.assertEqual(codec.decode(payload), '{"looks": "like json"}')
+        self.assertEqual(codec.decode(codec.encode(b'raw')), b'raw')
+
+    def test_small_bodies_are_not_compressed(self):
+        """Test the compression threshold."""
+        codec = CacheCodec('json', 'zlib', compress_min_bytes=1024)
+        small = codec.encode({'title': 'Short'})
+        large = codec.encode({'text': 'Confidential information. ' * 200})
+
+        self.assertEqual(small[4], COMPRESSION_NONE)
+        self.assertNotEqual(large[4], COMPRESSION_NONE)
+        self.assertLess(len(large) - HEADER_SIZE, len('Confidential information. ') * 200)
+
+    def test_legacy_json_text_is_still_readable(self):
+        """Test values cached before the codec layer existed."""
+        codec = CacheCodec()
+
+        self.assertEqual(codec.decode('{"title": "Old entry"}'), {'title': 'Old entry'})
+        self.assertEqual(codec.decode('plain text'), 'plain text')
+        self.assertEqual(codec.decode(5), 5)
+
+    def test_unavailable_codec_falls_back(self):
+        """Test that missing optional libraries fall back to json and zlib."""
+        codec = CacheCodec('bogus', 'bogus')
+
+        self.assertEqual((codec.serializer, codec.compressor), ('json', 'zlib'))
+
+
+if __name__ == '__main__':
+    unittest.main()
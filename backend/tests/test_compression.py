@@ -0,0 +1,148 @@
+import unittest
+from unittest.mock import patch, call
+import asyncio
+import gzip
+import os
+import sys
+import zlib
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from apps.clients_contracts.compression import (
+    CompressionMiddleware, _precompress_executor, choose_encoding, compress, parse_accept_encoding, precompress,
+    zstandard,
+)
+
+BODY = b'{"analysis": "' + b'Payment within 30 days of invoice. ' * 200 + b'"}'
+
+
+def json_response(body=BODY, **headers):
+    response = HttpResponse(body, content_type='application/json')
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+class TestCompression(unittest.TestCase):
+    """Test content negotiation and the compression middleware."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def request(self, accept='gzip'):
+        return self.factory.get('/', HTTP_ACCEPT_ENCODING=accept)
+
+    def test_negotiation(self):
+        """Test q-values, wildcards and the server's preference on ties."""
+        encodings = ['zstd', 'br', 'gzip']
+
+        self.assertEqual(parse_accept_encoding('gzip, br;q=0.5, *;q=0'), {'gzip': 1.0, 'br': 0.5, '*': 0.0})
+        self.assertEqual(choose_encoding('gzip, deflate, br, zstd', encodings), 'zstd')
+        self.assertEqual(choose_encoding('gzip, br;q=0.5', encodings), 'gzip')
+        self.assertEqual(choose_encoding('*', encodings), 'zstd')
+        self.assertEqual(choose_encoding('zstd;q=0, *', encodings), 'br')
+        self.assertIsNone(choose_encoding('identity', encodings))
+        self.assertIsNone(choose_encoding('', encodings))
+
+    def test_gzip_response(self):
+        """Test that large JSON bodies are compressed and the headers follow."""
+        middleware = CompressionMiddleware(lambda request: json_response(ETag='"abc"'))
+
+        response = middleware(self.request('gzip'))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+    @unittest.skipIf(zstandard is None, 'zstandard not installed')
+    def test_zstd_response(self):
+        """Test zstd round-trip."""
+        middleware = CompressionMiddleware(lambda request: json_response())
+
+        response = middleware(self.request('gzip, zstd'))
+
+        self.assertEqual(response['Content-Encoding'], 'zstd')
+        self.assertEqual(zstandard.ZstdDecompressor().decompress(response.content), BODY)
+
+    def test_skipped_responses(self):
+        """Test small, binary, already encoded and not-modified responses are left alone."""
+        cases = [
+            json_response(b'{"ok": true}'),
+            HttpResponse(BODY, content_type='application/pdf'),
+            json_response(**{'Content-Encoding': 'br'}),
+            json_response(**{'Cache-Control': 'no-transform'}),
+            HttpResponse(status=304),
+        ]
+        for original in cases:
+            response = CompressionMiddleware(lambda request: original)(self.request('gzip'))
+            self.assertNotEqual(response.get('Content-Encoding'), 'gzip')
+
+        response = CompressionMiddleware(lambda request: json_response())(self.request('identity'))
+        self.assertNotIn('Content-Encoding', response)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_streaming_flushes_each_chunk(self):
+        """Test that every streamed chunk can be decoded as soon as it arrives."""
+        chunks = [b'{"id": %d, "title": "Contract"}\n' % i for i in range(3)]
+        middleware = CompressionMiddleware(
+            lambda request: StreamingHttpResponse(iter(chunks), content_type='application/x-ndjson'))
+
+        response = middleware(self.request('gzip'))
+        decompressor = zlib.decompressobj(31)
+        decoded = [decompressor.decompress(part) for part in response.streaming_content]
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response)
+        self.assertEqual(decoded[:3], chunks)
+
+    def test_async_mode(self):
+        """Test async bodies and async streams under ASGI."""
+        async def chunks():
+            yield b'{"id": 1}\n'
+            yield b'{"id": 2}\n'
+
+        async def view(request):
+            if request.GET.get('stream'):
+                return StreamingHttpResponse(chunks(), content_type='application/x-ndjson')
+            return json_response()
+
+        async def collect(response):
+            return b''.join([part async for part in response.streaming_content])
+
+        middleware = CompressionMiddleware(view)
+        response = asyncio.run(middleware(self.request('gzip')))
+        streamed = asyncio.run(middleware(self.factory.get('/?stream=1', HTTP_ACCEPT_ENCODING='gzip')))
+
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertTrue(streamed.is_async)
+        self.assertEqual(gzip.decompress(asyncio.run(collect(streamed))), b'{"id": 1}\n{"id": 2}\n')
+
+    def test_precompressed_bodies_are_cached(self):
+        """Test that marked responses are served fast first, then from the best-level copy."""
+        store = {}
+        middleware = CompressionMiddleware(lambda request: precompress(json_response(), '"v1"'))
+
+        with patch('apps.clients_contracts.compression.CacheManager.get_cache', side_effect=store.get), \
+             patch('apps.clients_contracts.compression.CacheManager.set_cache',
+                   side_effect=lambda key, value, timeout: store.__setitem__(key, value)), \
+             patch('apps.clients_contracts.compression.compress', wraps=compress) as compressor:
+            first = middleware(self.request('gzip'))
+            # Wait for the background best-level job
+            _precompress_executor.submit(lambda: None).result()
+            second = middleware(self.request('gzip'))
+            third = middleware(self.request('gzip'))
+
+        self.assertEqual(compressor.call_args_list, [call(BODY, 'gzip'), call(BODY, 'gzip', best=True)])
+        self.assertEqual(gzip.decompress(first.content), BODY)
+        self.assertEqual(second.content, third.content)
+        self.assertEqual(gzip.decompress(second.content), BODY)
+        self.assertEqual(len(store), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import patch, Mock
+import os
+import sys
+from datetime import datetime
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from bson import ObjectId
+from django.test import RequestFactory
+from django.utils.http import http_date
+from apps.clients_contracts.conditional import (
+    document_validators, list_validators, make_etag, not_modified, set_validators,
+)
+from apps.clients_contracts.storage import ContractStorage
+
+
+class TestConditional(unittest.TestCase):
+    """Test ETag / Last-Modified validators and 304 handling."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.document = {'_id': ObjectId(), 'version': 3, 'updated_at': '2025-01-02T03:04:05'}
+
+    def test_etag_tracks_version_and_variant(self):
+        """Test that the ETag is strong and changes with the revision or body shape."""
+        etag = make_etag([self.document], 'ContractDetailView', 'json')
+
+        self.assertTrue(etag.startswith('"') and etag.endswith('"'))
+        self.assertEqual(etag, make_etag([dict(self.document, _id=str(self.document['_id']))],
+                                         'ContractDetailView', 'json'))
+        self.assertNotEqual(etag, make_etag([dict(self.document, version=4)], 'ContractDetailView', 'json'))
+        self.assertNotEqual(etag, make_etag([self.document], 'ContractDetailView', 'api'))
+
+    def test_legacy_documents(self):
+        """Test documents without a version fall back to updated_at / created_at."""
+        legacy = {'_id': ObjectId(), 'created_at': '2024-06-01T00:00:00'}
+
+        validators = document_validators(legacy)
+
+        self.assertEqual(validators.last_modified, int(datetime(2024, 6, 1).timestamp()))
+        self.assertNotEqual(validators.etag, document_validators(dict(legacy, updated_at='2024-07-01T00:00:00')).etag)
+
+    def test_list_validators(self):
+        """Test that list ETags cover order and membership and carry no Last-Modified."""
+        other = {'_id': ObjectId(), 'version': 1}
+
+        validators = list_validators([self.document, other])
+
+        self.assertIsNone(validators.last_modified)
+        self.assertNotEqual(validators.etag, list_validators([other, self.document]).etag)
+        self.assertNotEqual(validators.etag, list_validators([self.document]).etag)
+
+    def test_not_modified(self):
+        """Test If-None-Match and If-Modified-Since."""
+        validators = document_validators(self.document)
+        since = http_date(validators.last_modified)
+
+        matching = not_modified(self.factory.get('/', HTTP_IF_NONE_MATCH=validators.etag), validators)
+        stale = not_modified(self.factory.get('/', HTTP_IF_NONE_MATCH='"other"'), validators)
+        by_date = not_modified(self.factory.get('/', HTTP_IF_MODIFIED_SINCE=since), validators)
+
+        self.assertEqual(matching.status_code, 304)
+        self.assertEqual(matching['ETag'], validators.etag)
+        self.assertEqual(matching['Last-Modified'], since)
+        self.assertIsNone(stale)
+        self.assertEqual(by_date.status_code, 304)
+        self.assertIsNone(not_modified(self.factory.get('/'), validators))
+
+    def test_set_validators(self):
+        """Test the headers added to full responses."""
+        response = set_validators({}, document_validators(self.document))
+
+        self.assertIn('ETag', response)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+    def test_contract_updates_bump_version(self):
+        """Test that every contract write increments the version, which clients can't set."""
+        update = ContractStorage.build_update({'title': 'New', 'version': 99}, {})
+
+        self.assertEqual(update['$inc'], {'version': 1})
+        self.assertNotIn('version', update['$set'])
+
+
+if __name__ == '__main__':
+    unittest.main()
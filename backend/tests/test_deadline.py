@@ -0,0 +1,140 @@
+import unittest
+from unittest.mock import patch
+import asyncio
+import os
+import sys
+import time
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+import requests
+from django.http import HttpResponse
+from django.test import RequestFactory
+from pymongo import _csot
+from pymongo.errors import ExecutionTimeout
+from apps.clients_contracts.ai_service import AIService, AIDeadlineExceeded
+from apps.clients_contracts.aio import run_sync
+from apps.clients_contracts.deadline import (
+    DeadlineExceeded, DeadlineMiddleware, current_deadline, deadline_scope, remaining, timeout_for,
+)
+from apps.clients_contracts.telemetry import collect_usage
+from apps.clients_contracts.views import AI_REQUEST_TIMEOUT
+from tests.conftest import completion
+
+
+class TestDeadline(unittest.TestCase):
+    """Test request deadlines and how they bound Mongo and DeepSeek calls."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def budget_for(self, request):
+        seen = []
+
+        def view(request):
+            seen.append((current_deadline().budget, _csot.get_timeout()))
+            return HttpResponse('ok')
+
+        DeadlineMiddleware(view)(request)
+        return seen[0]
+
+    def test_timeout_for(self):
+        """Test that call timeouts shrink to the deadline and fail once it has passed."""
+        self.assertEqual(timeout_for(60), 60)
+        self.assertIsNone(remaining())
+
+        with deadline_scope(5):
+            self.assertLessEqual(timeout_for(60), 5)
+            self.assertEqual(timeout_for(1), 1)
+            with deadline_scope(100):
+                self.assertLessEqual(remaining(), 5)
+
+        with deadline_scope(0.001):
+            with self.assertRaises(DeadlineExceeded):
+                time.sleep(0.01)
+                timeout_for(60)
+
+    def test_budget_sources(self):
+        """Test header, per-view and default budgets, the cap and the Mongo timeout."""
+        budget, mongo_timeout = self.budget_for(self.factory.get('/api/contracts/', HTTP_X_REQUEST_TIMEOUT='2.5'))
+        self.assertEqual(budget, 2.5)
+        self.assertAlmostEqual(mongo_timeout, 2.5, places=1)
+
+        self.assertEqual(self.budget_for(self.factory.get('/api/contracts/'))[0], 30)
+        self.assertEqual(self.budget_for(self.factory.post('/api/contracts/'))[0], AI_REQUEST_TIMEOUT)
+        self.assertEqual(self.budget_for(self.factory.get('/nowhere/', HTTP_X_REQUEST_TIMEOUT='bogus'))[0], 30)
+        self.assertEqual(self.budget_for(self.factory.get('/', HTTP_X_REQUEST_TIMEOUT='9999'))[0], 290)
+        self.assertIsNone(current_deadline())
+
+    def test_async_mode(self):
+        """Test that async views and their pool calls see the deadline."""
+        async def view(request):
+            return HttpResponse(str(await run_sync(lambda: current_deadline().budget)))
+
+        response = asyncio.run(DeadlineMiddleware(view)(self.factory.get('/', HTTP_X_REQUEST_TIMEOUT='4')))
+
+        self.assertEqual(response.content, b'4.0')
+
+    def test_timeouts_become_504(self):
+        """Test that unhandled deadline and Mongo timeouts answer 504."""
+        middleware = DeadlineMiddleware(lambda request: HttpResponse('ok'))
+        request = self.factory.get('/')
+
+        self.assertEqual(middleware.process_exception(request, DeadlineExceeded()).status_code, 504)
+        self.assertEqual(middleware.process_exception(request, ExecutionTimeout('slow', 50)).status_code, 504)
+        self.assertIsNone(middleware.process_exception(request, ValueError()))
+
+    @patch('apps.clients_contracts.ai_service.time.sleep')
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_overloaded_calls_are_retried(self, mock_post, mock_sleep):
+        """Test that 503s are retried with backoff and the attempt timeout follows the deadline."""
+        mock_post.side_effect = [completion(status_code=503, retry_after='2'), completion()]
+
+        with collect_usage() as calls, deadline_scope(30):
+            result = AIService.evaluate_contract("Short contract text")
+
+        self.assertEqual(result['reasoning'], 'Approved.')
+        mock_sleep.assert_called_once_with(2.0)
+        self.assertLessEqual(mock_post.call_args.kwargs['timeout'], 30)
+        self.assertEqual(calls[0]['retries'], 1)
+
+    @patch('apps.clients_contracts.ai_service.time.sleep')
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_no_retry_past_the_deadline(self, mock_post, mock_sleep):
+        """Test that a retry whose backoff outlasts the deadline is not attempted."""
+        mock_post.return_value = completion(status_code=429, retry_after='60')
+
+        with deadline_scope(5):
+            response = AIService._post_completion({"model": "deepseek-chat"}, {}, 60, "evaluate")
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(mock_post.call_count, 1)
+        mock_sleep.assert_not_called()
+
+    @patch('apps.clients_contracts.ai_service.session.post', side_effect=requests.exceptions.ReadTimeout('slow'))
+    def test_timeout_cut_short_by_the_deadline(self, mock_post):
+        """Test that a timeout shortened by the deadline is recorded as the deadline, not against the model."""
+        with collect_usage() as calls, deadline_scope(5):
+            with self.assertRaises(AIDeadlineExceeded):
+                AIService._post_completion({"model": "deepseek-chat"}, {}, 60, "evaluate")
+
+        self.assertEqual(calls[0]['outcome'], 'deadline_exceeded')
+
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_expired_deadline_skips_the_call(self, mock_post):
+        """Test that no request is sent once the deadline has passed, and callers fall back."""
+        with collect_usage() as calls, deadline_scope(0.001):
+            time.sleep(0.01)
+            result = AIService.analyze_contract("Short contract text")
+            with self.assertRaises(requests.exceptions.Timeout):
+                AIService._post_completion({"model": "deepseek-chat"}, {}, 60, "evaluate")
+
+        mock_post.assert_not_called()
+        self.assertEqual(result['model_used'], 'Fallback Response')
+        self.assertEqual(calls[0]['outcome'], 'deadline_exceeded')
+        self.assertTrue(issubclass(AIDeadlineExceeded, DeadlineExceeded))
+
+
+if __name__ == '__main__':
+    unittest.main()
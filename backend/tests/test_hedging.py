@@ -0,0 +1,155 @@
+import unittest
+from unittest.mock import patch, Mock
+import os
+import sys
+import threading
+import time
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+import requests
+from apps.clients_contracts import ai_service
+from apps.clients_contracts.ai_service import AIService
+from apps.clients_contracts.deadline import deadline_scope
+from apps.clients_contracts.hedging import HedgePolicy, MIN_SAMPLES
+from apps.clients_contracts.telemetry import collect_usage
+from tests.conftest import completion
+
+
+class TestHedging(unittest.TestCase):
+    """Test hedged DeepSeek requests."""
+
+    def setUp(self):
+        self.policy = HedgePolicy(['extract_clauses'], ['deepseek-chat'], budget=1.0, default_delay=0.05)
+        for patcher in (patch('apps.clients_contracts.hedging.MIN_HEDGE_DELAY', 0.01),
+                        patch.object(ai_service, 'ai_hedging', self.policy)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_applies(self):
+        """Test per-operation and per-model enablement; chunks are never hedged."""
+        self.assertTrue(self.policy.applies('extract_clauses', 'deepseek-chat'))
+        self.assertFalse(self.policy.applies('extract_clauses', 'deepseek-chat', chunked=True))
+        self.assertFalse(self.policy.applies('analyze', 'deepseek-chat'))
+        self.assertFalse(self.policy.applies('extract_clauses', 'deepseek-reasoner'))
+        self.assertFalse(HedgePolicy(['analyze'], ['deepseek-chat'], 0, 1).applies('analyze', 'deepseek-chat'))
+
+    def test_delay_follows_p95(self):
+        """Test the default delay until enough samples, then the p95 of recent attempts."""
+        self.assertEqual(self.policy.delay('extract_clauses'), 0.05)
+
+        for i in range(1, MIN_SAMPLES + 1):
+            self.policy.observe('extract_clauses', i / 10)
+
+        self.assertEqual(self.policy.delay('extract_clauses'), 1.9)
+
+    def test_fast_call_is_not_hedged(self):
+        """Test that a response within the delay is returned without a duplicate."""
+        attempt = Mock(return_value='response')
+
+        self.assertEqual(self.policy.run('extract_clauses', attempt), 'response')
+        self.assertEqual(attempt.call_count, 1)
+
+    def test_budget_caps_hedges(self):
+        """Test that without budget the slow call is waited for instead of duplicated."""
+        policy = HedgePolicy(['extract_clauses'], ['deepseek-chat'], budget=0.5, default_delay=0.01)
+        attempt = Mock(side_effect=lambda: time.sleep(0.05) or 'slow')
+
+        self.assertEqual(policy.run('extract_clauses', attempt), 'slow')
+        self.assertEqual(policy.run('extract_clauses', attempt), 'slow')
+        self.assertEqual(attempt.call_count, 3)
+
+    def test_both_attempts_failing_raises_the_first_error(self):
+        """Test that the primary's error is raised when the hedge fails too."""
+        errors = iter([requests.exceptions.ConnectionError('primary'), ValueError('hedge')])
+
+        def attempt():
+            error = next(errors)
+            time.sleep(0.1)
+            raise error
+
+        with self.assertRaisesRegex(requests.exceptions.ConnectionError, 'primary'):
+            self.policy.run('extract_clauses', attempt)
+
+    def test_failed_loser_is_reported(self):
+        """Test that a loser that raises is still reported, with its own duration."""
+        calls = iter(['primary', 'hedge'])
+        discard, won = Mock(), Mock()
+
+        def attempt():
+            if next(calls) == 'primary':
+                time.sleep(0.2)
+                raise requests.exceptions.ConnectionError('primary')
+            return 'hedge'
+
+        self.assertEqual(self.policy.run('extract_clauses', attempt, discard=discard, won=won), 'hedge')
+        for _ in range(100):
+            if discard.called:
+                break
+            time.sleep(0.01)
+
+        discard.assert_called_once()
+        response, seconds = discard.call_args.args
+        self.assertIsNone(response)
+        self.assertGreaterEqual(seconds, 0.2)
+        self.assertLess(won.call_args.args[0], 0.1)
+
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_router_sees_every_attempt(self, mock_post):
+        """Test that routing gets each attempt's own latency, not just the hedged wall time."""
+        def post(url, json, headers, timeout):
+            if mock_post.call_count == 1:
+                time.sleep(0.3)
+            return completion('[]')
+        mock_post.side_effect = post
+
+        with patch.object(ai_service, 'model_router') as router, patch.object(ai_service, 'deepseek_breaker'):
+            router.choose.return_value = 'deepseek-chat'
+            started = time.perf_counter()
+            AIService.extract_clauses("Short contract text")
+            elapsed = time.perf_counter() - started
+            for _ in range(100):
+                if router.observe.call_count == 2:
+                    break
+                time.sleep(0.01)
+
+        (won, lost) = [c.args for c in router.observe.call_args_list]
+        self.assertEqual(won[:3], ('deepseek-chat', 'extract_clauses', 'ok'))
+        # The hedge went out after the 0.05s delay, which is not part of its latency
+        self.assertLessEqual(won[3], elapsed - 0.05)
+        self.assertEqual(lost[:3], ('deepseek-chat', 'extract_clauses', 'hedge_lost'))
+        self.assertGreaterEqual(lost[3], 0.3)
+
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_stuck_request_is_hedged(self, mock_post):
+        """Test that the duplicate's answer is used and the stuck request is still billed."""
+        released = threading.Event()
+        self.addCleanup(released.set)
+        loser = completion('[]')
+
+        def post(url, json, headers, timeout):
+            if mock_post.call_count == 1:
+                released.wait(5)
+                return loser
+            return completion('[{"type": "Payment Terms"}]')
+        mock_post.side_effect = post
+
+        with collect_usage() as calls, deadline_scope(30):
+            result = AIService.extract_clauses("Short contract text")
+            released.set()
+            for _ in range(100):
+                if len(calls) == 2:
+                    break
+                time.sleep(0.01)
+
+        self.assertEqual(result['clauses'], [{"type": "Payment Terms"}])
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertLessEqual(mock_post.call_args.kwargs['timeout'], 30)
+        self.assertEqual([call['outcome'] for call in calls], ['ok', 'hedge_lost'])
+        self.assertGreater(calls[1]['cost_usd'], 0)
+        loser.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
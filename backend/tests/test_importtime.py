@@ -0,0 +1,79 @@
+import unittest
+import os
+import subprocess
+import sys
+from io import StringIO
+from unittest.mock import patch, Mock
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from django.core.management import call_command
+from apps.clients_contracts.management.commands.importtime import parse_importtime, summarize_imports
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SAMPLE_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:       300 |        300 |       bson.objectid
+import time:      2000 |       2500 |     bson
+import time:      5000 |       7500 |   pymongo
+import time:      1000 |       1000 |   PyPDF2.pdf
+import time:       400 |       9000 | apps.clients_contracts.views
+import time:       250 |        250 | config.mongo
+"""
+
+
+class TestImportTime(unittest.TestCase):
+    """Test the import-time audit and lazy imports at startup."""
+
+    def test_parse_importtime(self):
+        """Test that rows keep their timings and nesting depth."""
+        rows = parse_importtime(SAMPLE_OUTPUT)
+
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[3].name, 'pymongo')
+        self.assertEqual((rows[3].self_us, rows[3].cumulative_us, rows[3].depth), (5000, 7500, 1))
+        self.assertEqual(rows[1].depth, 3)
+        self.assertEqual(rows[-1].depth, 0)
+
+    def test_summarize_imports(self):
+        """Test the total and self time per top-level package."""
+        summary = summarize_imports(parse_importtime(SAMPLE_OUTPUT))
+
+        self.assertEqual(summary['total_us'], 9250)
+        self.assertEqual(summary['by_package']['bson'], 2300)
+        self.assertEqual(summary['by_package']['apps'], 400)
+        self.assertEqual(list(summary['by_package'])[0], 'pymongo')
+
+    @patch('apps.clients_contracts.management.commands.importtime.subprocess.run')
+    def test_command_reports_slowest_imports(self, mock_run):
+        """Test the command output."""
+        mock_run.return_value = Mock(returncode=0, stderr=SAMPLE_OUTPUT)
+        out = StringIO()
+
+        call_command('importtime', '--top', '3', stdout=out)
+
+        self.assertIn('-X', mock_run.call_args[0][0])
+        output = out.getvalue()
+        self.assertIn('Total import time: 9.2 ms', output)
+        self.assertIn('apps.clients_contracts.views', output)
+        self.assertNotIn('_io', output)
+
+    def test_views_import_without_pdf_or_ai_modules(self):
+        """Test that PyPDF2 and the AI service load on first use, not at startup."""
+        code = (
+            "import sys, django; django.setup(); import apps.clients_contracts.views; "
+            "print(','.join(m for m in ('PyPDF2', 'apps.clients_contracts.ai_service') if m in sys.modules))"
+        )
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                env=env, cwd=BACKEND_DIR, timeout=120)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
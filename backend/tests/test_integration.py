@@ -16,6 +16,7 @@ from bson import ObjectId
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
 
 from apps.clients_contracts.views import contracts_collection, clients_collection
+from apps.clients_contracts.cache import clear_all_cache
 
 
 class BaseIntegrationTest(TransactionTestCase):
@@ -81,6 +82,8 @@ class BaseIntegrationTest(TransactionTestCase):
             clients_collection.delete_many({})
         except:
             pass
+        # Cached documents would otherwise outlive the collections cleaned above
+        clear_all_cache()
 
 
 class TestCompleteContractWorkflow(BaseIntegrationTest):
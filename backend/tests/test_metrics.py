@@ -0,0 +1,211 @@
+import unittest
+from unittest.mock import patch, Mock
+import asyncio
+import os
+import sys
+import time
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from django.test import override_settings
+from rest_framework.test import APIRequestFactory
+from apps.clients_contracts.metrics import (
+    CACHE_LOOKUPS, Histogram, MetricsRegistry, GAUGE_STALE_AFTER, record_cache_lookup, summarize_cache_lookups,
+)
+from apps.clients_contracts.views import MetricsView
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test labeled counters, histograms and their export."""
+
+    def setUp(self):
+        """Use a fresh registry with Redis unavailable unless a test mocks it."""
+        self.registry = MetricsRegistry()
+        self.requests = self.registry.counter('test_requests_total', 'Requests.', ('view', 'status'))
+        self.latency = self.registry.histogram('test_latency_seconds', 'Latency.', ('view',), buckets=(0.1, 1))
+
+    def test_labels_must_match(self):
+        """Test that a missing or unknown label is rejected."""
+        with self.assertRaises(ValueError):
+            self.requests.inc(view='ContractDetailView')
+
+    @patch('django_redis.get_redis_connection', side_effect=ConnectionError('Redis unavailable'))
+    def test_local_fallback_when_redis_is_down(self, mock_get_connection):
+        """Test that exports fall back to this process and keep unflushed deltas."""
+        self.requests.inc(view='ContractDetailView', status='200')
+        self.requests.inc(2, view='ContractDetailView', status='200')
+
+        values, source = self.registry.collect()
+
+        self.assertEqual(source, 'local')
+        self.assertEqual(self.requests.totals(values['test_requests_total']), {('ContractDetailView', '200'): 3})
+        self.assertEqual(self.requests.take_pending(), {'["ContractDetailView","200"]': 3})
+
+    @patch('django_redis.get_redis_connection', side_effect=ConnectionError('Redis unavailable'))
+    def test_prometheus_rendering(self, mock_get_connection):
+        """Test histogram buckets are cumulative and labels are escaped."""
+        self.latency.observe(0.05, view='Contract"View')
+        self.latency.observe(0.5, view='Contract"View')
+        self.latency.observe(5, view='Contract"View')
+
+        text = self.registry.render_prometheus()
+
+        self.assertIn('# TYPE test_latency_seconds histogram', text)
+        self.assertIn('test_latency_seconds_bucket{view="Contract\\"View",le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{view="Contract\\"View",le="1"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{view="Contract\\"View",le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_count{view="Contract\\"View"} 3', text)
+        self.assertIn('test_latency_seconds_sum{view="Contract\\"View"} 5.55', text)
+
+    def test_quantiles_from_buckets(self):
+        """Test p50/p95 estimation by linear interpolation within buckets."""
+        histogram = Histogram('test_quantiles', 'Quantiles.', buckets=(1, 2, 4))
+        entry = {'buckets': [50, 40, 10, 0], 'sum': 0.0, 'count': 100}
+
+        self.assertAlmostEqual(histogram.quantile(0.5, entry), 1.0)
+        self.assertAlmostEqual(histogram.quantile(0.95, entry), 3.0)
+
+    @patch('django_redis.get_redis_connection')
+    def test_flush_and_collect_use_redis(self, mock_get_connection):
+        """Test that deltas are pipelined to Redis hashes and totals read back from them."""
+        pipeline = Mock()
+        pipeline.execute.side_effect = [[1, 1], [
+            {b'["ContractDetailView","200"]': b'7'},
+            {b'["ContractDetailView"]|0.1': b'4', b'["ContractDetailView"]|count': b'4',
+             b'["ContractDetailView"]|sum': b'0.2'},
+        ]]
+        mock_get_connection.return_value.pipeline.return_value = pipeline
+        self.requests.inc(view='ContractDetailView', status='200')
+
+        values, source = self.registry.collect()
+
+        self.assertEqual(source, 'redis')
+        pipeline.hincrby.assert_called_once_with(self.requests.redis_key, '["ContractDetailView","200"]', 1)
+        self.assertEqual(self.requests.totals(values['test_requests_total']), {('ContractDetailView', '200'): 7.0})
+        series = self.latency.series(values['test_latency_seconds'])
+        self.assertEqual(series[('ContractDetailView',)]['count'], 4)
+        self.assertEqual(self.requests.take_pending(), {})
+
+    def test_gauge_sums_live_instances_only(self):
+        """Test that gauges add up per-process values and drop processes that stopped flushing."""
+        gauge = self.registry.gauge('test_pool_size', 'Pool size.', ('address',))
+        now = time.time()
+        values = {
+            '["db:27017"]|web-1:10': 4, 'heartbeat|web-1:10': now,
+            '["db:27017"]|web-1:11': 3, 'heartbeat|web-1:11': now - 1,
+            '["db:27017"]|web-2:12': 9, 'heartbeat|web-2:12': now - GAUGE_STALE_AFTER - 5,
+        }
+
+        self.assertEqual(gauge.totals(values), {('db:27017',): 7})
+        self.assertEqual(gauge.render(values), ['test_pool_size{address="db:27017"} 7'])
+
+    @patch('django_redis.get_redis_connection')
+    def test_gauge_flush_writes_current_value(self, mock_get_connection):
+        """Test that gauges are written with HSET, not added as deltas."""
+        pipeline = Mock()
+        mock_get_connection.return_value.pipeline.return_value = pipeline
+        gauge = self.registry.gauge('test_checked_out', 'Checked out.', ('address',))
+        gauge.inc(address='db:27017')
+        gauge.inc(address='db:27017')
+        gauge.dec(address='db:27017')
+
+        self.assertTrue(self.registry.flush())
+
+        pipeline.hincrby.assert_not_called()
+        mapping = pipeline.hset.call_args.kwargs['mapping']
+        self.assertEqual([v for k, v in mapping.items() if k.startswith('["db:27017"]|')], [1])
+        self.assertTrue(any(k.startswith('heartbeat|') for k in mapping))
+
+    @patch('django_redis.get_redis_connection')
+    def test_collect_deletes_dead_instance_gauge_fields(self, mock_get_connection):
+        """Test that collect removes the fields of instances whose heartbeat went stale."""
+        gauge = self.registry.gauge('test_pool_size', 'Pool size.', ('address',))
+        now = time.time()
+        pipeline = Mock()
+        pipeline.execute.side_effect = [[{}, {}, {
+            b'["db:27017"]|web-1:10': b'4', b'heartbeat|web-1:10': str(now).encode(),
+            b'["db:27017"]|web-2:12': b'9', b'heartbeat|web-2:12': str(now - GAUGE_STALE_AFTER - 5).encode(),
+            b'["db:27017"]|web-3:13': b'2',
+        }], []]
+        mock_get_connection.return_value.pipeline.return_value = pipeline
+
+        values, source = self.registry.collect()
+
+        self.assertEqual(source, 'redis')
+        pipeline.hdel.assert_called_once_with(
+            gauge.redis_key, '["db:27017"]|web-2:12', 'heartbeat|web-2:12', '["db:27017"]|web-3:13',
+        )
+        self.assertEqual(gauge.totals(values['test_pool_size']), {('db:27017',): 4})
+
+
+    def test_cache_lookups(self):
+        """Test that cache hits and misses are counted per endpoint and summarized as hit ratios."""
+        with patch.object(CACHE_LOOKUPS, 'inc') as mock_inc:
+            record_cache_lookup('contract-detail', True)
+            record_cache_lookup('clients', False)
+        self.assertEqual([c.kwargs for c in mock_inc.call_args_list], [
+            {'endpoint': 'contract-detail', 'result': 'hit'}, {'endpoint': 'clients', 'result': 'miss'},
+        ])
+
+        values = {CACHE_LOOKUPS.name: {
+            '["contract-detail", "hit"]': 3, '["contract-detail", "miss"]': 1, '["clients", "miss"]': 2,
+        }}
+        ratios = summarize_cache_lookups(values)
+
+        self.assertEqual(ratios['contract-detail'], {'hits': 3, 'misses': 1, 'hit_ratio': 0.75})
+        self.assertEqual(ratios['clients'], {'hits': 0, 'misses': 2, 'hit_ratio': 0.0})
+        self.assertEqual(summarize_cache_lookups({}), {})
+
+
+@patch('apps.clients_contracts.views.registry.render_prometheus', return_value='# TYPE http_requests_total counter\n')
+class TestMetricsScrape(unittest.TestCase):
+    """Test that Prometheus can scrape /metrics/ without a user token."""
+
+    def scrape(self, **headers):
+        request = APIRequestFactory().get('/metrics/', HTTP_ACCEPT='text/plain', **headers)
+        return asyncio.run(MetricsView.as_view()(request)).render()
+
+    def test_unauthenticated_scrape_needs_a_setting(self, mock_render):
+        """Test that an anonymous scrape is refused unless a token or network is configured."""
+        response = self.scrape()
+
+        self.assertEqual(response.status_code, 401)
+        mock_render.assert_not_called()
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_scrape_with_token(self, mock_render):
+        """Test the bearer token, and that a wrong one is still rejected."""
+        response = self.scrape(HTTP_AUTHORIZATION='Bearer scrape-secret')
+        wrong = self.scrape(HTTP_AUTHORIZATION='Bearer not-the-secret')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'# TYPE http_requests_total counter\n')
+        self.assertEqual(wrong.status_code, 401)
+
+    @override_settings(METRICS_ALLOWED_NETWORKS=['10.0.0.0/8', 'not-a-network'])
+    def test_scrape_from_allowed_network(self, mock_render):
+        """Test the address allowlist."""
+        inside = self.scrape(REMOTE_ADDR='10.1.2.3')
+        outside = self.scrape(REMOTE_ADDR='192.168.1.5')
+
+        self.assertEqual(inside.status_code, 200)
+        self.assertEqual(outside.status_code, 401)
+
+    @override_settings(METRICS_ALLOWED_NETWORKS=['10.0.0.0/8'], METRICS_TRUSTED_PROXIES=['10.0.0.2/32'])
+    def test_scrape_through_trusted_proxy(self, mock_render):
+        """Test that behind a trusted proxy the forwarded client is checked, not the proxy."""
+        external = self.scrape(REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='203.0.113.7')
+        # A client can prepend anything; only the hop the proxy added counts
+        spoofed = self.scrape(REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='10.1.2.3, 203.0.113.7')
+        internal = self.scrape(REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='10.1.2.3')
+        proxy_only = self.scrape(REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(external.status_code, 401)
+        self.assertEqual(spoofed.status_code, 401)
+        self.assertEqual(internal.status_code, 200)
+        self.assertEqual(proxy_only.status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
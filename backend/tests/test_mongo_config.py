@@ -0,0 +1,90 @@
+import unittest
+from unittest.mock import patch, Mock
+import os
+import sys
+import time
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from pymongo import read_preferences
+from config import mongo
+
+REPLICA_SET_URI = os.getenv("MONGO_REPLICA_SET_URI")
+
+
+class TestMongoClientFactory(unittest.TestCase):
+    """Test the environment-driven MongoClient options and read routing."""
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_unset_options_keep_driver_defaults(self):
+        """Test that nothing is passed when no variable is set."""
+        self.assertEqual(mongo.client_options(), {})
+
+    @patch.dict(os.environ, {
+        'MONGO_MAX_POOL_SIZE': '50',
+        'MONGO_MIN_POOL_SIZE': '5',
+        'MONGO_COMPRESSORS': 'zstd,snappy',
+        'MONGO_SERVER_SELECTION_TIMEOUT_MS': '3000',
+        'MONGO_SOCKET_TIMEOUT_MS': '20000',
+        'MONGO_RETRY_WRITES': 'false',
+    }, clear=True)
+    def test_options_from_environment(self):
+        """Test that pool, compression, timeout and retry settings are read."""
+        self.assertEqual(mongo.client_options(), {
+            'maxPoolSize': 50,
+            'minPoolSize': 5,
+            'compressors': 'zstd,snappy',
+            'serverSelectionTimeoutMS': 3000,
+            'socketTimeoutMS': 20000,
+            'retryWrites': False,
+        })
+
+    @patch.dict(os.environ, {'MONGO_MAX_POOL_SIZE': '50'}, clear=True)
+    @patch('config.mongo.MongoClient')
+    def test_create_client_registers_listeners(self, mock_client):
+        """Test that overrides win and monitoring listeners are attached."""
+        mongo.create_client('mongodb://db:27017', maxPoolSize=10)
+
+        args, kwargs = mock_client.call_args
+        self.assertEqual(args, ('mongodb://db:27017',))
+        self.assertEqual(kwargs['maxPoolSize'], 10)
+        self.assertEqual(len(kwargs['event_listeners']), 3)
+        # No connection until the first operation
+        self.assertFalse(kwargs['connect'])
+
+    def test_read_preference(self):
+        """Test read preference modes and staleness."""
+        preference = mongo.read_preference('secondaryPreferred', 120)
+
+        self.assertIsInstance(preference, read_preferences.SecondaryPreferred)
+        self.assertEqual(preference.max_staleness, 120)
+        self.assertIsInstance(mongo.read_preference('primary'), read_preferences.Primary)
+        with self.assertRaises(ValueError):
+            mongo.read_preference('secondaryOnly')
+
+
+@unittest.skipUnless(REPLICA_SET_URI, "set MONGO_REPLICA_SET_URI to run against a local replica set")
+class TestReplicaSetRouting(unittest.TestCase):
+    """Run read routing against a real replica set (see README setup.md)."""
+
+    def test_secondary_preferred_reads(self):
+        """Test that a write on the primary becomes readable through read routing."""
+        client = mongo.create_client(REPLICA_SET_URI, event_listeners=[])
+        self.addCleanup(client.close)
+        collection = client['genai_contracts_test']['routing']
+        self.addCleanup(collection.drop)
+        collection.insert_one({'_id': 'routing-check'})
+
+        reader = collection.with_options(read_preference=mongo.read_preference('secondaryPreferred'))
+        # Majority-acknowledged writes reach the secondaries shortly after
+        for _ in range(50):
+            if reader.find_one({'_id': 'routing-check'}):
+                break
+            time.sleep(0.1)
+        self.assertIsNotNone(reader.find_one({'_id': 'routing-check'}))
+        self.assertEqual(reader.read_preference.mode, read_preferences.SecondaryPreferred().mode)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import Mock
+import os
+import sys
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from pymongo import monitoring
+from apps.clients_contracts.monitoring import (
+    CommandMonitor,
+    PoolMonitor,
+    query_shape,
+    command_shape,
+    summarize_mongo,
+    MONGO_COMMAND_LATENCY,
+    MONGO_COMMAND_FAILURES,
+    MONGO_POOL_CONNECTIONS,
+    MONGO_POOL_CHECKED_OUT,
+    MONGO_CHECKOUT_WAIT,
+)
+
+ADDRESS = ('localhost', 27017)
+
+
+def command_events(command_name, command, duration_micros, failed=False):
+    """Build a started event and its matching finished event."""
+    started = Mock(command_name=command_name, command=command, connection_id=ADDRESS,
+                   request_id=42, database_name='genai_contracts')
+    finished = Mock(command_name=command_name, connection_id=ADDRESS, request_id=42,
+                    database_name='genai_contracts', duration_micros=duration_micros)
+    return started, finished
+
+
+class TestMongoMonitoring(unittest.TestCase):
+    """Test the Mongo command and pool listeners."""
+
+    def setUp(self):
+        """Start each test from empty Mongo metrics."""
+        for metric in (MONGO_COMMAND_LATENCY, MONGO_COMMAND_FAILURES, MONGO_POOL_CONNECTIONS,
+                       MONGO_POOL_CHECKED_OUT, MONGO_CHECKOUT_WAIT):
+            with metric._lock:
+                metric._totals.clear()
+                metric._pending.clear()
+
+    def values(self):
+        return {metric.name: metric.local_values() for metric in (
+            MONGO_COMMAND_LATENCY, MONGO_COMMAND_FAILURES, MONGO_POOL_CONNECTIONS,
+            MONGO_POOL_CHECKED_OUT, MONGO_CHECKOUT_WAIT)}
+
+    def test_query_shape_hides_values(self):
+        """Test that filter values are replaced and operators kept."""
+        shape = query_shape({'client': 'Acme', 'date': {'$gte': '2025-01-01'}, '_id': {'$in': [1, 2, 3]},
+                             '$or': [{'signed': True}, {'title': 'NDA'}]})
+
+        self.assertEqual(shape, {'client': '?', 'date': {'$gte': '?'}, '_id': {'$in': '?'},
+                                 '$or': [{'signed': '?'}, {'title': '?'}]})
+
+    def test_command_shape_for_updates(self):
+        """Test that update statements are shaped by their query."""
+        shape = command_shape('update', {'update': 'contracts', 'updates': [{'q': {'_id': 'x'}, 'u': {'$set': {}}}]})
+
+        self.assertEqual(shape, {'updates': [{'_id': '?'}]})
+
+    def test_commands_are_recorded_per_collection(self):
+        """Test latency and failure metrics by collection and command."""
+        listener = CommandMonitor()
+        for command_name, duration, failed in (('find', 2000, False), ('find', 4000, False), ('insert', 1000, True)):
+            started, finished = command_events(command_name, {command_name: 'contracts'}, duration)
+            listener.started(started)
+            (listener.failed if failed else listener.succeeded)(finished)
+
+        summary = summarize_mongo(self.values())
+
+        self.assertEqual(summary['commands']['contracts.find']['count'], 2)
+        self.assertEqual(summary['commands']['contracts.insert']['failures'], 1)
+        self.assertEqual(listener._inflight, {})
+
+    def test_slow_command_is_logged_with_shape(self):
+        """Test that commands over the threshold are logged without their values."""
+        listener = CommandMonitor()
+        listener.slow_query_ms = 50
+        started, finished = command_events('find', {'find': 'contracts', 'filter': {'client': 'Acme Secret'}}, 80000)
+
+        with self.assertLogs('apps.clients_contracts.monitoring', level='WARNING') as logs:
+            listener.started(started)
+            listener.succeeded(finished)
+
+        self.assertIn('Slow Mongo command', logs.output[0])
+        self.assertIn('"filter": {"client": "?"}', logs.output[0])
+        self.assertNotIn('Acme Secret', logs.output[0])
+
+    def test_pool_checkout_and_size(self):
+        """Test checkout wait and pool gauges from pool events."""
+        listener = PoolMonitor()
+        listener.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 1))
+        listener.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 2))
+        listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+        listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 1))
+
+        pool = summarize_mongo(self.values())['pools']['localhost:27017']
+
+        self.assertEqual(pool['connections'], 2)
+        self.assertEqual(pool['checked_out'], 1)
+        self.assertEqual(pool['checkouts'], 1)
+
+        listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+        listener.connection_closed(monitoring.ConnectionClosedEvent(ADDRESS, 2, 'idle'))
+        pool = summarize_mongo(self.values())['pools']['localhost:27017']
+        self.assertEqual((pool['connections'], pool['checked_out']), (1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+from unittest.mock import patch, Mock
+import os
+import sys
+import asyncio
+import base64
+import marshal
+import time
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from asgiref.sync import async_to_sync
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from apps.clients_contracts.aio import run_sync
+from apps.clients_contracts.cache import local_cache
+from apps.clients_contracts.profiling import (
+    ProfilingMiddleware,
+    StackSampler,
+    get_profile,
+    requested_mode,
+    FORMAT_COLLAPSED,
+    FORMAT_PSTATS,
+)
+
+
+def busy_view(request):
+    """A view that burns enough CPU to be sampled."""
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    return HttpResponse('ok')
+
+
+async def async_busy_view(request):
+    """An async view that does its work on the I/O pool, as under ASGI."""
+    return await run_sync(busy_view, request)
+
+
+# How Django calls an async view from sync middleware: on an event loop in another thread
+sync_async_view = async_to_sync(async_busy_view)
+
+
+class TestProfilingMiddleware(unittest.TestCase):
+    """Test the on-demand profiling hook."""
+
+    def setUp(self):
+        """Use an in-process cache backend instead of Redis."""
+        self.factory = RequestFactory()
+        self.local_cache = LocMemCache('test-profiling', {})
+        self.local_cache.clear()
+        patcher = patch('apps.clients_contracts.cache.cache', self.local_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+        profiling = override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_INTERVAL=0.001)
+        profiling.enable()
+        self.addCleanup(profiling.disable)
+
+    def make_request(self, staff=True, **headers):
+        request = self.factory.get('/api/contracts/', **headers)
+        request.user = Mock(is_authenticated=True, is_staff=staff)
+        request.request_id = 'req-profile-1'
+        return request
+
+    def test_disabled_middleware_is_removed(self):
+        """Test that Django drops the middleware when profiling is off."""
+        with override_settings(PROFILING_ENABLED=False):
+            with self.assertRaises(MiddlewareNotUsed):
+                ProfilingMiddleware(busy_view)
+
+    def test_requested_mode(self):
+        """Test header and query flag parsing."""
+        self.assertIsNone(requested_mode(self.factory.get('/')))
+        self.assertEqual(requested_mode(self.factory.get('/', HTTP_X_PROFILE='1')), 'sample')
+        self.assertEqual(requested_mode(self.factory.get('/?profile=cProfile')), 'cprofile')
+
+    def test_unflagged_and_non_staff_requests_are_not_profiled(self):
+        """Test that only flagged staff requests are profiled."""
+        middleware = ProfilingMiddleware(busy_view)
+
+        plain = middleware(self.make_request())
+        non_staff = middleware(self.make_request(staff=False, HTTP_X_PROFILE='sample'))
+
+        self.assertFalse(plain.has_header('X-Profile-ID'))
+        self.assertFalse(non_staff.has_header('X-Profile-ID'))
+        self.assertIsNone(get_profile('req-profile-1'))
+
+    def test_sampling_profile_is_stored_as_collapsed_stacks(self):
+        """Test that sampled stacks are stored under the request id."""
+        response = ProfilingMiddleware(busy_view)(self.make_request(HTTP_X_PROFILE='sample'))
+
+        self.assertEqual(response['X-Profile-ID'], 'req-profile-1')
+        profile = get_profile('req-profile-1')
+        self.assertEqual(profile['format'], FORMAT_COLLAPSED)
+        self.assertEqual(profile['status'], 200)
+        line = profile['data'].splitlines()[0]
+        stack, count = line.rsplit(' ', 1)
+        self.assertIn('busy_view', stack)
+        self.assertGreater(int(count), 0)
+
+    def test_cprofile_profile_is_stored_as_pstats(self):
+        """Test that the deterministic profile round-trips as a pstats dump."""
+        ProfilingMiddleware(busy_view)(self.make_request(HTTP_X_PROFILE='cprofile'))
+
+        profile = get_profile('req-profile-1')
+        self.assertEqual(profile['format'], FORMAT_PSTATS)
+        stats = marshal.loads(base64.b64decode(profile['data']))
+        self.assertTrue(any(func[2] == 'busy_view' for func in stats))
+
+    def test_async_view_work_is_profiled(self):
+        """Test that pool threads working for an async view are sampled and cProfiled."""
+        ProfilingMiddleware(sync_async_view)(self.make_request(HTTP_X_PROFILE='sample'))
+        stacks = get_profile('req-profile-1')['data']
+        self.assertTrue(any(line.startswith('thread:') and 'busy_view' in line for line in stacks.splitlines()))
+
+        ProfilingMiddleware(sync_async_view)(self.make_request(HTTP_X_PROFILE='cprofile'))
+        stats = marshal.loads(base64.b64decode(get_profile('req-profile-1')['data']))
+        self.assertTrue(any(func[2] == 'busy_view' for func in stats))
+
+    def test_async_middleware_profiles_on_the_loop(self):
+        """Test the ASGI path: unflagged requests pass through, flagged ones are sampled on the loop and pool."""
+        middleware = ProfilingMiddleware(async_busy_view)
+
+        plain = asyncio.run(middleware(self.make_request()))
+        sampled = asyncio.run(middleware(self.make_request(HTTP_X_PROFILE='sample')))
+        stacks = get_profile('req-profile-1')['data']
+
+        self.assertFalse(plain.has_header('X-Profile-ID'))
+        self.assertEqual(sampled['X-Profile-ID'], 'req-profile-1')
+        self.assertTrue(any(line.startswith('thread:') and 'busy_view' in line for line in stacks.splitlines()))
+
+        asyncio.run(middleware(self.make_request(HTTP_X_PROFILE='cprofile')))
+        stats = marshal.loads(base64.b64decode(get_profile('req-profile-1')['data']))
+        self.assertTrue(any(func[2] == 'busy_view' for func in stats))
+
+    def test_sampler_collapsed_format(self):
+        """Test the flamegraph line format."""
+        sampler = StackSampler(thread_id=0)
+        sampler.samples['a:main:1;a:work:5'] += 3
+
+        self.assertEqual(sampler.collapsed(), 'a:main:1;a:work:5 3\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+from unittest.mock import patch, Mock
+import io
+import json
+import os
+import sys
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from bson import ObjectId
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from apps.clients_contracts.renderers import FastJSONRenderer, FastJSONParser, MongoJSONEncoder
+
+
+class TestFastJSON(unittest.TestCase):
+    """Test the orjson-backed renderer and parser."""
+
+    def setUp(self):
+        self.renderer = FastJSONRenderer()
+        self.obj_id = ObjectId()
+        self.document = {
+            '_id': self.obj_id,
+            'title': 'Service Agreement – 2025',
+            'fee': Decimal('12.50'),
+            'created_at': datetime(2025, 1, 15, 9, 0, tzinfo=timezone.utc),
+            'clauses': [{'type': 'Payment', 'risk_level': 'low'}],
+        }
+
+    def test_matches_stock_renderer(self):
+        """Test that output parses to what DRF's encoder produces, ObjectIds included."""
+        stock = JSONRenderer()
+        stock.encoder_class = MongoJSONEncoder
+
+        fast = json.loads(self.renderer.render(self.document))
+
+        self.assertEqual(fast, json.loads(stock.render(self.document)))
+        self.assertEqual(fast['_id'], str(self.obj_id))
+        self.assertEqual(fast['fee'], 12.5)
+        self.assertEqual(fast['created_at'], '2025-01-15T09:00:00Z')
+
+    def test_datetimes_match_stock_renderer_byte_for_byte(self):
+        """Test that datetimes, dates and times are written exactly as DRF's encoder writes them."""
+        stock = JSONRenderer()
+        stock.encoder_class = MongoJSONEncoder
+        document = {
+            'utc': datetime(2025, 1, 15, 9, 0, 0, 123456, tzinfo=timezone.utc),
+            'zero_offset': datetime(2025, 1, 15, 9, 0, tzinfo=timezone(timedelta(0))),
+            'offset': datetime(2025, 1, 15, 9, 0, 0, 500, tzinfo=timezone(timedelta(hours=2))),
+            'naive': datetime(2025, 1, 15, 9, 0, 0, 123000),
+            'date': date(2025, 1, 15),
+            'time': time(9, 1, 2, 345678),
+            'nested': [{'analysis_date': datetime(2025, 2, 1, tzinfo=timezone.utc)}],
+            7: 'int key',
+        }
+
+        self.assertEqual(self.renderer.render(document), stock.render(document))
+        # Both refuse aware times, with DRF's error
+        with self.assertRaises(ValueError):
+            self.renderer.render({'time': time(9, 0, tzinfo=timezone.utc)})
+
+    def test_values_orjson_refuses_use_stock_renderer(self):
+        """Test that integers beyond 64 bits render as before instead of failing."""
+        self.assertEqual(self.renderer.render({'big': 2 ** 70}), b'{"big":1180591620717411303424}')
+
+    def test_compact_utf8_output(self):
+        """Test that non-ASCII text stays UTF-8 and line separators are escaped."""
+        output = self.renderer.render({'text': 'naïve end'})
+
+        self.assertIn('naïve'.encode('utf-8'), output)
+        self.assertIn(b'\\u2028', output)
+        self.assertNotIn(b' ', output)
+
+    def test_indent_falls_back_to_stock_renderer(self):
+        """Test that requested indentation is honoured."""
+        output = self.renderer.render({'a': [1, 2], '_id': self.obj_id}, 'application/json; indent=4')
+
+        self.assertIn(b'\n    "a"', output)
+        self.assertIn(str(self.obj_id).encode(), output)
+
+    @patch('apps.clients_contracts.renderers.orjson', None)
+    def test_without_orjson(self):
+        """Test that the classes still work when orjson is missing."""
+        self.assertEqual(json.loads(self.renderer.render(self.document))['_id'], str(self.obj_id))
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(b'{"a": 1}')), {'a': 1})
+
+    def test_parser(self):
+        """Test parsing and parse errors."""
+        parser = FastJSONParser()
+
+        self.assertEqual(parser.parse(io.BytesIO('{"title": "Café"}'.encode('utf-8'))), {'title': 'Café'})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"title": '))
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"fee": NaN}'))
+
+    def test_configured_as_defaults(self):
+        """Test that DRF uses the fast classes unless a view overrides them."""
+        self.assertIs(api_settings.DEFAULT_RENDERER_CLASSES[0], FastJSONRenderer)
+        self.assertIs(api_settings.DEFAULT_PARSER_CLASSES[0], FastJSONParser)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from unittest.mock import patch, Mock
+import os
+import sys
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from apps.clients_contracts.ai_service import AIService
+from apps.clients_contracts.deadline import deadline_scope
+from apps.clients_contracts.routing import (
+    DEFAULT_MODEL_ROUTES, MIN_CALLS, ROUTING_DECISIONS, ModelRouter, call_rounds,
+)
+
+CHAT = 'deepseek-chat'
+REASONER = 'deepseek-reasoner'
+
+
+class TestModelRouting(unittest.TestCase):
+    """Test model routing between deepseek-chat and deepseek-reasoner."""
+
+    def setUp(self):
+        self.router = ModelRouter(DEFAULT_MODEL_ROUTES, max_error_rate=0.5)
+        patcher = patch('apps.clients_contracts.ai_service.model_router', self.router)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_default_routes(self):
+        """Test that without a deadline or history the preferred models are used."""
+        with patch.object(ROUTING_DECISIONS, 'inc') as mock_inc:
+            self.assertEqual(self.router.choose('analyze', 1000), REASONER)
+        mock_inc.assert_called_once_with(operation='analyze', model=REASONER, reason='preferred')
+        self.assertEqual(self.router.choose('evaluate', 1000), REASONER)
+        self.assertEqual(self.router.choose('extract_clauses', 1000), CHAT)
+        with self.assertRaises(KeyError):
+            self.router.choose('translate')
+
+    def test_latency_budget(self):
+        """Test that a tight deadline moves to the faster model, scaled by chunk rounds."""
+        self.assertEqual((call_rounds(50000), call_rounds(100000), call_rounds(200000)), (1, 2, 3))
+
+        with deadline_scope(30), patch.object(ROUTING_DECISIONS, 'inc') as mock_inc:
+            self.assertEqual(self.router.choose('analyze', 1000), CHAT)
+        mock_inc.assert_called_once_with(operation='analyze', model=CHAT, reason='over_budget')
+
+        self.router.observe(REASONER, 'analyze', 'ok', 20)
+        self.router.observe(CHAT, 'analyze', 'ok', 12)
+        with deadline_scope(30):
+            self.assertEqual(self.router.choose('analyze', 1000), REASONER)
+            self.assertEqual(self.router.choose('analyze', 100000), CHAT)
+        with deadline_scope(5), patch.object(ROUTING_DECISIONS, 'inc') as mock_inc:
+            # Nothing fits: the faster of the two
+            self.assertEqual(self.router.choose('analyze', 1000), CHAT)
+        mock_inc.assert_called_once_with(operation='analyze', model=CHAT, reason='fastest')
+
+    @patch('apps.clients_contracts.routing.time.monotonic')
+    def test_failing_model_is_skipped(self, mock_monotonic):
+        """Test that a failing model is skipped, and tried again once its error rate has decayed."""
+        mock_monotonic.return_value = 1000.0
+        for _ in range(MIN_CALLS):
+            self.router.observe(REASONER, 'evaluate', 'deadline_exceeded', 1)
+        self.assertEqual(self.router.choose('evaluate', 1000), REASONER)
+
+        for _ in range(MIN_CALLS):
+            self.router.observe(REASONER, 'evaluate', 'timeout', 60)
+        for _ in range(100):
+            self.router.observe(CHAT, 'evaluate', 'ok', 10)
+            self.assertEqual(self.router.choose('evaluate', 1000), CHAT)
+
+        # Once the error rate has decayed it is tried again, and further failures rule it out again
+        mock_monotonic.return_value += self.router.recovery_half_life
+        self.assertEqual(self.router.choose('evaluate', 1000), REASONER)
+        self.router.observe(REASONER, 'evaluate', 'timeout', 60)
+        self.router.observe(REASONER, 'evaluate', 'timeout', 60)
+        self.assertEqual(self.router.choose('evaluate', 1000), CHAT)
+
+        mock_monotonic.return_value += self.router.recovery_half_life
+        self.router.observe(REASONER, 'evaluate', 'ok', 20)
+        self.assertEqual(self.router.choose('evaluate', 1000), REASONER)
+
+    def test_hedge_loser_counts_for_latency_only(self):
+        """Test that a losing hedged attempt moves the latency but is not another call."""
+        self.router.observe(CHAT, 'extract_clauses', 'ok', 10)
+        self.router.observe(CHAT, 'extract_clauses', 'hedge_lost', 20)
+        self.assertAlmostEqual(self.router.expected_latency(CHAT, 'extract_clauses'), 12)
+
+        for _ in range(MIN_CALLS - 2):
+            self.router.observe(REASONER, 'evaluate', 'timeout', 60)
+        self.router.observe(REASONER, 'evaluate', 'hedge_lost', 60)
+        self.assertTrue(self.router.healthy(REASONER))
+
+    def test_length_limit_and_disabled_routing(self):
+        """Test per-route max_chars, and that disabled routing always takes the first candidate."""
+        routes = {'analyze': [{'model': REASONER, 'max_chars': 10000}, {'model': CHAT}]}
+        router = ModelRouter(routes, max_error_rate=0.5)
+        self.assertEqual(router.choose('analyze', 5000), REASONER)
+        self.assertEqual(router.choose('analyze', 20000), CHAT)
+
+        router = ModelRouter(routes, max_error_rate=0.5, enabled=False)
+        with deadline_scope(1):
+            self.assertEqual(router.choose('analyze', 20000), REASONER)
+
+    @patch('apps.clients_contracts.ai_service.session.post')
+    def test_analysis_uses_the_routed_model(self, mock_post):
+        """Test that AIService sends the routed model, labels the result and feeds back latency."""
+        response = Mock(status_code=200)
+        response.json.return_value = {"choices": [{"message": {"content": "Balanced terms."}}], "usage": {}}
+        mock_post.return_value = response
+
+        with deadline_scope(30):
+            result = AIService.analyze_contract("Short contract text")
+
+        self.assertEqual(mock_post.call_args.kwargs['json']['model'], CHAT)
+        self.assertEqual(result['model_used'], 'DeepSeek Chat Model (Live)')
+        self.assertLess(self.router.expected_latency(CHAT, 'analyze'), 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
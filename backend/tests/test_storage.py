@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch, Mock
+import os
+import sys
+from bson import ObjectId
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from apps.clients_contracts.storage import (
+    ContractStorage,
+    BODY_FIELDS,
+    CODEC_JSON,
+    CODEC_ZLIB,
+    COMPRESSION_THRESHOLD,
+)
+
+
+class TestContractStorage(unittest.TestCase):
+    """Test the side-collection layout for contract bodies."""
+
+    def test_parse_fields(self):
+        """Test parsing of the include query parameter."""
+        self.assertEqual(ContractStorage.parse_fields(None), ())
+        self.assertEqual(ContractStorage.parse_fields(None, default=BODY_FIELDS), BODY_FIELDS)
+        self.assertEqual(ContractStorage.parse_fields('all'), BODY_FIELDS)
+        self.assertEqual(ContractStorage.parse_fields('none', default=BODY_FIELDS), ())
+        self.assertEqual(ContractStorage.parse_fields('analysis, text,bogus'), ('text', 'analysis'))
+
+    def test_split_document(self):
+        """Test that body fields are separated from metadata."""
+        metadata, bodies = ContractStorage.split_document({
+            'title': 'Test Contract',
+            'text': 'Contract text',
+            'clauses': [],
+            'approved': True
+        })
+
+        self.assertEqual(metadata, {'title': 'Test Contract', 'approved': True})
+        self.assertEqual(bodies, {'text': 'Contract text', 'clauses': []})
+
+    def test_encode_decode_round_trip(self):
+        """Test that small bodies stay raw and large bodies are compressed."""
+        small = ContractStorage.encode_body('short analysis')
+        large_text = 'Payment due within 30 days. ' * 200
+        large = ContractStorage.encode_body(large_text)
+        clauses = ContractStorage.encode_body([{'type': 'Termination', 'risk_level': 'low'}])
+
+        self.assertEqual(small['codec'], CODEC_JSON)
+        self.assertEqual(large['codec'], CODEC_ZLIB)
+        self.assertGreater(large['size'], COMPRESSION_THRESHOLD)
+        self.assertLess(len(large['data']), large['size'])
+        self.assertEqual(ContractStorage.decode_body(small), 'short analysis')
+        self.assertEqual(ContractStorage.decode_body(large), large_text)
+        self.assertEqual(ContractStorage.decode_body(clauses), [{'type': 'Termination', 'risk_level': 'low'}])
+
+    def test_build_update_unsets_inline_copies(self):
+        """Test the hot document update after saving bodies."""
+        update = ContractStorage.build_update({'updated_at': 'now'}, {'analysis': 120})
+
+        self.assertEqual(update['$set'], {'updated_at': 'now', 'body_sizes.analysis': 120})
+        self.assertEqual(update['$unset'], {'analysis': ''})
+        self.assertNotIn('$unset', ContractStorage.build_update({'title': 'New'}, {}))
+
+    @patch('apps.clients_contracts.storage.contracts_collection')
+    @patch('apps.clients_contracts.storage.contract_bodies_collection')
+    def test_load_bodies_falls_back_to_inline_documents(self, mock_bodies, mock_contracts):
+        """Test that contracts stored in the old inline layout still load."""
+        new_id, legacy_id = ObjectId(), ObjectId()
+        mock_bodies.find.return_value = [
+            {'_id': new_id, 'analysis': ContractStorage.encode_body('Side analysis')}
+        ]
+        mock_contracts.find.return_value = [
+            {'_id': legacy_id, 'analysis': 'Inline analysis'}
+        ]
+
+        loaded = ContractStorage.load_bodies_many([new_id, legacy_id], ('analysis',))
+
+        self.assertEqual(loaded[new_id], {'analysis': 'Side analysis'})
+        self.assertEqual(loaded[legacy_id], {'analysis': 'Inline analysis'})
+        legacy_query = mock_contracts.find.call_args[0][0]
+        self.assertEqual(legacy_query, {'_id': {'$in': [legacy_id]}})
+
+    @patch('apps.clients_contracts.storage.contract_bodies_collection')
+    def test_save_bodies_returns_sizes(self, mock_bodies):
+        """Test that saving bodies upserts one side document."""
+        contract_id = ObjectId()
+
+        sizes = ContractStorage.save_bodies(contract_id, {'text': 'abc', 'clauses': []})
+
+        self.assertEqual(sizes, {'text': 5, 'clauses': 2})
+        args, kwargs = mock_bodies.update_one.call_args
+        self.assertEqual(args[0], {'_id': contract_id})
+        self.assertTrue(kwargs['upsert'])
+        self.assertEqual(ContractStorage.save_bodies(contract_id, {}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
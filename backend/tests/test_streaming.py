@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import patch, Mock
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from bson import ObjectId
+from django.test import RequestFactory
+from rest_framework.request import Request
+from apps.clients_contracts.streaming import (
+    NDJSONRenderer, batched, encode_chunks, encode_document, stream_format, streaming_response,
+)
+
+
+class TestStreaming(unittest.TestCase):
+    """Test the streaming JSON/NDJSON encoder."""
+
+    def setUp(self):
+        self.documents = [{'_id': ObjectId(), 'title': f'Contract {i}'} for i in range(5)]
+
+    def test_encode_document(self):
+        """Test that ObjectIds and datetimes are encoded."""
+        obj_id = ObjectId()
+        document = json.loads(encode_document({'_id': obj_id, 'at': datetime(2025, 1, 2, 3, 4, 5)}))
+
+        self.assertEqual(document['_id'], str(obj_id))
+        self.assertTrue(document['at'].startswith('2025-01-02T03:04:05'))
+
+    def test_json_array_chunks(self):
+        """Test that the chunks form one JSON array, one chunk per batch."""
+        chunks = list(encode_chunks(batched(self.documents, 2), 'json'))
+
+        self.assertEqual(len(chunks), 4)  # three batches and the closing bracket
+        body = json.loads(b''.join(chunks))
+        self.assertEqual([doc['title'] for doc in body], [doc['title'] for doc in self.documents])
+        self.assertEqual(body[0]['_id'], str(self.documents[0]['_id']))
+
+    def test_empty_collection(self):
+        """Test that nothing to stream still gives valid bodies."""
+        self.assertEqual(b''.join(encode_chunks(iter([]), 'json')), b'[]')
+        self.assertEqual(b''.join(encode_chunks(iter([]), 'ndjson')), b'')
+
+    def test_ndjson_chunks(self):
+        """Test one document per line."""
+        lines = b''.join(encode_chunks(batched(self.documents, 3), 'ndjson')).splitlines()
+
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[4])['title'], 'Contract 4')
+
+    def test_batches_are_read_lazily(self):
+        """Test that a batch is only read once the previous chunk is written."""
+        read = []
+
+        def batches():
+            for batch in batched(self.documents, 2):
+                read.append(len(batch))
+                yield batch
+
+        chunks = encode_chunks(batches(), 'json')
+        next(chunks)
+        self.assertEqual(read, [2])
+
+    def test_stream_format(self):
+        """Test how a request selects the streaming mode."""
+        factory = RequestFactory()
+        ndjson = Request(factory.get('/'))
+        ndjson.accepted_renderer = NDJSONRenderer()
+
+        self.assertEqual(stream_format(ndjson), 'ndjson')
+        self.assertEqual(stream_format(Request(factory.get('/?stream=true'))), 'json')
+        self.assertIsNone(stream_format(Request(factory.get('/'))))
+
+    def test_asgi_requests_get_an_async_iterator(self):
+        """Test that ASGI responses are streamed without buffering the body."""
+        from django.core.handlers.asgi import ASGIRequest
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/contracts/', 'query_string': b'', 'headers': []}
+        request = Request(ASGIRequest(scope, Mock()))
+
+        response = streaming_response(request, batched(self.documents, 2), 'ndjson')
+
+        self.assertTrue(response.is_async)
+
+        async def consume():
+            return b''.join([chunk async for chunk in response])
+
+        self.assertEqual(len(asyncio.run(consume()).splitlines()), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
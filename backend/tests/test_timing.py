@@ -0,0 +1,99 @@
+import unittest
+from unittest.mock import patch, Mock
+import os
+import sys
+
+# Add apps to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+from apps.clients_contracts.timing import (
+    RequestTimer,
+    ServerTimingMiddleware,
+    MongoTimingListener,
+    span,
+    current_timer,
+    format_server_timing,
+)
+
+
+class TestServerTiming(unittest.TestCase):
+    """Test the per-request span timer and its middleware."""
+
+    def setUp(self):
+        """Build requests without going through the URL router."""
+        self.factory = RequestFactory()
+
+    def test_span_without_request_is_a_no_op(self):
+        """Test that code outside a request can use span() freely."""
+        with span('pdf'):
+            pass
+
+        self.assertIsNone(current_timer())
+
+    def test_format_server_timing(self):
+        """Test that uncovered time is reported as app time."""
+        header = format_server_timing({'mongo': {'ms': 12.5, 'count': 3}, 'ai': {'ms': 80.0, 'count': 1}}, 100.0)
+
+        self.assertEqual(header, 'mongo;dur=12.5;desc="3x", ai;dur=80.0;desc="1x", app;dur=7.5, total;dur=100.0')
+
+    def test_middleware_collects_spans_and_sets_headers(self):
+        """Test that spans and Mongo command events end up in Server-Timing."""
+        def view(request):
+            with span('pdf'):
+                pass
+            MongoTimingListener().succeeded(Mock(duration_micros=2500))
+            return HttpResponse('ok')
+
+        middleware = ServerTimingMiddleware(view)
+        response = middleware(self.factory.get('/api/contracts/', HTTP_X_REQUEST_ID='req-123'))
+
+        self.assertEqual(response['X-Request-ID'], 'req-123')
+        self.assertIn('pdf;dur=', response['Server-Timing'])
+        self.assertIn('mongo;dur=2.5;desc="1x"', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
+        self.assertIsNone(current_timer())
+
+    def test_malformed_request_id_is_replaced(self):
+        """Test that arbitrary header values are not echoed back."""
+        middleware = ServerTimingMiddleware(lambda request: HttpResponse('ok'))
+
+        response = middleware(self.factory.get('/', HTTP_X_REQUEST_ID='bad id\r\nSet-Cookie: x'))
+
+        self.assertRegex(response['X-Request-ID'], r'^[0-9a-f]{32}$')
+
+    def test_slow_requests_are_logged_with_breakdown(self):
+        """Test slow-request sampling."""
+        middleware = ServerTimingMiddleware(lambda request: HttpResponse('ok'))
+        middleware.slow_request_ms = 0
+
+        with self.assertLogs('apps.clients_contracts.timing', level='WARNING') as logs:
+            middleware(self.factory.get('/api/contracts/'))
+
+        self.assertIn('Slow request', logs.output[0])
+        self.assertIn('"path": "/api/contracts/"', logs.output[0])
+
+    def test_timer_is_shared_with_worker_threads(self):
+        """Test that spans from copied contexts are added to the same timer."""
+        import contextvars
+        import threading
+        from apps.clients_contracts import timing
+
+        timer = RequestTimer('req')
+        token = timing._current_timer.set(timer)
+        try:
+            def worker():
+                with span('ai'):
+                    pass
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(worker,))
+            thread.start()
+            thread.join()
+        finally:
+            timing._current_timer.reset(token)
+
+        self.assertEqual(timer.snapshot()['ai']['count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,11 +11,13 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from bson import ObjectId
 import io
 import uuid
+from datetime import datetime
 
 # Add apps to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'apps'))
 
 from apps.clients_contracts.views import contracts_collection, clients_collection
+from apps.clients_contracts.cache import AnalysisCache, ClientCache, ContractCache, clear_all_cache
 
 
 class BaseTestCase(TestCase):
@@ -56,6 +58,8 @@ class BaseTestCase(TestCase):
             clients_collection.delete_many({})
         except:
             pass
+        # Cached documents would otherwise outlive the collections cleaned above
+        clear_all_cache()
 
 
 class TestContractViews(BaseTestCase):
@@ -85,6 +89,21 @@ class TestContractViews(BaseTestCase):
         mock_analyze.assert_called_once()
         mock_evaluate.assert_called_once()
 
+    @patch('apps.clients_contracts.ai_service.AIService.analyze_contract')
+    def test_create_contract_shed_at_capacity(self, mock_analyze):
+        """Test that uploads are turned away with Retry-After while AI capacity is used up, and reads are not."""
+        from apps.clients_contracts.admission import ai_admission
+
+        with patch.object(ai_admission, 'in_flight', ai_admission.max_in_flight), \
+             patch.object(ai_admission, 'max_queue', 0):
+            response = self.client.post('/api/contracts/', self.sample_contract_data)
+            listing = self.client.get('/api/contracts/')
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(listing.status_code, status.HTTP_200_OK)
+        mock_analyze.assert_not_called()
+
     def test_create_contract_missing_fields(self):
         """Test contract creation with missing required fields."""
         incomplete_data = {'title': 'Test Contract'}
@@ -145,6 +164,43 @@ class TestContractViews(BaseTestCase):
         self.assertIsInstance(response.data, list)
         self.assertGreater(len(response.data), 0)
 
+    def test_list_contracts_hydrates_from_summary_cache(self):
+        """Test that list pages reuse cached summaries until a contract changes."""
+        contract_id = contracts_collection.insert_one({
+            'title': 'Cached Title',
+            'client': 'List Test Client',
+            'signed': False,
+            'date': '2025-01-01'
+        }).inserted_id
+
+        self.client.get('/api/contracts/')
+        # Written behind the API's back, so only a cache miss would show it
+        contracts_collection.update_one({'_id': contract_id}, {'$set': {'title': 'Stale Title'}})
+        cached = self.client.get('/api/contracts/')
+        self.client.patch(f'/api/contracts/{contract_id}/', {'signed': True}, format='json')
+        refreshed = self.client.get('/api/contracts/')
+
+        self.assertEqual(cached.data[0]['title'], 'Cached Title')
+        self.assertEqual(refreshed.data[0]['title'], 'Stale Title')
+        self.assertTrue(refreshed.data[0]['signed'])
+
+    def test_list_contracts_streaming(self):
+        """Test that streamed lists match the buffered response."""
+        for i in range(5):
+            contracts_collection.insert_one({'title': f'Streamed {i}', 'client': 'Stream Client', 'signed': False})
+
+        buffered = self.client.get('/api/contracts/')
+        with self.settings(STREAM_BATCH_SIZE=2):
+            streamed = self.client.get('/api/contracts/?stream=true')
+            ndjson = self.client.get('/api/contracts/', HTTP_ACCEPT='application/x-ndjson')
+
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(streamed['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(b''.join(streamed.streaming_content)), json.loads(buffered.content))
+        lines = b''.join(ndjson.streaming_content).decode().splitlines()
+        self.assertEqual(ndjson['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([json.loads(line)['title'] for line in lines], [c['title'] for c in buffered.data])
+
     def test_get_contract_detail(self):
         """Test retrieving a specific contract."""
         # Insert test contract
@@ -200,6 +256,26 @@ class TestContractViews(BaseTestCase):
         self.assertEqual(update_response.data['title'], 'Updated Contract Title')
         self.assertTrue(update_response.data['signed'])
 
+    def test_update_returns_the_full_contract_unless_narrowed(self):
+        """Test that PUT/PATCH return every body by default and only the sent ones with ?include=none."""
+        contract_id = str(contracts_collection.insert_one({
+            'title': 'Shape Contract', 'client': 'Shape Client', 'signed': False,
+            'text': 'Stored text', 'analysis': 'Stored analysis',
+        }).inserted_id)
+
+        full = self.client.patch(f'/api/contracts/{contract_id}/', {'signed': True}, format='json')
+        slim = self.client.put(f'/api/contracts/{contract_id}/?include=none',
+                               {'analysis': 'New analysis'}, format='json')
+        some = self.client.patch(f'/api/contracts/{contract_id}/?include=text', {'signed': False}, format='json')
+
+        self.assertEqual(full.data['text'], 'Stored text')
+        self.assertEqual(full.data['analysis'], 'Stored analysis')
+        self.assertTrue(full.data['signed'])
+        self.assertEqual(slim.data['analysis'], 'New analysis')
+        self.assertNotIn('text', slim.data)
+        self.assertEqual(some.data['text'], 'Stored text')
+        self.assertNotIn('analysis', some.data)
+
     def test_delete_contract(self):
         """Test deleting a contract."""
         # Insert test contract
@@ -223,6 +299,160 @@ class TestContractViews(BaseTestCase):
         self.assertIsNone(contract)
 
 
+class TestConditionalRequests(BaseTestCase):
+    """Test ETag / If-None-Match handling on contracts, analyses and clients."""
+
+    def insert_contract(self, **fields):
+        contract = {'title': 'ETag Contract', 'client': 'ETag Client', 'signed': False,
+                    'analysis': 'Stored analysis', 'updated_at': '2025-01-02T03:04:05', **fields}
+        return str(contracts_collection.insert_one(contract).inserted_id)
+
+    def test_contract_detail_not_modified(self):
+        """Test that an unchanged contract answers 304 until it is updated."""
+        contract_id = self.insert_contract()
+
+        first = self.client.get(f'/api/contracts/{contract_id}/')
+        etag = first['ETag']
+        with patch('apps.clients_contracts.views.ContractStorage.attach_bodies') as mock_bodies:
+            repeat = self.client.get(f'/api/contracts/{contract_id}/', HTTP_IF_NONE_MATCH=etag)
+        self.client.patch(f'/api/contracts/{contract_id}/', {'signed': True}, format='json')
+        changed = self.client.get(f'/api/contracts/{contract_id}/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertIn('Last-Modified', first)
+        self.assertEqual(repeat.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(repeat.content, b'')
+        self.assertEqual(repeat['ETag'], etag)
+        mock_bodies.assert_not_called()
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(changed['ETag'], etag)
+        self.assertEqual(contracts_collection.find_one({'signed': True})['version'], 1)
+
+    def test_etag_depends_on_included_fields(self):
+        """Test that differently shaped bodies get different ETags."""
+        contract_id = self.insert_contract()
+
+        full = self.client.get(f'/api/contracts/{contract_id}/')
+        slim = self.client.get(f'/api/contracts/{contract_id}/?include=none')
+
+        self.assertNotEqual(full['ETag'], slim['ETag'])
+
+    def test_analysis_not_modified(self):
+        """Test conditional requests on the analysis endpoint."""
+        contract_id = self.insert_contract()
+
+        first = self.client.get(f'/api/contracts/{contract_id}/analysis/')
+        repeat = self.client.get(f'/api/contracts/{contract_id}/analysis/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(repeat.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_compressed_analysis_revalidates(self):
+        """Test that gzip responses carry a weak ETag that still answers 304."""
+        contract_id = self.insert_contract(analysis='Payment within 30 days of invoice. ' * 200)
+
+        first = self.client.get(f'/api/contracts/{contract_id}/analysis/', HTTP_ACCEPT_ENCODING='gzip')
+        repeat = self.client.get(f'/api/contracts/{contract_id}/analysis/', HTTP_ACCEPT_ENCODING='gzip',
+                                 HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(first['Content-Encoding'], 'gzip')
+        self.assertTrue(first['ETag'].startswith('W/'))
+        self.assertEqual(repeat.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_analysis_cache_follows_the_contract_version(self):
+        """Test that an analysis cached at an older version is not served for a newer one."""
+        contract_id = self.insert_contract(analysis='Current analysis')
+        AnalysisCache.cache_analysis(contract_id, 0, {'analysis': 'Stale analysis'})
+        contracts_collection.update_one({'_id': ObjectId(contract_id)}, {'$set': {'version': 1}})
+
+        response = self.client.get(f'/api/contracts/{contract_id}/analysis/')
+
+        self.assertEqual(response.data['analysis'], 'Current analysis')
+
+    def test_contract_list_changes_when_a_contract_is_deleted(self):
+        """Test that list ETags cover membership, not just updates."""
+        self.insert_contract()
+        deleted_id = self.insert_contract(title='Second')
+
+        first = self.client.get('/api/contracts/')
+        unchanged = self.client.get('/api/contracts/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.client.delete(f'/api/contracts/{deleted_id}/')
+        changed = self.client.get('/api/contracts/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertNotIn('Last-Modified', first)
+        self.assertEqual(unchanged.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(changed.data), 1)
+
+    def test_contract_list_validators_come_from_the_primary(self):
+        """Test that a lagging secondary cannot give a list an out-of-date ETag."""
+        self.insert_contract()
+        lagging = Mock()
+        lagging.find.return_value = []
+
+        with patch('apps.clients_contracts.views.contracts_read_collection', lagging):
+            response = self.client.get('/api/contracts/')
+
+        lagging.find.assert_not_called()
+        self.assertEqual(len(response.data), 1)
+
+    def test_contract_list_refetches_summaries_behind_their_revision(self):
+        """Test that a summary re-cached by a reader racing a write is not served under the new ETag."""
+        contract_id = self.insert_contract(updated_at=datetime(2025, 1, 2, 3, 4, 5, 123000), version=1)
+        first = self.client.get('/api/contracts/')
+        with patch('apps.clients_contracts.views.ContractCache.cache_contract_summaries') as mock_cache:
+            self.client.get('/api/contracts/')
+        mock_cache.assert_not_called()
+
+        stale = dict(first.data[0], _id=contract_id)
+        contracts_collection.update_one(
+            {'_id': ObjectId(contract_id)}, {'$set': {'title': 'Renamed', 'version': 2}}
+        )
+        ContractCache.cache_contract_summaries({contract_id: stale})
+        response = self.client.get('/api/contracts/', HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['title'], 'Renamed')
+
+    def test_detail_refetches_a_copy_cached_behind_its_revision(self):
+        """Test that a detail re-cached by a reader racing a write is not served, with either ETag."""
+        contract_id = self.insert_contract(version=1)
+        client_id = str(clients_collection.insert_one({'name': 'Race Client', 'version': 1}).inserted_id)
+        contract = self.client.get(f'/api/contracts/{contract_id}/')
+        client = self.client.get(f'/api/clients/{client_id}/')
+
+        # The reader fetched version 1, the write landed and invalidated, then the reader cached its copy
+        self.client.patch(f'/api/contracts/{contract_id}/', {'title': 'Renamed'}, format='json')
+        self.client.patch(f'/api/clients/{client_id}/', {'email': 'new@example.com'}, format='json')
+        ContractCache.cache_contract(contract_id, dict(contract.data))
+        ClientCache.cache_client(client_id, dict(client.data))
+        stale_contract = self.client.get(f'/api/contracts/{contract_id}/', HTTP_IF_NONE_MATCH=contract['ETag'])
+        stale_client = self.client.get(f'/api/clients/{client_id}/', HTTP_IF_NONE_MATCH=client['ETag'])
+        revalidated = self.client.get(f'/api/contracts/{contract_id}/', HTTP_IF_NONE_MATCH=stale_contract['ETag'])
+
+        self.assertEqual(stale_contract.status_code, status.HTTP_200_OK)
+        self.assertEqual(stale_contract.data['title'], 'Renamed')
+        self.assertEqual(stale_contract.data['version'], 2)
+        self.assertNotEqual(stale_contract['ETag'], contract['ETag'])
+        self.assertEqual(stale_client.status_code, status.HTTP_200_OK)
+        self.assertEqual(stale_client.data['email'], 'new@example.com')
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_client_detail_and_list(self):
+        """Test conditional requests on client endpoints, from cache and database."""
+        client_id = str(clients_collection.insert_one({'name': 'ETag Client'}).inserted_id)
+
+        detail = self.client.get(f'/api/clients/{client_id}/')
+        listing = self.client.get('/api/clients/')
+        cached_list = self.client.get('/api/clients/', HTTP_IF_NONE_MATCH=listing['ETag'])
+        self.client.patch(f'/api/clients/{client_id}/', {'email': 'new@example.com'}, format='json')
+        changed = self.client.get(f'/api/clients/{client_id}/', HTTP_IF_NONE_MATCH=detail['ETag'])
+        changed_list = self.client.get('/api/clients/', HTTP_IF_NONE_MATCH=listing['ETag'])
+
+        self.assertEqual(cached_list.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+        self.assertEqual(changed_list.status_code, status.HTTP_200_OK)
+        self.assertEqual(clients_collection.find_one({'name': 'ETag Client'})['version'], 1)
+
+
 class TestContractAnalysisViews(BaseTestCase):
     """Test contract analysis endpoints."""
     
@@ -377,6 +607,18 @@ class TestClientViews(BaseTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIsInstance(response.data, list)
 
+    def test_list_clients_streaming(self):
+        """Test streaming the client list as NDJSON."""
+        clients_collection.insert_one({'name': 'Streamed Client'})
+
+        response = self.client.get('/api/clients/?format=ndjson')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        clients = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(clients[0]['name'], 'Streamed Client')
+        self.assertTrue(clients[0]['active'])
+        self.assertIsInstance(clients[0]['_id'], str)
+
     def test_get_client_contracts(self):
         """Test getting contracts for a specific client."""
         # Insert test client
@@ -468,6 +710,7 @@ class TestSystemViews(BaseTestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('status', response.data)
+        self.assertEqual(response.data['ai']['state'], 'closed')
 
     def test_metrics_endpoint(self):
         """Test metrics endpoint."""
@@ -477,6 +720,45 @@ class TestSystemViews(BaseTestCase):
         self.assertIn('request_count', response.data)
         self.assertIn('average_latency', response.data)
 
+    def test_metrics_prometheus_format(self):
+        """Test Prometheus text exposition of the request metrics."""
+        self.client.get('/healthz/')
+
+        response = self.client.get('/metrics/', HTTP_ACCEPT='text/plain')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_requests_total{view="HealthzView",method="GET",status="200"}', body)
+
+    def test_usage_endpoint(self):
+        """Test AI usage aggregation by model and operation."""
+        from apps.clients_contracts.telemetry import usage_collection
+        from datetime import datetime
+        usage_collection.delete_many({})
+        self.addCleanup(usage_collection.delete_many, {})
+        usage_collection.insert_many([
+            {'model': 'deepseek-reasoner', 'operation': 'analyze', 'contract_id': 'a', 'calls': 3,
+             'prompt_tokens': 300, 'completion_tokens': 30, 'cached_tokens': 0, 'reasoning_tokens': 0,
+             'cost_usd': 0.003, 'wall_time': 30.0, 'max_wall_time': 12.0, 'failed_calls': 0, 'retries': 0,
+             'created_at': datetime(2025, 1, 15)},
+            {'model': 'deepseek-reasoner', 'operation': 'analyze', 'contract_id': 'b', 'calls': 1,
+             'prompt_tokens': 100, 'completion_tokens': 10, 'cached_tokens': 0, 'reasoning_tokens': 0,
+             'cost_usd': 0.001, 'wall_time': 10.0, 'max_wall_time': 10.0, 'failed_calls': 0, 'retries': 0,
+             'created_at': datetime(2025, 1, 16)},
+        ])
+
+        response = self.client.get('/api/usage/', {'since': '2025-01-01'})
+        invalid = self.client.get('/api/usage/', {'group_by': 'password'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data['results'][0]
+        self.assertEqual((row['model'], row['operation'], row['calls']), ('deepseek-reasoner', 'analyze', 4))
+        self.assertEqual(row['avg_wall_time'], 10.0)
+        self.assertEqual(response.data['totals']['prompt_tokens'], 400)
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_logs_endpoint(self):
         """Test logs endpoint."""
         response = self.client.get('/logs/')
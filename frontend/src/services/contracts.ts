@@ -13,6 +13,7 @@ export interface BackendContract {
   approved?: boolean;
   evaluation_reasoning?: string;
   clauses?: string[];
+  clause_count?: number;
   text?: string;
 }
 
@@ -73,7 +74,10 @@ export interface ReanalyzeContractResponse {
   evaluation_reasoning: string;
 }
 
+// List responses carry approved and clause_count but no bodies (analysis, clauses,
+// evaluation_reasoning); those come with the single-contract fetch.
 export function transformContract(contract: BackendContract): FrontendContract {
+  const analysis = typeof contract.analysis === 'string' ? contract.analysis : undefined;
   return {
     id: contract._id,
     title: contract.title,
@@ -82,13 +86,13 @@ export function transformContract(contract: BackendContract): FrontendContract {
     uploadDate: contract.date || contract.created_at,
     status: contract.approved ? 'approved' : contract.approved === false ? 'rejected' : 'pending',
     fileSize: '1.2 MB', // TODO: Add actual file size
-    analysisResults: contract.analysis && typeof contract.analysis === 'string' ? {
+    analysisResults: analysis || typeof contract.approved === 'boolean' ? {
       approved: contract.approved === true,
-      reasoning: contract.analysis,
-      clauseCount: contract.clauses?.length || 0
+      reasoning: analysis || '',
+      clauseCount: contract.clause_count ?? contract.clauses?.length ?? 0
     } : undefined,
     clauses: contract.clauses || [],
-    analysis: typeof contract.analysis === 'string' ? contract.analysis : undefined,
+    analysis,
     evaluation_reasoning: contract.evaluation_reasoning,
     approved: contract.approved
   };